@@ -62,6 +62,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'questionbank.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +75,7 @@ MIDDLEWARE = [
 
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ['ETag']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -175,3 +177,46 @@ CHANNEL_LAYERS = {
         "BACKEND": "channels.layers.InMemoryChannelLayer"
     }
 }
+
+# Per-user "next questions" queues (questionbank.question_queue).
+# Queues are refilled by `manage.py refill_question_queues` once they drop below the watermark.
+QUESTION_QUEUE_SIZE = env.int('QUESTION_QUEUE_SIZE', default=50)
+QUESTION_QUEUE_LOW_WATERMARK = env.int('QUESTION_QUEUE_LOW_WATERMARK', default=15)
+QUESTION_QUEUE_MAX_AGE_HOURS = env.int('QUESTION_QUEUE_MAX_AGE_HOURS', default=24)
+
+# Per-request SQL instrumentation (questionbank.middleware.QueryInstrumentationMiddleware).
+# Requests above QUERY_COUNT_WARNING queries are logged as warnings.
+QUERY_COUNT_WARNING = env.int('QUERY_COUNT_WARNING', default=50)
+QUERY_SLOWEST_COUNT = env.int('QUERY_SLOWEST_COUNT', default=3)
+
+# Compiled mock-exam blueprints (questionbank.mock_exam), cached per exam.
+# Syllabus or exam changes invalidate them straight away; the TTL is only a backstop.
+MOCK_EXAM_BLUEPRINT_TTL = env.int('MOCK_EXAM_BLUEPRINT_TTL', default=3600)
+
+# Pre-generated mock-exam papers (questionbank.mock_exam), kept warm by `manage.py warm_mock_exam_pool`.
+# Papers are rotated out after MOCK_EXAM_POOL_MAX_SERVES users or MOCK_EXAM_POOL_MAX_AGE_HOURS.
+MOCK_EXAM_POOL_SIZE = env.int('MOCK_EXAM_POOL_SIZE', default=10)
+MOCK_EXAM_POOL_MAX_SERVES = env.int('MOCK_EXAM_POOL_MAX_SERVES', default=200)
+MOCK_EXAM_POOL_MAX_AGE_HOURS = env.int('MOCK_EXAM_POOL_MAX_AGE_HOURS', default=72)
+
+# Answer event log (questionbank.answer_events). When enabled, single answers are appended to the log
+# and applied in batches by `manage.py consume_answer_events` or, with ANSWER_EVENT_INPROCESS_WORKERS,
+# by consumer threads inside the web process (one per partition).
+ANSWER_EVENT_LOG_ENABLED = env.bool('ANSWER_EVENT_LOG_ENABLED', default=False)
+ANSWER_EVENT_PARTITIONS = env.int('ANSWER_EVENT_PARTITIONS', default=1)
+ANSWER_EVENT_INPROCESS_WORKERS = env.bool('ANSWER_EVENT_INPROCESS_WORKERS', default=False)
+
+# Cached answer keys used to grade model, daily and mock exams (questionbank.answer_keys).
+# Question edits invalidate them in every worker through a version kept in the database; the TTL only
+# bounds memory.
+ANSWER_KEY_TTL = env.int('ANSWER_KEY_TTL', default=24 * 3600)
+
+# Cache for answer keys, mock-exam blueprints and per-user dashboard payloads, e.g. redis://127.0.0.1:6379/1.
+# The in-memory default is per process; their versions live in the database, so every worker still sees
+# invalidations straight away.
+CACHES = {'default': env.cache('CACHE_URL', default='locmemcache://')}
+
+# Per-user dashboard payloads (questionbank.user_cache), cached under the user's data version.
+# Answers, attempts and progress writes invalidate them in every worker straight away; the TTL only
+# bounds memory.
+USER_PAYLOAD_CACHE_TTL = env.int('USER_PAYLOAD_CACHE_TTL', default=3600)
@@ -0,0 +1,174 @@
+"""
+Per-user study activity packed by year (UserActivityYear).
+
+Each row holds a 16-bit counter for every day of one calendar year. Feed card
+reads and single answers bump their day's counter; answer sheets add theirs in
+bulk from record_answers. The activity calendar, the dashboard heatmap,
+activity streak runs and active-day badges decode one or two rows instead of
+grouping a user's answers and feed views by date; `rebuild_activity`
+reconciles the counters with that history.
+"""
+from array import array
+from datetime import date as Date, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import UserActivityYear, UserAnswer, UserFeedView
+
+DAYS_PER_YEAR = 366
+MAX_COUNT = 0xFFFF
+
+
+def _day_index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def decode(data):
+    counts = array('H')
+    counts.frombytes(bytes(data or b''))
+    if len(counts) < DAYS_PER_YEAR:
+        counts.extend([0] * (DAYS_PER_YEAR - len(counts)))
+    return counts
+
+
+def record_activity(user_id, count=1, day=None):
+    """Adds `count` activities to the user's counter for `day` (default today)."""
+    if count <= 0:
+        return
+    day = day or timezone.localdate()
+    with transaction.atomic(savepoint=False):
+        row = UserActivityYear.objects.select_for_update().filter(user_id=user_id, year=day.year).first()
+        if row is None:
+            # First activity of the year; get_or_create settles a concurrent insert
+            row, _ = UserActivityYear.objects.select_for_update().get_or_create(user_id=user_id, year=day.year)
+        counts = decode(row.days)
+        index = _day_index(day)
+        counts[index] = min(counts[index] + count, MAX_COUNT)
+        row.days = counts.tobytes()
+        row.save(update_fields=['days'])
+
+
+def add_activity(day_counts):
+    """
+    Adds {(user_id, date): count} to the counters in bulk: one insert for the
+    missing rows, one locking read and one bulk update. Used for answer sheets.
+    """
+    if not day_counts:
+        return
+    keys = {(user_id, day.year) for user_id, day in day_counts}
+    with transaction.atomic(savepoint=False):
+        UserActivityYear.objects.bulk_create(
+            [UserActivityYear(user_id=user_id, year=year) for user_id, year in keys], ignore_conflicts=True,
+        )
+        rows = {
+            (row.user_id, row.year): row
+            for row in UserActivityYear.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in keys}, year__in={year for _, year in keys},
+            )
+        }
+        counts = {key: decode(rows[key].days) for key in keys}
+        for (user_id, day), count in day_counts.items():
+            year_counts = counts[user_id, day.year]
+            index = _day_index(day)
+            year_counts[index] = min(year_counts[index] + count, MAX_COUNT)
+        for key, year_counts in counts.items():
+            rows[key].days = year_counts.tobytes()
+        UserActivityYear.objects.bulk_update([rows[key] for key in keys], ['days'], batch_size=1000)
+
+
+def answer_days(answers):
+    """{(user_id, date): count} for `answers`, (user_id, answered_at) pairs, for add_activity."""
+    days = {}
+    for user_id, answered_at in answers:
+        key = (user_id, timezone.localtime(answered_at).date())
+        days[key] = days.get(key, 0) + 1
+    return days
+
+
+def activity_years(user_id, years=None):
+    """
+    {year: counts} for the user's stored activity, optionally limited to
+    `years`. Readers take the result as `loaded` so one request can decode the
+    rows once.
+    """
+    rows = UserActivityYear.objects.filter(user_id=user_id)
+    if years is not None:
+        rows = rows.filter(year__in=list(years))
+    return {year: decode(days) for year, days in rows.values_list('year', 'days')}
+
+
+def _days(years):
+    """Yields (date, count) for every active day in `years` ({year: counts}), in date order."""
+    for year in sorted(years):
+        start = Date(year, 1, 1)
+        for index, count in enumerate(years[year]):
+            if count:
+                day = start + timedelta(days=index)
+                if day.year == year:
+                    yield day, count
+
+
+def daily_counts(user_id, start, end, loaded=None):
+    """Returns {date: activity count} for every day from `start` to `end` inclusive (zeros included)."""
+    years = loaded if loaded is not None else activity_years(user_id, range(start.year, end.year + 1))
+    counts = {}
+    day = start
+    while day <= end:
+        year_counts = years.get(day.year)
+        counts[day] = year_counts[_day_index(day)] if year_counts is not None else 0
+        day += timedelta(days=1)
+    return counts
+
+
+def active_dates(user_id, loaded=None):
+    """Every date the user was active on, in order."""
+    return [day for day, _ in _days(loaded if loaded is not None else activity_years(user_id))]
+
+
+def activity_summary(user_id, today=None, loaded=None):
+    """
+    Returns {'active_days', 'current_run', 'longest_run'}: the number of active
+    days and the current and longest runs of consecutive active days. The
+    current run still counts when the user has not been active yet today.
+    """
+    today = today or timezone.localdate()
+    dates = active_dates(user_id, loaded)
+    longest = run = 0
+    previous = None
+    for day in dates:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous is not None and (today - previous).days <= 1 else 0
+    return {'active_days': len(dates), 'current_run': current, 'longest_run': longest}
+
+
+def build_activity_rows(day_counts):
+    """Builds unsaved rows from `day_counts`, an iterable of (user_id, date, count)."""
+    years = {}
+    for user_id, day, count in day_counts:
+        counts = years.setdefault((user_id, day.year), decode(b''))
+        index = _day_index(day)
+        counts[index] = min(counts[index] + count, MAX_COUNT)
+    return [
+        UserActivityYear(user_id=user_id, year=year, days=counts.tobytes())
+        for (user_id, year), counts in years.items()
+    ]
+
+
+def historical_day_counts():
+    """(user_id, date, count) for every day with answers or feed views."""
+    answers = UserAnswer.objects.all()
+    yield from answers.values_list('user_id', 'answered_at__date').annotate(n=Count('id')).order_by().iterator()
+    yield from UserFeedView.objects.values_list('user_id', 'viewed_date').annotate(n=Count('id')).order_by().iterator()
+
+
+def rebuild_activity():
+    """Recomputes every user's activity from answers and feed views. Returns the number of rows written."""
+    rows = build_activity_rows(historical_day_counts())
+    with transaction.atomic():
+        UserActivityYear.objects.all().delete()
+        UserActivityYear.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -45,7 +45,7 @@ class TopicAdmin(admin.ModelAdmin):
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     form = QuestionForm
-    list_display = ('text', 'display_exams', 'topic', 'sub_topic', 'difficulty', 'status', 'source', 'verified', 'is_verified')
+    list_display = ('text', 'display_exams', 'topic', 'sub_topic', 'difficulty', 'times_answered', 'display_accuracy', 'status', 'source', 'verified', 'is_verified')
     list_filter = ('status', 'source', 'verified', 'is_verified', 'exams', 'topic', 'difficulty', 'institute')
     search_fields = ('text',)
     filter_horizontal = ('exams',)
@@ -102,6 +102,17 @@ class QuestionAdmin(admin.ModelAdmin):
     def display_exams(self, obj):
         return ", ".join([exam.name for exam in obj.exams.all()])
     display_exams.short_description = 'Exams'
+
+    def display_accuracy(self, obj):
+        accuracy = obj.global_accuracy
+        return f"{accuracy}%" if accuracy is not None else "-"
+    display_accuracy.short_description = 'Accuracy'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'correct_answer' in form.changed_data:
+            from .rescoring import describe_rescore, rescore_questions
+            self.message_user(request, describe_rescore(rescore_questions([obj.pk])))
     
     def get_urls(self):
         urls = super().get_urls()
@@ -977,10 +988,14 @@ RETURN ONLY THIS JSON (no markdown, no extra text):
             UserAnswer, Bookmark, Report, DailyExam, ModelExam, 
             PreviousYearPaper, SessionAnswer, AIExplanationCache
         )
+        from .question_state import refresh_question_states
 
         with transaction.atomic():
-            # 1. UserAnswer
-            UserAnswer.objects.filter(question=duplicate_q).update(question=existing_q)
+            # 1. UserAnswer (moved answers bypass signals, so resync the affected users' states)
+            moved_answers = UserAnswer.objects.filter(question=duplicate_q)
+            moved_user_ids = list(moved_answers.values_list('user_id', flat=True).distinct())
+            moved_answers.update(question=existing_q)
+            refresh_question_states(moved_user_ids, [existing_q.id, duplicate_q.id])
             
             # 2. Bookmark
             for b in Bookmark.objects.filter(question=duplicate_q):
@@ -1078,6 +1093,7 @@ RETURN ONLY THIS JSON (no markdown, no extra text):
                 )
             else:
                 # Apply the fix directly
+                old_answer = q.correct_answer
                 q.text = ai_result['question_text']
                 q.options = ai_result['options']
                 q.correct_answer = ai_result['correct_answer']
@@ -1092,6 +1108,11 @@ RETURN ONLY THIS JSON (no markdown, no extra text):
                     f'✅ Question #{q.id} has been fixed by AI and all related reports have been cleared.'
                 )
 
+                # A corrected answer key re-grades the question's history
+                if q.correct_answer != old_answer:
+                    from .rescoring import describe_rescore, rescore_questions
+                    messages.info(request, describe_rescore(rescore_questions([q.id])))
+
             # Clean up session
             request.session.pop(f'ai_fix_{report_id}', None)
 
@@ -0,0 +1,137 @@
+"""
+Append-only answer event log and its consumers.
+
+With ANSWER_EVENT_LOG_ENABLED, SubmitAnswerView only appends an AnswerEvent and
+acknowledges. Consumers fold the log into UserAnswer rows (and through them the
+question states and the question counter rollup), TopicProgress,
+XP and streaks in batches. Each consumer owns a partition of users
+(user_id % partitions), takes the oldest events of its partition not marked
+`applied` -- skipping rows another consumer has locked -- and marks them in the
+same transaction as the batch. A batch is therefore applied exactly once even
+if a worker dies mid-way or ANSWER_EVENT_PARTITIONS changes while consumers
+run, and events committed out of id order are picked up by the next batch.
+
+Consumers run as `manage.py consume_answer_events`, or as in-process threads
+(one per partition) when ANSWER_EVENT_INPROCESS_WORKERS is on.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.functions import Mod
+
+from .models import AnswerEvent
+
+logger = logging.getLogger(__name__)
+
+XP_CORRECT = 10
+XP_WRONG = 2
+
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def log_enabled():
+    return getattr(settings, 'ANSWER_EVENT_LOG_ENABLED', False)
+
+
+def partition_count():
+    return max(1, getattr(settings, 'ANSWER_EVENT_PARTITIONS', 1))
+
+
+def append_answer_event(user, question, selected_option):
+    """Records one answer in the log and returns the event."""
+    event = AnswerEvent.objects.create(
+        user=user, question=question, selected_option=selected_option,
+        is_correct=selected_option == question.correct_answer,
+    )
+    ensure_inprocess_workers()
+    return event
+
+
+def _apply(events):
+    """Applies one batch of events: answers and progress per user, then XP and streak once per user."""
+    from .gamification import award_xp, update_streak
+    from .grading import record_answers
+
+    by_user = {}
+    for event in events:
+        by_user.setdefault(event.user_id, []).append(event)
+    for user_events in by_user.values():
+        user = user_events[0].user
+        record_answers(
+            user,
+            [(event.question, event.selected_option, event.is_correct) for event in user_events],
+            # Backdated to the event; the rollups pick answers by their folded flags, not by time
+            answered_at=[event.created_at for event in user_events],
+        )
+        award_xp(user, sum(XP_CORRECT if event.is_correct else XP_WRONG for event in user_events))
+        update_streak(user)
+
+
+def consume_answer_events(partition=0, partitions=1, batch_size=500):
+    """
+    Applies the next batch of this partition's unapplied events and marks them
+    applied. Returns the number of events applied (0 when the partition is
+    caught up).
+    """
+    with transaction.atomic():
+        events = AnswerEvent.objects.filter(applied=False)
+        if partitions > 1:
+            events = events.alias(_partition=Mod('user_id', partitions)).filter(_partition=partition)
+        events = list(events.select_related('user__userprofile', 'question').select_for_update(
+            skip_locked=True, of=('self',)
+        ).order_by('id')[:batch_size])
+        if not events:
+            return 0
+        _apply(events)
+        AnswerEvent.objects.filter(id__in=[event.id for event in events]).update(applied=True)
+    return len(events)
+
+
+def drain_answer_events(partition=0, partitions=1, batch_size=500):
+    """Consumes until the partition is caught up. Returns the number of events applied."""
+    applied = 0
+    while True:
+        consumed = consume_answer_events(partition, partitions, batch_size)
+        applied += consumed
+        if consumed < batch_size:
+            return applied
+
+
+def prune_answer_events():
+    """Deletes the events consumers have applied. Returns the number of events deleted."""
+    deleted, _ = AnswerEvent.objects.filter(applied=True).delete()
+    return deleted
+
+
+def run_worker(partition=0, partitions=1, batch_size=500, interval=1.0, stop=None):
+    """Consumer loop for one partition; sleeps `interval` seconds whenever it is caught up."""
+    while stop is None or not stop.is_set():
+        close_old_connections()
+        try:
+            consumed = drain_answer_events(partition, partitions, batch_size)
+        except Exception:
+            logger.exception("Answer event consumer %s/%s failed", partition, partitions)
+            consumed = 0
+        if not consumed:
+            time.sleep(interval)
+
+
+def ensure_inprocess_workers():
+    """With ANSWER_EVENT_INPROCESS_WORKERS on, starts one daemon consumer thread per partition in this process, once."""
+    if not getattr(settings, 'ANSWER_EVENT_INPROCESS_WORKERS', False) or _workers:
+        return
+    partitions = partition_count()
+    with _workers_lock:
+        if _workers:
+            return
+        for partition in range(partitions):
+            worker = threading.Thread(
+                target=run_worker, kwargs={'partition': partition, 'partitions': partitions},
+                name=f"answer-events-{partition}", daemon=True,
+            )
+            worker.start()
+            _workers.append(worker)
@@ -0,0 +1,148 @@
+"""
+Compact answer keys for grading without loading Question rows.
+
+An answer key holds, for one paper, the question ids in an int array and the
+correct letters, difficulties and topic ids side by side -- everything grading
+and its progress side effects need, and none of the question content. Keys are
+built from a single values_list() query per model exam, daily exam or ad-hoc
+question set and kept in the cache under a version (a CacheVersion row, so
+every worker process sees it). Model and daily exam keys are versioned per
+paper: a change to a paper's questions bumps that paper only, and a question
+whose correct answer, difficulty or topic changes, or which is deleted, bumps
+the papers holding it and the version shared by the ad-hoc question sets.
+Other question edits leave every key alone.
+"""
+import hashlib
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_versions import bump_versions, current_version
+from .models import DailyExam, ModelExam, Question
+
+ANSWER_KEY_VERSION = 'answer_keys'
+KEY_FIELDS = ('id', 'correct_answer', 'difficulty', 'topic_id')
+# Question fields whose change alters the keys holding the question
+KEY_UPDATE_FIELDS = frozenset({'correct_answer', 'difficulty', 'topic', 'topic_id'})
+# (paper kind, paper M2M through model, its paper column)
+PAPERS = (
+    ('model_exam', ModelExam.questions.through, 'modelexam_id'),
+    ('daily_exam', DailyExam.questions.through, 'dailyexam_id'),
+)
+
+
+def _key_ttl():
+    return getattr(settings, 'ANSWER_KEY_TTL', 24 * 3600)
+
+
+def _version_name(kind, ident):
+    # Ad-hoc question sets share one version; papers have their own
+    return ANSWER_KEY_VERSION if kind == 'question_set' else f"{ANSWER_KEY_VERSION}:{kind}:{ident}"
+
+
+def _cache_key(kind, ident):
+    return f"answer_key:{current_version(_version_name(kind, ident))}:{kind}:{ident}"
+
+
+def question_key_fields(question):
+    return (question.correct_answer, question.difficulty, question.topic_id)
+
+
+def stored_key_fields(question_id):
+    """The key fields a saved question currently has, or None."""
+    return Question.objects.filter(pk=question_id).values_list('correct_answer', 'difficulty', 'topic_id').first()
+
+
+def question_key_versions(question_ids):
+    """The versions of every cached key holding one of `question_ids`: their papers' and the question sets'."""
+    names = [ANSWER_KEY_VERSION]
+    for kind, through, paper_field in PAPERS:
+        names.extend(
+            _version_name(kind, paper_id)
+            for paper_id in through.objects.filter(question_id__in=list(question_ids)).values_list(
+                paper_field, flat=True
+            ).distinct()
+        )
+    return names
+
+
+def invalidate_question_keys(question_ids):
+    """Drops the cached keys holding any of `question_ids`, after their answer, difficulty or topic changed."""
+    if question_ids:
+        bump_versions(*question_key_versions(question_ids))
+
+
+def invalidate_paper_keys(kind, paper_ids):
+    """Drops the cached keys of these model exams or daily exams (`kind`), after their questions changed."""
+    bump_versions(*[_version_name(kind, paper_id) for paper_id in paper_ids])
+
+
+class AnswerKey:
+    """Parallel arrays of question ids, correct letters, difficulties and topic ids for one paper."""
+
+    __slots__ = ('question_ids', 'answers', 'difficulties', 'topic_ids')
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        self.question_ids = array('q', [row[0] for row in rows])
+        self.answers = tuple(row[1] or '' for row in rows)
+        self.difficulties = tuple(row[2] for row in rows)
+        self.topic_ids = array('q', [row[3] or 0 for row in rows])
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def sheet(self, answers):
+        """Lines `answers` ({question id (int or str): selected option}) up with the key; blanks are ''."""
+        answers = {str(question_id): selected for question_id, selected in answers.items()}
+        return [answers.get(str(question_id)) or '' for question_id in self.question_ids]
+
+    def marks(self, answers):
+        """Returns one bool per key entry: whether `answers` has the correct letter for it."""
+        return [bool(selected) and selected == correct for selected, correct in zip(self.sheet(answers), self.answers)]
+
+    def score(self, answers):
+        return sum(self.marks(answers))
+
+    def grade(self, answers):
+        """
+        Same result as grading.grade_sheet, but the questions are unsaved
+        Question stubs carrying only id, correct answer, difficulty and topic id,
+        which is all record_answers needs.
+        """
+        selections = self.sheet(answers)
+        return [
+            (
+                Question(id=question_id, correct_answer=correct, difficulty=difficulty, topic_id=topic_id or None),
+                selected,
+                bool(selected) and selected == correct,
+            )
+            for question_id, correct, difficulty, topic_id, selected in zip(
+                self.question_ids, self.answers, self.difficulties, self.topic_ids, selections
+            )
+        ]
+
+
+def _cached_key(kind, ident, queryset):
+    key = _cache_key(kind, ident)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = AnswerKey(queryset.order_by('id').values_list(*KEY_FIELDS))
+        cache.set(key, answer_key, _key_ttl())
+    return answer_key
+
+
+def model_exam_key(model_exam_id):
+    return _cached_key('model_exam', model_exam_id, Question.objects.filter(modelexam=model_exam_id))
+
+
+def daily_exam_key(daily_exam_id):
+    return _cached_key('daily_exam', daily_exam_id, Question.objects.filter(daily_exams=daily_exam_id))
+
+
+def question_set_key(question_ids):
+    """Key for an ad-hoc paper (e.g. a mock exam); ids that do not exist are left out."""
+    question_ids = sorted({int(question_id) for question_id in question_ids})
+    digest = hashlib.sha1(','.join(map(str, question_ids)).encode()).hexdigest()
+    return _cached_key('question_set', digest, Question.objects.filter(id__in=question_ids))
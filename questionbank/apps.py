@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class QuestionbankConfig(AppConfig):
@@ -7,3 +8,5 @@ class QuestionbankConfig(AppConfig):
 
     def ready(self):
         import questionbank.signals  # noqa: F401
+        from questionbank.syllabus_index import rebuild_after_migrate
+        post_migrate.connect(rebuild_after_migrate, sender=self)
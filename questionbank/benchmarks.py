@@ -0,0 +1,148 @@
+"""
+Synthetic dataset and timing helpers for the benchmark_* management commands.
+
+Everything here writes real rows; callers run it inside a transaction and roll
+back (see RollbackBenchmark) so a benchmark never leaves data behind.
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import Question, Topic, TopicProgress, UserAnswer, UserProfile
+from .question_state import rebuild_question_states
+
+BATCH_SIZE = 5000
+
+
+class RollbackBenchmark(Exception):
+    """Raised to roll back the synthetic dataset once timings are collected."""
+
+
+def seed_questions(total, topics, prefix='Benchmark'):
+    """Creates `topics` topics and `total` questions spread evenly over them. Returns the topics."""
+    tag = random.randint(0, 10**9)
+    topic_objs = [
+        Topic.objects.create(name=f"{prefix} Topic {i}", slug=f"{prefix.lower()}-topic-{i}-{tag}")
+        for i in range(topics)
+    ]
+    batch = []
+    for i in range(total):
+        batch.append(Question(
+            topic=topic_objs[i % len(topic_objs)],
+            text=f"{prefix} question {i}",
+            options={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+            correct_answer='A',
+            difficulty=('easy', 'medium', 'hard')[i % 3],
+        ))
+        if len(batch) == BATCH_SIZE:
+            Question.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Question.objects.bulk_create(batch)
+    return topic_objs
+
+
+def seed_answers(user, question_ids, days_ago=0, correct_ratio=0.7):
+    """Bulk-creates answers for `user` and rebuilds their derived answer tables."""
+    answered_at = timezone.now() - timedelta(days=days_ago)
+    answers = [
+        UserAnswer(
+            user=user, question_id=qid, selected_option='A',
+            is_correct=random.random() < correct_ratio, answered_at=answered_at,
+        )
+        for qid in question_ids
+    ]
+    UserAnswer.objects.bulk_create(answers, batch_size=BATCH_SIZE)
+    rebuild_question_states(user.id)
+
+
+def seed_dataset(questions_per_topic=2000, topics=10, users=20, answers_per_user=200):
+    """
+    Seeds a dataset for the engine benchmarks and returns the objects the
+    benchmark cases need:
+      users          -- `users` students with `answers_per_user` answers each
+      unseen_user    -- has unanswered questions in the first topic
+      stale_user     -- answered the whole first topic over 30 days ago
+      recent_user    -- answered the whole first topic today
+      weak_user      -- has a weak TopicProgress row for the first topic
+    """
+    topic_objs = seed_questions(questions_per_topic * topics, topics)
+    first_topic_ids = list(Question.objects.filter(topic=topic_objs[0]).values_list('id', flat=True))
+    all_ids = list(Question.objects.filter(topic__in=topic_objs).values_list('id', flat=True))
+
+    tag = random.randint(0, 10**9)
+
+    def make_user(name):
+        user = User.objects.create(username=f"bench_{name}_{tag}")
+        UserProfile.objects.get_or_create(user=user)
+        return User.objects.select_related('userprofile').get(pk=user.pk)
+
+    students = []
+    for i in range(users):
+        student = make_user(f"student{i}")
+        seed_answers(student, random.sample(all_ids, min(answers_per_user, len(all_ids))))
+        students.append(student)
+
+    unseen_user = make_user('unseen')
+    seed_answers(unseen_user, first_topic_ids[:len(first_topic_ids) // 2])
+    stale_user = make_user('stale')
+    seed_answers(stale_user, first_topic_ids, days_ago=40)
+    recent_user = make_user('recent')
+    seed_answers(recent_user, first_topic_ids)
+    weak_user = make_user('weak')
+    seed_answers(weak_user, first_topic_ids[:20], correct_ratio=0.2)
+    TopicProgress.objects.update_or_create(
+        user=weak_user, topic=topic_objs[0],
+        defaults={'total_attempted': 20, 'total_correct': 4}
+    )
+
+    return {
+        'topics': topic_objs,
+        'users': students,
+        'unseen_user': unseen_user,
+        'stale_user': stale_user,
+        'recent_user': recent_user,
+        'weak_user': weak_user,
+    }
+
+
+def time_call(fn, runs=5):
+    """
+    Runs `fn` `runs` times and returns median/min/max wall time in milliseconds
+    plus the number of SQL queries a single run issues.
+    """
+    timings = []
+    queries = 0
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = len(ctx.captured_queries)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': queries,
+    }
+
+
+def compare_results(baseline, current):
+    """
+    Yields (case, baseline stats, current stats, percent change of the median)
+    for every case present in both result files.
+    """
+    for name, now in current.get('cases', {}).items():
+        before = baseline.get('cases', {}).get(name)
+        if not before:
+            continue
+        change = 0.0
+        if before['median_ms']:
+            change = (now['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+        yield name, before, now, round(change, 1)
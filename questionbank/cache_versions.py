@@ -0,0 +1,40 @@
+"""
+Versions for cached data that is shared across worker processes.
+
+Cache entries are keyed on a version that writes bump. The versions live in
+CacheVersion rows rather than in the cache itself: with a per-process cache
+(the local-memory default) a version bumped in one gunicorn worker would
+otherwise never reach the others, which would keep serving stale entries.
+"""
+import time
+
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+def current_versions(*names):
+    """Returns {name: version} for `names` in one query; names never bumped are at 0."""
+    versions = dict(CacheVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    return {name: versions.get(name, 0) for name in names}
+
+
+def current_version(name):
+    return current_versions(name)[name]
+
+
+def bump_versions(*names):
+    """Moves every one of `names` to a new version with one UPDATE (plus an INSERT the first time)."""
+    names = set(names)
+    if not names:
+        return
+    versions = CacheVersion.objects.filter(name__in=names)
+    if versions.update(version=F('version') + 1) < len(names):
+        # First bump of some name: create the missing rows, then bump them all again
+        # (versions only have to change, so the rows that existed moving twice is harmless).
+        # New rows start from the clock, so entries cached before the rows were lost never match again.
+        start = time.time_ns()
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(name=name, version=start) for name in names], ignore_conflicts=True
+        )
+        versions.update(version=F('version') + 1)
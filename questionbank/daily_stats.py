@@ -0,0 +1,144 @@
+"""
+Per-user, per-day answer rollups (UserDailyStats) behind the progress dashboard.
+
+`rollup_daily_stats` folds the UserAnswer rows not yet marked `daily_folded`
+into the rollup in batches and marks them in the same transaction, like the
+question counter rollup, so answers committed out of id order are never
+skipped. Readers combine a user's rollup rows with their few unfolded answers,
+so the dashboard is exact without waiting for the job and its cost follows the
+days (and topics) a user has been active, not the number of answers.
+
+Rows are keyed by the answered questions' exam set (Question.exam_ids) at fold
+time; run `rollup_daily_stats --rebuild` after reshuffling questions between
+exams or topics on a large scale.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RollupCheckpoint, UserAnswer, UserDailyStats
+
+CHECKPOINT_NAME = 'daily_stats'
+ANSWER_FIELDS = ('user_id', 'answered_at', 'question__topic_id', 'question__exam_ids', 'is_correct')
+
+
+def tally(answers, correct_only=False):
+    """
+    Counts `answers` -- (user_id, answered_at, topic_id, Question.exam_ids,
+    is_correct) rows -- per (user_id, date, topic_id, exam_ids) as
+    [answered, correct]. With `correct_only`, each row is a correction: it adds
+    nothing to `answered` and +1/-1 to `correct` as is_correct is True/False.
+    """
+    counts = {}
+    for user_id, answered_at, topic_id, exam_ids, is_correct in answers:
+        key = (user_id, timezone.localtime(answered_at).date(), topic_id, exam_ids.strip(','))
+        entry = counts.setdefault(key, [0, 0])
+        if correct_only:
+            entry[1] += 1 if is_correct else -1
+        else:
+            entry[0] += 1
+            entry[1] += int(is_correct)
+    return counts
+
+
+def _apply(counts):
+    """Adds tallied counts to the rollup rows, creating the missing ones."""
+    if not counts:
+        return
+    existing = {
+        (row.user_id, row.date, row.topic_id, row.exam_ids): row
+        for row in UserDailyStats.objects.filter(
+            user_id__in={key[0] for key in counts}, date__in={key[1] for key in counts}
+        )
+    }
+    changed, created = [], []
+    for (user_id, date, topic_id, exam_ids), (answered, correct) in counts.items():
+        row = existing.get((user_id, date, topic_id, exam_ids))
+        if row is None:
+            created.append(UserDailyStats(
+                user_id=user_id, date=date, topic_id=topic_id, exam_ids=exam_ids,
+                answered=max(answered, 0), correct=max(correct, 0),
+            ))
+        else:
+            row.answered = max(row.answered + answered, 0)
+            row.correct = max(row.correct + correct, 0)
+            changed.append(row)
+    UserDailyStats.objects.bulk_update(changed, ['answered', 'correct'])
+    UserDailyStats.objects.bulk_create(created)
+
+
+def lock_folded_answers():
+    """
+    Locks the rollup until the end of the current transaction and returns the
+    answers it has folded, for rebuilds that must not race it.
+    """
+    RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT_NAME)
+    return UserAnswer.objects.filter(daily_folded=True)
+
+
+def pending_answers(user_id, *fields):
+    """The user's answers not folded yet, as `fields` tuples: what readers add to the rollups."""
+    return UserAnswer.objects.filter(user_id=user_id, daily_folded=False).values_list(*fields)
+
+
+def rollup_daily_stats(batch_size=50000):
+    """
+    Folds every UserAnswer not folded yet into the daily rollup, in batches of
+    `batch_size` answers.
+    Returns the number of answers folded.
+    """
+    folded = 0
+    while True:
+        with transaction.atomic():
+            # The lock row serialises concurrent runs
+            RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT_NAME)
+            ready = list(UserAnswer.objects.filter(daily_folded=False).order_by('id').values_list(
+                'id', *ANSWER_FIELDS
+            )[:batch_size])
+            if not ready:
+                break
+            _apply(tally(row[1:] for row in ready))
+            UserAnswer.objects.filter(id__in=[row[0] for row in ready]).update(daily_folded=True)
+            folded += len(ready)
+        if len(ready) < batch_size:
+            break
+    return folded
+
+
+def reset_daily_stats():
+    """
+    Drops every rollup row and unmarks every answer, so the next rollup refolds
+    all answers.
+    """
+    with transaction.atomic():
+        lock_folded_answers().update(daily_folded=False)
+        UserDailyStats.objects.all().delete()
+
+
+def correct_folded_answers(flips):
+    """
+    Moves the correct counts of answers whose is_correct was flipped after being
+    folded in. `flips` are (answer id, user_id, answered_at, topic_id,
+    Question.exam_ids, now_correct); answers not folded yet are left for the
+    rollup. Must run inside the transaction that flips them.
+    """
+    folded = set(lock_folded_answers().filter(id__in=[flip[0] for flip in flips]).values_list('id', flat=True))
+    _apply(tally((flip[1:] for flip in flips if flip[0] in folded), correct_only=True))
+
+
+def user_day_counts(user_id):
+    """
+    The user's answers per (date, topic_id, exam_ids) as [answered, correct]:
+    the rollup rows plus the answers not folded in yet.
+    """
+    counts = {}
+    for date, topic_id, exam_ids, answered, correct in UserDailyStats.objects.filter(user_id=user_id).values_list(
+        'date', 'topic_id', 'exam_ids', 'answered', 'correct'
+    ):
+        entry = counts.setdefault((date, topic_id, exam_ids), [0, 0])
+        entry[0] += answered
+        entry[1] += correct
+    for (_, date, topic_id, exam_ids), (answered, correct) in tally(pending_answers(user_id, *ANSWER_FIELDS)).items():
+        entry = counts.setdefault((date, topic_id, exam_ids), [0, 0])
+        entry[0] += answered
+        entry[1] += correct
+    return counts
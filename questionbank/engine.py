@@ -1,7 +1,47 @@
-from datetime import timedelta
+import random
 from django.utils import timezone
-from django.db.models import Q, F, Max
+from django.db.models import Q, F, Case, When, Value, IntegerField, FilteredRelation
 from .models import Question, UserAnswer, TopicProgress
+from .sampling import sample, sample_ids, random_order
+from .exam_graph import related_exams
+from .syllabus_index import syllabus_topic_ids
+from .exam_membership import in_exams
+
+# Cohort selection draws this many unseen candidates per wanted question, shared by a pool's users
+COHORT_OVERSAMPLE = 2
+
+
+def _draw(pool, k, accept):
+    """
+    Returns up to `k` random items of `pool` for which `accept` is true.
+    Probes random positions first (cheap when most of the pool qualifies) and
+    scans the pool only when the qualifying items are sparse.
+    """
+    picked, tried = [], set()
+    if k <= 0 or not pool:
+        return picked
+    for _ in range(k * 4):
+        if len(picked) >= k or len(tried) >= len(pool):
+            break
+        i = random.randrange(len(pool))
+        if i in tried:
+            continue
+        tried.add(i)
+        if accept(pool[i]):
+            picked.append(pool[i])
+    if len(picked) < k:
+        taken = set(picked)
+        rest = [item for item in pool if item not in taken and accept(item)]
+        picked += random.sample(rest, min(k - len(picked), len(rest)))
+    return picked
+
+
+def _prefer_unassigned(ordered, k, assigned):
+    """Takes the first `k` of `ordered`, skipping assigned items while others remain."""
+    fresh = [item for item in ordered if item not in assigned]
+    if len(fresh) >= k:
+        return fresh[:k]
+    return fresh + [item for item in ordered if item in assigned][:k - len(fresh)]
 
 
 class QuestionEngine:
@@ -10,41 +50,148 @@ class QuestionEngine:
     All question delivery goes through this class.
     """
 
-    @staticmethod
-    def _resolve_similar_exams(exams_queryset):
-        from .models import Exam
-        if not exams_queryset.exists():
-            return Exam.objects.none()
-            
-        q_obj = Q()
-        for exam in exams_queryset:
-            q_obj |= Q(id=exam.id)
-            words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-            if words:
-                sub_q = Q()
-                for word in words:
-                    sub_q |= Q(name__icontains=word)
-                q_obj |= sub_q
-                
-        return Exam.objects.filter(q_obj).distinct()
-
     @staticmethod
     def get_questions_for_user(user, filters: dict, limit: int = None):
         """
         Returns questions filtered by criteria, prioritizing:
         1. Questions never answered by the user
-        2. Questions not answered in the last 30 days
-        3. Fallback: least-recently-answered questions (oldest answered_at timestamp)
+        2. Questions due for review on the user's spaced-repetition schedule
+        3. Fallback: questions due soonest (then least-recently answered)
+        Only the best tier that has candidates is returned.
+        """
+        profile = None
+        if user and user.is_authenticated and hasattr(user, 'userprofile'):
+            profile = user.userprofile
+
+        queryset = QuestionEngine._candidate_queryset(
+            filters,
+            institute=profile.institute if profile else None,
+            preferred_exams=profile.preferred_exams.all() if profile and not filters.get('exam_ids') else None,
+            # Fall back to user's preferred language if no explicit language filter is provided
+            language=filters.get('language') or (getattr(profile, 'preferred_language', None) if profile else None),
+        )
+
+        if user and user.is_authenticated:
+            return QuestionEngine._top_tier(QuestionEngine._user_tiers(queryset, user), limit)
+        else:
+            # Anonymous user: return random questions matching the filters
+            if limit:
+                return sample(queryset, limit)
+            return random_order(queryset)
+
+    @staticmethod
+    def get_questions_for_users(users, filters: dict, limit: int, overlap: bool = True):
+        """
+        Picks up to `limit` questions for each of `users` (User objects or ids) with
+        the same tiering as get_questions_for_user, using a handful of queries for
+        the whole cohort: profiles are loaded in bulk, users with the same tenancy,
+        exam preferences and language share one candidate pool, their history in
+        the pool comes from one UserQuestionState query per pool, and unseen
+        questions are dealt from one random draw per pool (a user the draw cannot
+        serve gets their own indexed sample).
+        With overlap=False, questions already given to someone else in the cohort
+        are only reused once the unassigned ones run out.
+        Returns {user_id: [Question, ...]}.
+        """
+        from .models import Exam, UserProfile, UserQuestionState
+        user_ids = list(dict.fromkeys(getattr(u, 'pk', u) for u in users))
+        profiles = {
+            p.user_id: p
+            for p in UserProfile.objects.filter(user_id__in=user_ids).prefetch_related('preferred_exams')
+        }
+
+        pools = {}
+        for user_id in user_ids:
+            profile = profiles.get(user_id)
+            exam_ids = ()
+            if profile and not filters.get('exam_ids'):
+                exam_ids = tuple(sorted(exam.id for exam in profile.preferred_exams.all()))
+            language = filters.get('language') or (profile.preferred_language if profile else None)
+            key = (profile.institute_id if profile else None, exam_ids, language)
+            pools.setdefault(key, []).append(user_id)
+
+        now = timezone.now()
+        assigned = set()
+        picks = {}
+        for (institute_id, exam_ids, language), pool_user_ids in pools.items():
+            candidates = QuestionEngine._candidate_queryset(
+                filters,
+                institute=institute_id,
+                preferred_exams=Exam.objects.filter(id__in=exam_ids),
+                language=language,
+            )
+            pool_size = candidates.count()
+            if not pool_size:
+                continue
+            history = {}
+            for user_id, question_id, last_answered, due_at in UserQuestionState.objects.filter(
+                user_id__in=pool_user_ids, question_id__in=candidates.values('id'),
+            ).values_list('user_id', 'question_id', 'last_answered_at', 'due_at'):
+                history.setdefault(user_id, {})[question_id] = (due_at or last_answered, last_answered)
+            wanted = len(pool_user_ids) * limit * COHORT_OVERSAMPLE
+            if pool_size <= wanted:
+                drawn = list(candidates.values_list('id', flat=True))
+            else:
+                drawn = sample_ids(candidates, wanted)
+
+            for user_id in pool_user_ids:
+                seen = history.get(user_id, {})
+                if len(seen) < pool_size:
+                    tier, accept = drawn, (lambda qid, seen=seen: qid not in seen)
+                else:
+                    due = [qid for qid, (due_at, _) in seen.items() if due_at <= now]
+                    if due:
+                        tier, accept = due, (lambda qid: True)
+                    else:
+                        tier = sorted(seen, key=seen.get)
+                        picks[user_id] = _prefer_unassigned(tier, limit, assigned if not overlap else ())
+                        assigned.update(picks[user_id])
+                        continue
+
+                chosen = []
+                if not overlap:
+                    chosen = _draw(tier, limit, lambda qid: accept(qid) and qid not in assigned)
+                if len(chosen) < limit:
+                    taken = set(chosen)
+                    chosen += _draw(tier, limit - len(chosen), lambda qid: accept(qid) and qid not in taken)
+                if len(chosen) < limit and tier is drawn and len(drawn) < pool_size:
+                    # The shared draw ran out of questions this user has not seen
+                    unseen = candidates.annotate(
+                        state=FilteredRelation('user_states', condition=Q(user_states__user_id=user_id)),
+                    ).filter(state__id__isnull=True).exclude(id__in=chosen)
+                    chosen += sample_ids(unseen, limit - len(chosen))
+                picks[user_id] = chosen
+                assigned.update(chosen)
+
+        questions = Question.objects.in_bulk(assigned)
+        return {
+            user_id: [questions[qid] for qid in picks.get(user_id, []) if qid in questions]
+            for user_id in user_ids
+        }
+
+    @staticmethod
+    def get_questions_for_batch(batch, filters: dict, limit: int, overlap: bool = True):
+        """Cohort selection for every student in an institutes.Batch."""
+        user_ids = batch.memberships.values_list('student_profile__user_id', flat=True)
+        return QuestionEngine.get_questions_for_users(list(user_ids), filters, limit, overlap=overlap)
+
+    @staticmethod
+    def _candidate_queryset(filters: dict, institute=None, preferred_exams=None, language=None):
+        """
+        Builds the candidate question queryset for `filters`, shared by single-user
+        and cohort selection. `institute` adds tenant questions, `preferred_exams`
+        (an Exam queryset) applies when no exam filter is given, and `language`
+        is the effective language.
         """
         # Base query to support tenant-aware (institute) questions
         base_query = Q(institute__isnull=True)
-        if user and user.is_authenticated and hasattr(user, 'userprofile') and user.userprofile.institute:
-            base_query |= Q(institute=user.userprofile.institute)
+        if institute:
+            base_query |= Q(institute=institute)
 
         queryset = Question.objects.filter(base_query)
 
         # Apply content filters
-        from .models import Exam, Topic
+        from .models import Exam
         target_exams = Exam.objects.none()
         
         exam_query = filters.get('exam_id') or filters.get('exam')
@@ -59,33 +206,19 @@ class QuestionEngine:
                     Q(name__icontains=clean_q)
                 )
             if exam_obj.exists():
-                target_exams = QuestionEngine._resolve_similar_exams(exam_obj)
-        elif user and user.is_authenticated and not filters.get('exam_ids') and hasattr(user, 'userprofile'):
-            user_prefs = user.userprofile.preferred_exams.all()
-            if user_prefs.exists():
-                target_exams = QuestionEngine._resolve_similar_exams(user_prefs)
+                target_exams = related_exams(exam_obj)
+        elif preferred_exams is not None and preferred_exams.exists():
+            target_exams = related_exams(preferred_exams)
                 
         if target_exams.exists():
-            queryset = queryset.filter(exams__in=target_exams)
+            queryset = queryset.filter(in_exams(target_exams.values_list('id', flat=True)))
             
             # Filter strictly by syllabus topics if configured in syllabus_db
-            from .syllabus_db import resolve_exam_slug, SYLLABUS_DATABASE
-            allowed_topics = set()
-            for exam in target_exams:
-                slug_key = resolve_exam_slug(exam.slug)
-                if slug_key and slug_key in SYLLABUS_DATABASE:
-                    for item in SYLLABUS_DATABASE[slug_key]['syllabus']:
-                        allowed_topics.add(item['topic'].lower())
-            
-            if allowed_topics:
-                q_topic_filter = Q()
-                for topic_name in allowed_topics:
-                    q_topic_filter |= Q(topic__name__icontains=topic_name) | Q(sub_topic__icontains=topic_name)
-                filtered_qs = queryset.filter(q_topic_filter)
+            allowed_topic_ids = syllabus_topic_ids(target_exams)
+            if allowed_topic_ids:
+                filtered_qs = queryset.filter(topic_id__in=allowed_topic_ids)
                 if filtered_qs.exists():
                     queryset = filtered_qs
-                
-            queryset = queryset.distinct()
 
         # Handle explicit topic query (topic_id, topic_name, topic, sub_topic)
         topic_query = filters.get('topic_id') or filters.get('topic') or filters.get('topic_name')
@@ -110,56 +243,71 @@ class QuestionEngine:
         if filters.get('exclude_ids'):
             queryset = queryset.exclude(id__in=filters['exclude_ids'])
 
-        # Fall back to user's preferred language if no explicit language filter is provided
-        language_filter = filters.get('language')
-        if not language_filter and user and user.is_authenticated and hasattr(user, 'userprofile'):
-            language_filter = getattr(user.userprofile, 'preferred_language', None)
-            
-        if language_filter:
-            queryset = queryset.filter(language=language_filter)
-
+        if language:
+            queryset = queryset.filter(language=language)
+        return queryset
 
-        if user and user.is_authenticated:
-            # Get all question IDs answered by this user
-            answered_ids = UserAnswer.objects.filter(
-                user=user
-            ).values_list('question_id', flat=True).distinct()
-
-            # Pool 1: Never answered questions
-            unseen = queryset.exclude(id__in=answered_ids)
-
-            # Check if there are unseen questions
-            if unseen.exists():
-                if limit:
-                    return unseen.order_by('?')[:limit]
-                return unseen.order_by('?')
-
-            # Pool 2: Questions not answered in the last 30 days
-            stale_cutoff = timezone.now() - timedelta(days=30)
-            stale_questions = queryset.annotate(
-                user_last_answered=Max('user_answers__answered_at', filter=Q(user_answers__user=user))
-            ).filter(
-                user_last_answered__lt=stale_cutoff
-            )
+    @staticmethod
+    def _user_tiers(queryset, user):
+        """
+        Splits the candidates into the user's tiers, each a separate queryset:
+        unseen (no UserQuestionState row), due for review, and not due yet.
+        Unseen and due questions are drawn at random through the indexed
+        random_key; the rest come out by due date, then least-recently-answered.
+        """
+        now = timezone.now()
+        unseen = queryset.annotate(
+            state=FilteredRelation('user_states', condition=Q(user_states__user=user)),
+        ).filter(state__id__isnull=True)
+        seen = queryset.filter(user_states__user=user)
+        return [
+            (unseen, True),
+            (seen.filter(user_states__due_at__lte=now), True),
+            (seen.order_by('user_states__due_at', 'user_states__last_answered_at'), False),
+        ]
 
-            if stale_questions.exists():
-                if limit:
-                    return stale_questions.order_by('?')[:limit]
-                return stale_questions.order_by('?')
+    @staticmethod
+    def _top_tier(tiers, limit):
+        """
+        Returns the candidates of the best non-empty tier. With a limit every tier
+        is one or two LIMIT queries (a random_key pivot seek, or the due-date
+        order), stopping at the first tier that returns rows.
+        """
+        for tier, shuffled in tiers:
+            if not limit:
+                if tier.exists():
+                    return random_order(tier) if shuffled else tier
+                continue
+            if shuffled:
+                ids = sample_ids(tier, limit)
+            else:
+                ids = list(tier.values_list('id', flat=True)[:limit])
+            if ids:
+                return QuestionEngine._in_order(ids)
+        return Question.objects.none()
 
-            # Pool 3: Fallback - absolute oldest answered first (least-recently-answered)
-            fallback_questions = queryset.annotate(
-                user_last_answered=Max('user_answers__answered_at', filter=Q(user_answers__user=user))
-            ).order_by('user_last_answered')
+    @staticmethod
+    def _in_order(ids):
+        """Returns the questions with these ids as a queryset ordered like `ids`."""
+        if not ids:
+            return Question.objects.none()
+        return Question.objects.filter(id__in=ids).order_by(
+            Case(*[When(id=qid, then=Value(pos)) for pos, qid in enumerate(ids)], output_field=IntegerField())
+        )
 
-            if limit:
-                return fallback_questions[:limit]
-            return fallback_questions
-        else:
-            # Anonymous user: return random questions matching the filters
-            if limit:
-                return queryset.order_by('?')[:limit]
-            return queryset.order_by('?')
+    @staticmethod
+    def get_due_reviews(user, limit: int = 20, language: str = None):
+        """
+        Returns the user's questions that are due on their spaced-repetition
+        schedule, most overdue first: one range scan of the (user, due_at) index.
+        """
+        if not user or not user.is_authenticated:
+            return Question.objects.none()
+        from .models import UserQuestionState
+        due = UserQuestionState.objects.filter(user=user, due_at__lte=timezone.now())
+        if language:
+            due = due.filter(question__language=language)
+        return QuestionEngine._in_order(list(due.order_by('due_at').values_list('question_id', flat=True)[:limit]))
 
     @staticmethod
     def get_weak_area_questions(user, limit: int = 20, language: str = None):
@@ -186,10 +334,10 @@ class QuestionEngine:
 
 
     @staticmethod
-    def get_daily_quiz(user, limit: int = 10, language: str = None):
+    def get_daily_quiz(user, limit: int = 10, language: str = None, exclude_ids=()):
         """Returns today's daily quiz questions — unique per user per day."""
         if not user or not user.is_authenticated:
-            filters = {}
+            filters = {'exclude_ids': list(exclude_ids)}
             if language:
                 filters['language'] = language
             return QuestionEngine.get_questions_for_user(user, filters=filters, limit=limit)
@@ -202,7 +350,7 @@ class QuestionEngine:
             answered_at__date=today
         ).values_list('question_id', flat=True)
 
-        filters = {'exclude_ids': list(answered_today_ids)}
+        filters = {'exclude_ids': list(answered_today_ids) + list(exclude_ids)}
         if language:
             filters['language'] = language
 
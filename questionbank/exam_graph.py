@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models import Q, QuerySet
+
+from .models import Exam
+
+RelatedExam = Exam.related_exams.through
+
+
+def exam_name_words(name):
+    """Words (longer than two characters) used to match an exam against other exam names."""
+    return [w for w in name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
+
+
+def _shares_word(words, name):
+    lowered = name.lower()
+    return any(word.lower() in lowered for word in words)
+
+
+def build_edges(exams):
+    """
+    Returns (from_id, to_id) pairs for a list of (id, name) tuples: an exam is
+    related to every other exam whose name contains one of its words.
+    """
+    words = {exam_id: exam_name_words(name) for exam_id, name in exams}
+    return [
+        (from_id, to_id)
+        for from_id, _ in exams
+        for to_id, to_name in exams
+        if from_id != to_id and _shares_word(words[from_id], to_name)
+    ]
+
+
+def refresh_related_exams(exam):
+    """Recomputes every edge touching `exam`. Called when an exam is created or renamed."""
+    own_words = exam_name_words(exam.name)
+    outgoing, incoming = [], []
+    for other_id, other_name in Exam.objects.exclude(pk=exam.pk).values_list('id', 'name'):
+        if _shares_word(own_words, other_name):
+            outgoing.append(other_id)
+        if _shares_word(exam_name_words(other_name), exam.name):
+            incoming.append(other_id)
+
+    with transaction.atomic():
+        RelatedExam.objects.filter(Q(from_exam_id=exam.pk) | Q(to_exam_id=exam.pk)).delete()
+        RelatedExam.objects.bulk_create(
+            [RelatedExam(from_exam_id=exam.pk, to_exam_id=other_id) for other_id in outgoing] +
+            [RelatedExam(from_exam_id=other_id, to_exam_id=exam.pk) for other_id in incoming]
+        )
+
+
+def rebuild_exam_graph():
+    """Recomputes the whole graph from the current exam names."""
+    edges = build_edges(list(Exam.objects.values_list('id', 'name')))
+    with transaction.atomic():
+        RelatedExam.objects.all().delete()
+        RelatedExam.objects.bulk_create(
+            [RelatedExam(from_exam_id=from_id, to_exam_id=to_id) for from_id, to_id in edges],
+            batch_size=1000
+        )
+    from .mock_exam import invalidate_blueprints
+    invalidate_blueprints()
+    return len(edges)
+
+
+def related_exams(exams):
+    """
+    Returns a queryset of the given exams plus every exam related to them.
+    `exams` may be a single Exam, an Exam queryset, or an iterable of Exams / ids.
+    Resolves through the indexed related-exams table in a single query.
+    """
+    if isinstance(exams, Exam):
+        exam_ids = [exams.pk]
+    elif isinstance(exams, QuerySet):
+        exam_ids = exams.values('id')
+    else:
+        exam_ids = [getattr(e, 'pk', e) for e in exams]
+
+    return Exam.objects.filter(
+        Q(id__in=exam_ids) |
+        Q(id__in=RelatedExam.objects.filter(from_exam_id__in=exam_ids).values('to_exam_id'))
+    )
+
+
+def related_exam_map():
+    """Returns {exam_id: set of related exam ids, including itself} for every exam, in two queries."""
+    graph = {exam_id: {exam_id} for exam_id in Exam.objects.values_list('id', flat=True)}
+    for from_id, to_id in RelatedExam.objects.values_list('from_exam_id', 'to_exam_id'):
+        graph.setdefault(from_id, {from_id}).add(to_id)
+    return graph
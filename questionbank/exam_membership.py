@@ -0,0 +1,67 @@
+"""
+Denormalized question-to-exam membership (Question.exam_ids).
+
+Every question carries its exam ids as one delimited string (',3,7,'), kept in
+sync with the `Question.exams` M2M by the signals in questionbank.signals. The
+daily stats rollup and exam analytics key rows on that column. Exam scoped
+filtering (`in_exams`) goes through the M2M table in an EXISTS instead, which
+its indexes serve and which, unlike a join, never fans a question in several
+exams out into duplicate rows that need a DISTINCT.
+"""
+from django.db.models import Exists, OuterRef
+
+from .models import Question
+
+
+def encode(exam_ids):
+    exam_ids = sorted(set(exam_ids))
+    return f",{','.join(map(str, exam_ids))}," if exam_ids else ''
+
+
+def decode(value):
+    return [int(exam_id) for exam_id in value.split(',') if exam_id]
+
+
+def in_exams(exam_ids, question_field='pk'):
+    """
+    Condition matching rows whose question (`question_field`: 'pk' on Question,
+    or a question id column such as 'question_id') is in any of `exam_ids` (ids
+    or a values_list subquery). An EXISTS over the M2M table, served per
+    question by its unique (question_id, exam_id) key and, from the exam side,
+    by the (exam_id, question_id) index of migration 0063.
+    """
+    return Exists(Question.exams.through.objects.filter(question_id=OuterRef(question_field), exam_id__in=exam_ids))
+
+
+def refresh_exam_ids(question_ids):
+    """
+    Recomputes exam_ids of `question_ids` from the M2M, one UPDATE per distinct
+    value. Returns {question id: exam_ids}.
+    """
+    question_ids = set(question_ids)
+    if not question_ids:
+        return {}
+    memberships = {question_id: [] for question_id in question_ids}
+    for question_id, exam_id in Question.exams.through.objects.filter(
+        question_id__in=question_ids
+    ).values_list('question_id', 'exam_id'):
+        memberships[question_id].append(exam_id)
+
+    by_value = {}
+    for question_id, exam_ids in memberships.items():
+        by_value.setdefault(encode(exam_ids), []).append(question_id)
+    for value, ids in by_value.items():
+        Question.objects.filter(id__in=ids).exclude(exam_ids=value).update(exam_ids=value)
+    return {question_id: encode(exam_ids) for question_id, exam_ids in memberships.items()}
+
+
+def rebuild_exam_ids(batch_size=2000):
+    """Recomputes exam_ids of every question. Returns the number of questions processed."""
+    processed, last_id = 0, 0
+    while True:
+        ids = list(Question.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return processed
+        refresh_exam_ids(ids)
+        processed += len(ids)
+        last_id = ids[-1]
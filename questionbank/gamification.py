@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.utils import timezone
 from .models import UserProfile
 from datetime import timedelta
@@ -13,14 +14,19 @@ def award_xp(user, amount):
     except UserProfile.DoesNotExist:
         profile = UserProfile.objects.create(user=user)
         
-    old_level = profile.level
-    profile.total_xp += amount
-    
-    # 1 level per 100 XP
-    new_level = (profile.total_xp // 100) + 1
-    profile.level = new_level
-    
-    profile.save(update_fields=['total_xp', 'level'])
+    with transaction.atomic():
+        # Reread under a lock: mission XP may have been granted since the profile was loaded
+        profile.total_xp, profile.level = UserProfile.objects.select_for_update().values_list(
+            'total_xp', 'level'
+        ).get(pk=profile.pk)
+        old_level = profile.level
+        profile.total_xp += amount
+
+        # 1 level per 100 XP
+        new_level = (profile.total_xp // 100) + 1
+        profile.level = new_level
+
+        profile.save(update_fields=['total_xp', 'level'])
     
     level_up = new_level > old_level
     return amount, level_up, new_level
@@ -0,0 +1,128 @@
+"""
+Grading for every answer-sheet submission (mock exams, daily and model exams,
+practice sessions). Answers are bulk-inserted and their side effects --
+TopicProgress, the activity calendar, the weekly missions and the per-question
+states -- are applied once per sheet in a fixed number of statements instead
+of once per answer.
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .activity import add_activity, answer_days
+from .models import TopicProgress, UserAnswer
+from .question_state import refresh_question_states
+from .user_cache import bump_user_data
+from .weekly_missions import count_answers
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def grade_sheet(questions, answers):
+    """
+    Grades `answers` ({question id (int or str): selected option}) against
+    `questions`. Returns [(question, selected, is_correct)] for every question
+    in order; unanswered questions have an empty selection and are not correct.
+    """
+    answers = {str(question_id): selected for question_id, selected in answers.items()}
+    graded = []
+    for question in questions:
+        selected = answers.get(str(question.id)) or ''
+        graded.append((question, selected, bool(selected) and selected == question.correct_answer))
+    return graded
+
+
+def percentage_score(graded):
+    """
+    The stored score of a graded model or daily exam sheet (see grade_sheet):
+    the percentage of its questions answered correctly.
+    """
+    return sum(1 for _, _, is_correct in graded if is_correct) / len(graded) * 100 if graded else 0
+
+
+def apply_topic_progress(user_id, results):
+    """
+    Adds `results` -- (question, is_correct) pairs -- to the user's TopicProgress
+    rows: one INSERT for rows that do not exist yet and one UPDATE applying the
+    per-topic increments.
+    """
+    increments = {}
+    for question, is_correct in results:
+        if not question.topic_id:
+            continue
+        counts = increments.setdefault(question.topic_id, {})
+        fields = ['total']
+        if question.difficulty in DIFFICULTIES:
+            fields.append(question.difficulty)
+        for field in fields:
+            counts[f"{field}_attempted"] = counts.get(f"{field}_attempted", 0) + 1
+            counts[f"{field}_correct"] = counts.get(f"{field}_correct", 0) + int(is_correct)
+    if not increments:
+        return
+
+    updates = {}
+    for field in [f"{d}_{kind}" for d in ('total',) + DIFFICULTIES for kind in ('attempted', 'correct')]:
+        whens = [
+            When(topic_id=topic_id, then=Value(counts[field]))
+            for topic_id, counts in increments.items() if counts.get(field)
+        ]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+    with transaction.atomic():
+        TopicProgress.objects.bulk_create(
+            [TopicProgress(user_id=user_id, topic_id=topic_id) for topic_id in increments],
+            ignore_conflicts=True,
+        )
+        TopicProgress.objects.filter(user_id=user_id, topic_id__in=list(increments)).update(
+            last_practiced=timezone.now(), **updates
+        )
+
+
+def record_answers(user, graded, answered_at=None):
+    """
+    Saves the answered entries of a graded sheet (see grade_sheet) as UserAnswer
+    rows with one bulk insert and applies their side effects once. bulk_create
+    skips the UserAnswer signals, so everything they would do happens here.
+    `answered_at` optionally gives each entry's answer time (default: now).
+    Returns the created answers.
+    """
+    now = timezone.now()
+    times = answered_at or [now] * len(graded)
+    answered = [
+        (question, selected, is_correct, at)
+        for (question, selected, is_correct), at in zip(graded, times) if selected
+    ]
+    if not answered:
+        return []
+    with transaction.atomic():
+        created = UserAnswer.objects.bulk_create([
+            UserAnswer(
+                user=user, question=question, selected_option=selected, is_correct=is_correct, answered_at=at,
+                difficulty=question.difficulty or '',
+            )
+            for question, selected, is_correct, at in answered
+        ])
+        apply_topic_progress(user.id, [(question, is_correct) for question, _, is_correct, _ in answered])
+        add_activity(answer_days((user.id, at) for _, _, _, at in answered))
+        count_answers([(user.id, question.id, at, is_correct) for question, _, is_correct, at in answered])
+    question_ids = [question.id for question, _, _, _ in answered]
+    refresh_question_states([user.id], question_ids)
+    bump_user_data(user.id)
+    return created
+
+
+def award_submission(user, xp_earned):
+    """Awards the XP for a submitted sheet once and updates the streak. Returns the gamification payload."""
+    from .gamification import award_xp, update_streak
+    _, level_up, new_level = award_xp(user, xp_earned)
+    current_streak, longest_streak, freeze_used, streak_promo_awarded = update_streak(user)
+    return {
+        'xp_earned': xp_earned,
+        'level_up': level_up,
+        'new_level': new_level,
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'freeze_used': freeze_used,
+        'streak_promo_awarded': streak_promo_awarded,
+    }
@@ -0,0 +1,125 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from questionbank.benchmarks import RollbackBenchmark, compare_results, seed_dataset, time_call
+from questionbank.engine import QuestionEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark QuestionEngine paths (per pool tier), weak areas, the daily quiz and the "
+        "practice start/submit endpoints on a synthetic dataset that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions-per-topic', type=int, default=2000, help='Questions per topic (default 2000)')
+        parser.add_argument('--topics', type=int, default=10, help='Topics to create (default 10)')
+        parser.add_argument('--users', type=int, default=20, help='Students with random answer history (default 20)')
+        parser.add_argument('--answers-per-user', type=int, default=200, help='Answers per student (default 200)')
+        parser.add_argument('--limit', type=int, default=20, help='Questions requested per call (default 20)')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per case (default 5)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='Compare against a previous --output JSON file')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        results = {}
+        try:
+            with transaction.atomic():
+                results = self.run_benchmark(options)
+                raise RollbackBenchmark()
+        except RollbackBenchmark:
+            self.stdout.write("Synthetic rows rolled back.")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline:
+            self.stdout.write(f"\nCompared with {options['compare']}:")
+            for name, before, now, change in compare_results(baseline, results):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS
+                self.stdout.write(style(
+                    f"{name:<24} {before['median_ms']:>9.2f} -> {now['median_ms']:>9.2f} ms ({change:+.1f}%)   "
+                    f"queries {before['queries']} -> {now['queries']}"
+                ))
+
+    def run_benchmark(self, options):
+        limit, runs = options['limit'], options['runs']
+        self.stdout.write(
+            f"Seeding {options['topics']} topics x {options['questions_per_topic']} questions, "
+            f"{options['users']} users x {options['answers_per_user']} answers on {connection.vendor}..."
+        )
+        data = seed_dataset(
+            questions_per_topic=options['questions_per_topic'],
+            topics=options['topics'],
+            users=options['users'],
+            answers_per_user=options['answers_per_user'],
+        )
+        topic_filter = {'topic_id': data['topics'][0].id}
+        student = data['users'][0] if data['users'] else data['unseen_user']
+
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user=student)
+
+        def practice_start():
+            response = client.post('/api/practice/start/', {'topic_slug': data['topics'][0].slug, 'count': limit}, format='json')
+            assert response.status_code == 201, response.status_code
+            return response.data
+
+        def practice_submit():
+            started = practice_start()
+            answers = [
+                {'question_id': q['id'], 'selected_option': 'A', 'time_spent_secs': 5}
+                for q in started['questions']
+            ]
+            response = client.post(
+                f"/api/practice/{started['session_id']}/submit/",
+                {'answers': answers, 'total_time_secs': 5 * len(answers)}, format='json'
+            )
+            assert response.status_code == 200, response.status_code
+
+        cases = {
+            'engine_unseen': lambda: list(QuestionEngine.get_questions_for_user(data['unseen_user'], topic_filter, limit)),
+            'engine_stale': lambda: list(QuestionEngine.get_questions_for_user(data['stale_user'], topic_filter, limit)),
+            'engine_recent': lambda: list(QuestionEngine.get_questions_for_user(data['recent_user'], topic_filter, limit)),
+            'engine_anonymous': lambda: list(QuestionEngine.get_questions_for_user(None, topic_filter, limit)),
+            'weak_area': lambda: list(QuestionEngine.get_weak_area_questions(data['weak_user'], limit=limit)),
+            'daily_quiz': lambda: list(QuestionEngine.get_daily_quiz(student, limit=limit)),
+            'cohort': lambda: QuestionEngine.get_questions_for_users(data['users'], topic_filter, limit),
+            'practice_start': practice_start,
+            'practice_start_submit': practice_submit,
+        }
+
+        results = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'dataset': {
+                key: options[key] for key in ('questions_per_topic', 'topics', 'users', 'answers_per_user')
+            },
+            'limit': limit,
+            'runs': runs,
+            'cases': {},
+        }
+        for name, fn in cases.items():
+            stats = time_call(fn, runs)
+            results['cases'][name] = stats
+            self.stdout.write(
+                f"{name:<24} median {stats['median_ms']:>9.2f} ms  "
+                f"(min {stats['min_ms']:.2f}, max {stats['max_ms']:.2f})  {stats['queries']:>4} queries"
+            )
+        return results
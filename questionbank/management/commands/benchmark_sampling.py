@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from questionbank.benchmarks import RollbackBenchmark, seed_questions, time_call
+from questionbank.models import Question
+from questionbank.sampling import sample
+
+
+class Command(BaseCommand):
+    help = "Benchmark ORDER BY RANDOM() against indexed random sampling on a synthetic question table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=1000000, help='Synthetic questions to create (default 1,000,000)')
+        parser.add_argument('--topics', type=int, default=50, help='Topics to spread the questions over (default 50)')
+        parser.add_argument('--k', type=int, default=100, help='Rows to sample per run (default 100)')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per case (default 5)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic rows instead of rolling them back')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                results = self.run_benchmark(options)
+                if not options['keep']:
+                    raise RollbackBenchmark()
+        except RollbackBenchmark:
+            self.stdout.write("Synthetic rows rolled back.")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_benchmark(self, options):
+        total, k, runs = options['questions'], options['k'], options['runs']
+        self.stdout.write(f"Seeding {total} questions over {options['topics']} topics...")
+        topics = seed_questions(total, options['topics'])
+
+        topic_ids = [t.id for t in topics]
+        cases = {
+            'all_questions': lambda: Question.objects.all(),
+            'single_topic': lambda: Question.objects.filter(topic_id=topic_ids[0]),
+            'language_and_difficulty': lambda: Question.objects.filter(language='en', difficulty='medium'),
+        }
+
+        results = {'questions': total, 'k': k, 'runs': runs, 'cases': {}}
+        for name, make_qs in cases.items():
+            order_by_random = time_call(lambda: list(make_qs().order_by('?')[:k]), runs)
+            indexed = time_call(lambda: list(sample(make_qs(), k)), runs)
+            results['cases'][name] = {'order_by_random_ms': order_by_random, 'sample_ms': indexed}
+            self.stdout.write(
+                f"{name:<26} ORDER BY RANDOM(): {order_by_random['median_ms']:>9.1f} ms   "
+                f"sample(): {indexed['median_ms']:>7.1f} ms"
+            )
+        return results
@@ -4,6 +4,7 @@ from questionbank.models import (
     Question, Report, UserAnswer, Bookmark, DailyExam, 
     ModelExam, PreviousYearPaper, SessionAnswer, AIExplanationCache
 )
+from questionbank.question_state import refresh_question_states
 import os
 import re
 import hashlib
@@ -201,8 +202,11 @@ RETURN ONLY THIS JSON (no markdown, no extra text):
     def merge_duplicate_questions(self, existing_q, duplicate_q):
         """Merges duplicate_q into existing_q, re-pointing all relationships, and deletes duplicate_q."""
         with transaction.atomic():
-            # 1. UserAnswer
-            UserAnswer.objects.filter(question=duplicate_q).update(question=existing_q)
+            # 1. UserAnswer (moved answers bypass signals, so resync the affected users' states)
+            moved_answers = UserAnswer.objects.filter(question=duplicate_q)
+            moved_user_ids = list(moved_answers.values_list('user_id', flat=True).distinct())
+            moved_answers.update(question=existing_q)
+            refresh_question_states(moved_user_ids, [existing_q.id, duplicate_q.id])
             
             # 2. Bookmark
             for b in Bookmark.objects.filter(question=duplicate_q):
@@ -0,0 +1,49 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from questionbank.answer_events import drain_answer_events, partition_count, prune_answer_events, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply logged answer events (UserAnswer rows, TopicProgress, XP, streaks). "
+        "Runs once by default; --loop keeps one consumer per partition running."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--partition', type=int, action='append', dest='partitions',
+            help='Only consume this partition (can be repeated; default: all of ANSWER_EVENT_PARTITIONS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Events applied per transaction (default 500)')
+        parser.add_argument('--loop', action='store_true', help='Keep consuming, polling every --interval seconds')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls with --loop (default 1)')
+        parser.add_argument('--prune', action='store_true', help='Delete the events already applied')
+
+    def handle(self, *args, **options):
+        partitions = partition_count()
+        selected = options['partitions'] or list(range(partitions))
+        for partition in selected:
+            if not 0 <= partition < partitions:
+                raise CommandError(f"Partition {partition} is outside 0..{partitions - 1}")
+
+        if options['loop']:
+            workers = [
+                threading.Thread(target=run_worker, kwargs={
+                    'partition': partition, 'partitions': partitions,
+                    'batch_size': options['batch_size'], 'interval': options['interval'],
+                }, name=f"answer-events-{partition}")
+                for partition in selected
+            ]
+            for worker in workers:
+                worker.start()
+            self.stdout.write(f"Consuming answer events on partitions {selected}...")
+            for worker in workers:
+                worker.join()
+            return
+
+        for partition in selected:
+            applied = drain_answer_events(partition, partitions, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Partition {partition}: applied {applied} answer events."))
+        if options['prune']:
+            self.stdout.write(self.style.SUCCESS(f"Pruned {prune_answer_events()} applied answer events."))
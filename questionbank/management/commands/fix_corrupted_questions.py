@@ -4,6 +4,7 @@ import logging
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from questionbank.models import Question
+from questionbank.rescoring import describe_rescore, rescore_questions
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +46,10 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"Failed to initialize Gemini AI: {e}"))
 
+        rekeyed_ids = []
         for q in questions:
             modified = False
+            old_answer = q.correct_answer
             q_text = q.text or ""
             opts = q.options or {}
 
@@ -107,6 +110,8 @@ class Command(BaseCommand):
             if modified:
                 try:
                     q.save()
+                    if q.correct_answer != old_answer:
+                        rekeyed_ids.append(q.id)
                 except Exception as err:
                     self.stdout.write(self.style.WARNING(f"Duplicate question detected (ID {q.id}). Deleting duplicate entry..."))
                     q.delete()
@@ -116,6 +121,10 @@ class Command(BaseCommand):
             f"cleaned {cleaned_options_count} option prefixes, and repaired {ai_fixed} with Gemini AI."
         ))
 
+        if rekeyed_ids:
+            summary = rescore_questions(rekeyed_ids)
+            self.stdout.write(self.style.SUCCESS(f"{len(rekeyed_ids)} answer keys changed. {describe_rescore(summary)}"))
+
     def _is_mismatched(self, q):
         # Helper to detect if question text and options language/content are severely mismatched
         opts = q.options or {}
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.activity import rebuild_activity
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's activity calendar from their answers and feed card reads."
+
+    def handle(self, *args, **options):
+        count = rebuild_activity()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} activity rows."))
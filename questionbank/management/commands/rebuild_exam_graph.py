@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.exam_graph import rebuild_exam_graph
+
+
+class Command(BaseCommand):
+    help = "Recompute the exam-similarity graph (Exam.related_exams) from the current exam names."
+
+    def handle(self, *args, **options):
+        edges = rebuild_exam_graph()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt exam graph with {edges} edges."))
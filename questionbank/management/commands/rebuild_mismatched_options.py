@@ -4,6 +4,7 @@ import logging
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from questionbank.models import Question
+from questionbank.rescoring import describe_rescore, rescore_questions
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING(f"Found {total_found} questions with mismatched option language/content."))
 
         fixed_count = 0
+        rekeyed_ids = []
         import time
         for i, q in enumerate(corrupted_questions, 1):
             success = False
@@ -114,6 +116,7 @@ Return ONLY a JSON object:
 
                     data = json.loads(resp_text)
                     if data.get('options') and isinstance(data['options'], dict) and len(data['options']) == 4:
+                        old_answer = q.correct_answer
                         q.text = data.get('text', q.text)
                         q.options = data['options']
                         if data.get('correct_answer') in ['A', 'B', 'C', 'D']:
@@ -121,6 +124,8 @@ Return ONLY a JSON object:
                         if data.get('explanation'):
                             q.explanation = data['explanation']
                         q.save()
+                        if q.correct_answer != old_answer:
+                            rekeyed_ids.append(q.id)
                         fixed_count += 1
                         self.stdout.write(self.style.SUCCESS(f"[{i}/{total_found}] Repaired Question ID {q.id}: {q.text[:40]}..."))
                         success = True
@@ -137,3 +142,7 @@ Return ONLY a JSON object:
             time.sleep(2)
 
         self.stdout.write(self.style.SUCCESS(f"\nCompleted AI repair! Successfully rebuilt options for {fixed_count} questions."))
+
+        if rekeyed_ids:
+            summary = rescore_questions(rekeyed_ids)
+            self.stdout.write(self.style.SUCCESS(f"{len(rekeyed_ids)} answer keys changed. {describe_rescore(summary)}"))
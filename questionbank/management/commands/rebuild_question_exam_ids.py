@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.exam_membership import rebuild_exam_ids
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Question.exam_ids column from the Question.exams M2M."
+
+    def handle(self, *args, **options):
+        count = rebuild_exam_ids()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed exam ids of {count} questions."))
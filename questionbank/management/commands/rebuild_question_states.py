@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from questionbank.models import UserAnswer
+from questionbank.question_state import rebuild_question_states
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user question states (last answered, times answered, review schedule) from the UserAnswer table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only rebuild the states for this user id (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        if not user_ids:
+            user_ids = UserAnswer.objects.values_list('user_id', flat=True).distinct()
+
+        count = 0
+        for user_id in user_ids:
+            states = rebuild_question_states(user_id)
+            count += 1
+            self.stdout.write(f"User {user_id}: {states} question states")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt question states for {count} users."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.score_histogram import rebuild_histograms
+
+
+class Command(BaseCommand):
+    help = "Recompute the model and daily exam score histograms from the attempt tables."
+
+    def handle(self, *args, **options):
+        count = rebuild_histograms()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} score histograms."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.syllabus_index import rebuild_syllabus_index
+
+
+class Command(BaseCommand):
+    help = "Recompile the exam -> topic id syllabus index from SYLLABUS_DATABASE and ExamSyllabus."
+
+    def handle(self, *args, **options):
+        rows = rebuild_syllabus_index()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt syllabus index with {rows} rows."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.topic_counts import rebuild_topic_counts
+
+
+class Command(BaseCommand):
+    help = "Recount questions per topic, language, difficulty, institute and status (e.g. after bulk imports)."
+
+    def handle(self, *args, **options):
+        count = rebuild_topic_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} topic question count rows."))
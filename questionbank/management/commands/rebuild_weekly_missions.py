@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questionbank.weekly_missions import rebuild_weekly_missions
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's weekly mission counters for the current week from their history (no XP is granted)."
+
+    def handle(self, *args, **options):
+        count = rebuild_weekly_missions()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} weekly mission rows."))
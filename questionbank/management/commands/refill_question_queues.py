@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from questionbank.question_queue import refill_pending_queues
+
+
+class Command(BaseCommand):
+    help = "Refill per-user question queues that have dropped below the low watermark."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Refill at most this many queues per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running, refilling every --interval seconds')
+        parser.add_argument('--interval', type=int, default=30, help='Seconds between passes with --loop (default 30)')
+
+    def handle(self, *args, **options):
+        while True:
+            refilled = refill_pending_queues(limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(f"Refilled {refilled} question queues."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from questionbank.rescoring import describe_rescore, rescore_questions
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-grade every answer, practice session and exam attempt recorded against the given "
+        "questions with their current correct answers (run after correcting answer keys)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('question_ids', nargs='+', type=int, help='Questions whose answer key changed')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows read and written per batch (default 1000)')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        summary = rescore_questions(options['question_ids'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(describe_rescore(summary)))
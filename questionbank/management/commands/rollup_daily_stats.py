@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from questionbank.daily_stats import reset_daily_stats, rollup_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the answers not counted yet into the per-user daily stats behind the "
+        "progress dashboard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50000, help='Answers folded per batch (default 50000)')
+        parser.add_argument('--rebuild', action='store_true', help='Drop the rollup and refold every answer')
+        parser.add_argument('--loop', action='store_true', help='Keep running, rolling up every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300, help='Seconds between passes with --loop (default 300)')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reset_daily_stats()
+            self.stdout.write("Daily stats reset.")
+
+        while True:
+            folded = rollup_daily_stats(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Folded {folded} answers into the daily stats."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from questionbank.question_stats import recalibrate_difficulty, reset_question_stats, rollup_question_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the answers not counted yet into Question.times_answered / times_correct. "
+        "Optionally recalibrate question difficulty from observed accuracy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50000, help='Answers folded per UPDATE (default 50000)')
+        parser.add_argument('--rebuild', action='store_true', help='Zero the counters and recount every answer')
+        parser.add_argument(
+            '--recalibrate-difficulty', action='store_true',
+            help='Re-label difficulty as easy/medium/hard from each question\'s accuracy'
+        )
+        parser.add_argument(
+            '--min-answers', type=int, default=30,
+            help='Answers a question needs before its difficulty is recalibrated (default 30)'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep running, rolling up every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300, help='Seconds between passes with --loop (default 300)')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reset_question_stats()
+            self.stdout.write("Question counters reset.")
+
+        while True:
+            folded, updated = rollup_question_stats(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Folded {folded} answers into {updated} question counters."))
+            if options['recalibrate_difficulty']:
+                changed = recalibrate_difficulty(min_answers=options['min_answers'])
+                self.stdout.write(self.style.SUCCESS(f"Recalibrated the difficulty of {changed} questions."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from questionbank.mock_exam import pooled_languages, warm_pool
+from questionbank.models import Exam
+
+
+class Command(BaseCommand):
+    help = (
+        "Top up the pools of pre-generated mock exam papers. Every exam and language that "
+        "already has a pool is refreshed; --exam-id and --upcoming-days add new ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam-id', type=int, action='append', dest='exam_ids', help='Warm this exam (can be repeated)')
+        parser.add_argument(
+            '--upcoming-days', type=int,
+            help='Warm every exam whose expected exam date falls within this many days'
+        )
+        parser.add_argument(
+            '--language', action='append', dest='languages',
+            help="Language to warm new pools for (can be repeated; default: any language)"
+        )
+        parser.add_argument('--size', type=int, help='Papers per pool (default MOCK_EXAM_POOL_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='Keep running, warming every --interval seconds')
+        parser.add_argument('--interval', type=int, default=600, help='Seconds between passes with --loop (default 600)')
+
+    def handle(self, *args, **options):
+        while True:
+            self.warm(options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def warm(self, options):
+        targets = set(pooled_languages())
+        new_exam_ids = set(options['exam_ids'] or [])
+        if options['upcoming_days'] is not None:
+            today = timezone.localdate()
+            new_exam_ids.update(Exam.objects.filter(
+                expected_exam_date__gte=today,
+                expected_exam_date__lte=today + timedelta(days=options['upcoming_days']),
+            ).values_list('id', flat=True))
+        for exam_id in new_exam_ids:
+            for language in options['languages'] or ['']:
+                targets.add((exam_id, language))
+
+        exams = Exam.objects.in_bulk({exam_id for exam_id, _ in targets})
+        built = 0
+        for exam_id, language in sorted(targets):
+            exam = exams.get(exam_id)
+            if exam is None:
+                self.stdout.write(self.style.WARNING(f"Exam {exam_id} does not exist, skipped."))
+                continue
+            built += warm_pool(exam, language=language or None, size=options['size'])
+        self.stdout.write(self.style.SUCCESS(f"Built {built} mock exam papers across {len(targets)} pools."))
@@ -0,0 +1,66 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Collects every SQL statement a request runs, via connection.execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            self.statements.append((elapsed, sql))
+
+    def slowest(self, n):
+        return sorted(self.statements, key=lambda s: s[0], reverse=True)[:n]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, total DB time and the slowest statements for every request.
+    A one-line summary is logged (as a warning once QUERY_COUNT_WARNING is exceeded)
+    and, when DEBUG is on, the numbers are also returned as X-DB-* response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+
+        request.query_stats = stats
+        slowest = stats.slowest(getattr(settings, 'QUERY_SLOWEST_COUNT', 3))
+
+        warn_at = getattr(settings, 'QUERY_COUNT_WARNING', 50)
+        log = logger.warning if stats.count > warn_at else logger.info
+        log(
+            "%s %s: %d queries, %.1f ms in DB, slowest %.1f ms",
+            request.method, request.path, stats.count, stats.total_ms,
+            slowest[0][0] if slowest else 0.0,
+        )
+        for elapsed, sql in slowest:
+            logger.debug("  %.1f ms  %s", elapsed, sql[:500])
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(stats.count)
+            response['X-DB-Time-Ms'] = f"{stats.total_ms:.1f}"
+            response['X-DB-Slowest'] = ' | '.join(
+                f"{elapsed:.1f}ms {' '.join(sql.split())[:200]}" for elapsed, sql in slowest
+            )
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0034_userprofile_primary_exam_masterstudyplan_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='category_number',
+            field=models.CharField(blank=True, help_text='e.g. Cat 423/2025', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='expected_exam_date',
+            field=models.DateField(blank=True, help_text='Expected / scheduled exam date', null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='official_syllabus',
+            field=models.JSONField(blank=True, default=dict, help_text='Official Kerala PSC Mark breakdown & SCERT topic list'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='question_pattern',
+            field=models.JSONField(blank=True, default=dict, help_text='Official Exam Pattern (100 MCQs, 75 Mins, -0.33 Negative Mark)'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=15),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:56
+
+import questionbank.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Random
+
+
+def assign_random_keys(apps, schema_editor):
+    # AddField evaluates the default once, so give existing rows their own keys
+    Question = apps.get_model('questionbank', 'Question')
+    Question.objects.update(random_key=Random())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutes', '0008_batch_note_attendance_batchmembership'),
+        ('questionbank', '0035_exam_category_number_exam_expected_exam_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='random_key',
+            field=models.FloatField(db_index=True, default=questionbank.models.random_sort_key, editable=False, help_text='Uniform [0, 1) key used for indexed random sampling'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['topic', 'random_key'], name='question_topic_random_idx'),
+        ),
+        migrations.RunPython(assign_random_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:01
+
+from django.db import migrations, models
+
+# Frozen copy of questionbank.exam_graph's matching at the time of this migration,
+# so the backfill never depends on the live models or later rule changes
+def _name_words(name):
+    return [w for w in name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
+
+
+def build_exam_graph(apps, schema_editor):
+    Exam = apps.get_model('questionbank', 'Exam')
+    RelatedExam = Exam.related_exams.through
+    exams = list(Exam.objects.values_list('id', 'name'))
+    words = {exam_id: [w.lower() for w in _name_words(name)] for exam_id, name in exams}
+    RelatedExam.objects.bulk_create(
+        [
+            RelatedExam(from_exam_id=from_id, to_exam_id=to_id)
+            for from_id, _ in exams
+            for to_id, to_name in exams
+            if from_id != to_id and any(word in to_name.lower() for word in words[from_id])
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0037_question_random_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='related_exams',
+            field=models.ManyToManyField(blank=True, help_text='Exams whose name shares a word with this one. Maintained by questionbank.exam_graph.', related_name='related_from', to='questionbank.exam'),
+        ),
+        migrations.RunPython(build_exam_graph, migrations.RunPython.noop),
+    ]
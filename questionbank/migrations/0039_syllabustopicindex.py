@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0038_exam_related_exams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyllabusTopicIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('syllabus_topic', models.CharField(help_text='Syllabus entry the topic was matched from', max_length=255)),
+                ('marks', models.PositiveIntegerField(default=0, help_text='Marks (static syllabus) or questions (exam syllabus) for the entry')),
+                ('source', models.CharField(choices=[('static', 'Syllabus database'), ('exam_syllabus', 'Exam syllabus')], default='static', max_length=20)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='syllabus_index', to='questionbank.exam')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='syllabus_index', to='questionbank.topic')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exam', 'source', 'topic'], name='syllabus_index_lookup_idx')],
+                'unique_together': {('exam', 'topic', 'syllabus_topic', 'source')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_question_states(apps, schema_editor):
+    UserAnswer = apps.get_model('questionbank', 'UserAnswer')
+    UserQuestionState = apps.get_model('questionbank', 'UserQuestionState')
+    rows = UserAnswer.objects.values('user_id', 'question_id').annotate(
+        last_answered_at=Max('answered_at'), times_answered=Count('id')
+    ).order_by()
+    batch = []
+    for row in rows.iterator():
+        batch.append(UserQuestionState(**row))
+        if len(batch) == 5000:
+            UserQuestionState.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UserQuestionState.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0039_syllabustopicindex'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQuestionState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_answered_at', models.DateTimeField()),
+                ('times_answered', models.PositiveIntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_states', to='questionbank.question')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'last_answered_at'], name='question_state_recency_idx')],
+                'unique_together': {('user', 'question')},
+            },
+        ),
+        migrations.RunPython(backfill_question_states, migrations.RunPython.noop),
+    ]
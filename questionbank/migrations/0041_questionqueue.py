@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0040_userquestionstate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionQueue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('practice', 'Practice'), ('daily', 'Daily Quiz')], default='practice', max_length=20)),
+                ('filter_key', models.CharField(max_length=255)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('question_ids', models.JSONField(blank=True, default=list)),
+                ('refilled_at', models.DateTimeField(blank=True, null=True)),
+                ('needs_refill', models.BooleanField(db_index=True, default=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_queues', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'filter_key')},
+            },
+        ),
+    ]
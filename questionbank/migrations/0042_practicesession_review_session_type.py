@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0041_questionqueue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='practicesession',
+            name='session_type',
+            field=models.CharField(choices=[('topic', 'Topic Practice'), ('difficulty', 'Difficulty Drill'), ('mixed', 'Mixed Practice'), ('pyq', 'Previous Year Questions'), ('weak_area', 'Weak Area Drill'), ('review', 'Spaced Review')], max_length=20),
+        ),
+    ]
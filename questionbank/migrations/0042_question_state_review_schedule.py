@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:23
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+STATE_FIELDS = ('last_answered_at', 'times_answered', 'ease_factor', 'interval_days', 'repetitions', 'due_at')
+
+
+def schedule_review(answers):
+    """Frozen copy of questionbank.question_state.schedule_review (SM-2, binary answers) at this migration."""
+    ease_factor, interval_days, repetitions = 2.5, 0, 0
+    last_answered_at = None
+    for answered_at, is_correct in answers:
+        quality = 5 if is_correct else 2
+        if is_correct:
+            repetitions += 1
+            interval_days = 1 if repetitions == 1 else 6 if repetitions == 2 else max(1, round(interval_days * ease_factor))
+        else:
+            repetitions, interval_days = 0, 1
+        ease_factor = max(1.3, round(ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02), 2))
+        last_answered_at = answered_at
+    return {
+        'last_answered_at': last_answered_at,
+        'times_answered': len(answers),
+        'ease_factor': ease_factor,
+        'interval_days': interval_days,
+        'repetitions': repetitions,
+        'due_at': last_answered_at + timedelta(days=interval_days),
+    }
+
+
+def backfill_review_schedule(apps, schema_editor):
+    UserAnswer = apps.get_model('questionbank', 'UserAnswer')
+    UserQuestionState = apps.get_model('questionbank', 'UserQuestionState')
+    answers = UserAnswer.objects.order_by('user_id', 'question_id', 'answered_at', 'id').values_list(
+        'user_id', 'question_id', 'answered_at', 'is_correct'
+    )
+
+    pending = {}
+
+    def flush():
+        states = [
+            state for state in UserQuestionState.objects.filter(
+                user_id__in={user_id for user_id, _ in pending},
+                question_id__in={question_id for _, question_id in pending},
+            )
+            if (state.user_id, state.question_id) in pending
+        ]
+        for state in states:
+            for field, value in schedule_review(pending[(state.user_id, state.question_id)]).items():
+                setattr(state, field, value)
+        UserQuestionState.objects.bulk_update(states, STATE_FIELDS)
+        pending.clear()
+
+    for user_id, question_id, answered_at, is_correct in answers.iterator(chunk_size=5000):
+        key = (user_id, question_id)
+        if key not in pending and len(pending) >= 1000:
+            flush()
+        pending.setdefault(key, []).append((answered_at, is_correct))
+    if pending:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0042_practicesession_review_session_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userquestionstate',
+            name='due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userquestionstate',
+            name='ease_factor',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='userquestionstate',
+            name='interval_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userquestionstate',
+            name='repetitions',
+            field=models.PositiveIntegerField(default=0, help_text='Correct answers in a row'),
+        ),
+        migrations.AddIndex(
+            model_name='userquestionstate',
+            index=models.Index(fields=['user', 'due_at'], name='question_state_due_idx'),
+        ),
+        migrations.RunPython(backfill_review_schedule, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0045_answerevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyexamattempt',
+            name='responses',
+            field=models.BinaryField(default=b'', help_text="Answer sheet aligned to the paper's question order (see questionbank.response_sheet)"),
+        ),
+        migrations.AddField(
+            model_name='modelexamattempt',
+            name='responses',
+            field=models.BinaryField(default=b'', help_text="Answer sheet aligned to the paper's question order (see questionbank.response_sheet)"),
+        ),
+    ]
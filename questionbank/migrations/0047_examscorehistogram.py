@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:42
+
+from django.db import migrations, models
+
+SCORE_BUCKETS = 101
+TIME_BUCKET_SECS = 60
+TIME_BUCKETS = 181
+
+
+def _bump(buckets, size, index):
+    if len(buckets) < size:
+        buckets.extend([0] * (size - len(buckets)))
+    buckets[index] += 1
+
+
+def backfill_histograms(apps, schema_editor):
+    """Frozen copy of questionbank.score_histogram.build_histograms at this migration."""
+    ExamScoreHistogram = apps.get_model('questionbank', 'ExamScoreHistogram')
+    papers = [
+        ('model_exam', apps.get_model('questionbank', 'ModelExamAttempt'), 'model_exam_id'),
+        ('daily_exam', apps.get_model('questionbank', 'DailyExamAttempt'), 'daily_exam_id'),
+    ]
+    histograms = {}
+    for paper_type, attempt_model, paper_field in papers:
+        for paper_id, score, time_taken in attempt_model.objects.values_list(paper_field, 'score', 'time_taken').iterator():
+            histogram = histograms.get((paper_type, paper_id))
+            if histogram is None:
+                histogram = histograms[(paper_type, paper_id)] = ExamScoreHistogram(
+                    paper_type=paper_type, paper_id=paper_id, attempts=0, score_buckets=[], time_buckets=[]
+                )
+            _bump(histogram.score_buckets, SCORE_BUCKETS, min(max(int(score or 0), 0), SCORE_BUCKETS - 1))
+            _bump(histogram.time_buckets, TIME_BUCKETS, min(max(int(time_taken or 0) // TIME_BUCKET_SECS, 0), TIME_BUCKETS - 1))
+            histogram.attempts += 1
+    ExamScoreHistogram.objects.bulk_create(histograms.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0046_attempt_responses'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamScoreHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paper_type', models.CharField(choices=[('model_exam', 'Model Exam'), ('daily_exam', 'Daily Exam')], max_length=20)),
+                ('paper_id', models.PositiveIntegerField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_buckets', models.JSONField(default=list, help_text='Attempt counts per score bucket, lowest first')),
+                ('time_buckets', models.JSONField(default=list, help_text='Attempt counts per time-taken bucket, fastest first')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('paper_type', 'paper_id')},
+            },
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+    ]
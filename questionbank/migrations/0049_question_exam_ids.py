@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+def encode(exam_ids):
+    """Frozen copy of questionbank.exam_membership.encode at this migration."""
+    exam_ids = sorted(set(exam_ids))
+    return f",{','.join(map(str, exam_ids))}," if exam_ids else ''
+
+
+def backfill_exam_ids(apps, schema_editor):
+    Question = apps.get_model('questionbank', 'Question')
+    memberships = {}
+    for question_id, exam_id in Question.exams.through.objects.values_list('question_id', 'exam_id').iterator():
+        memberships.setdefault(question_id, []).append(exam_id)
+    by_value = {}
+    for question_id, exam_ids in memberships.items():
+        by_value.setdefault(encode(exam_ids), []).append(question_id)
+    for value, ids in by_value.items():
+        for start in range(0, len(ids), 2000):
+            Question.objects.filter(id__in=ids[start:start + 2000]).update(exam_ids=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0048_userdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='exam_ids',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Denormalized copy of `exams` (',3,7,'), kept in sync by questionbank.exam_membership", max_length=1000),
+        ),
+        migrations.RunPython(backfill_exam_ids, migrations.RunPython.noop),
+    ]
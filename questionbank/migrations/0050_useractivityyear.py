@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:49
+
+from array import array
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_activity(apps, schema_editor):
+    # Frozen copy of questionbank.activity.rebuild_activity as of this migration
+    UserActivityYear = apps.get_model('questionbank', 'UserActivityYear')
+    answers = apps.get_model('questionbank', 'UserAnswer').objects.all()
+    day_counts = [
+        answers.values_list('user_id', 'answered_at__date').annotate(n=Count('id')).order_by(),
+        apps.get_model('questionbank', 'UserFeedView').objects.values_list('user_id', 'viewed_date').annotate(n=Count('id')).order_by(),
+    ]
+    years = {}
+    for rows in day_counts:
+        for user_id, day, count in rows.iterator():
+            counts = years.setdefault((user_id, day.year), array('H', [0] * 366))
+            index = day.timetuple().tm_yday - 1
+            counts[index] = min(counts[index] + count, 0xFFFF)
+    UserActivityYear.objects.bulk_create([
+        UserActivityYear(user_id=user_id, year=year, days=counts.tobytes())
+        for (user_id, year), counts in years.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0049_question_exam_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivityYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('days', models.BinaryField(default=b'', help_text='uint16 activity counter per day of the year (366 entries)')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_years', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'year')},
+            },
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:54
+
+from datetime import datetime, time, timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+# (mission id, counter, target) as of this migration
+MISSIONS = (
+    ('questions_50', 'questions_answered', 50),
+    ('mock_tests_2', 'mock_tests', 2),
+    ('current_affairs_10', 'current_affairs_read', 10),
+    ('review_wrong', 'wrong_reviewed', 5),
+)
+
+
+def backfill_weekly_missions(apps, schema_editor):
+    # Frozen copy of questionbank.weekly_missions.rebuild_weekly_missions as of
+    # this migration.
+    WeeklyMissionProgress = apps.get_model('questionbank', 'WeeklyMissionProgress')
+    answers = apps.get_model('questionbank', 'UserAnswer').objects.all()
+    today = timezone.localdate()
+    start = timezone.make_aware(datetime.combine(today - timedelta(days=today.weekday()), time.min))
+    year, week, _ = today.isocalendar()
+    rows = {}
+
+    def row(user_id):
+        if user_id not in rows:
+            rows[user_id] = WeeklyMissionProgress(user_id=user_id, week=f"{year}-W{week:02d}", rewarded=[])
+        return rows[user_id]
+
+    for user_id in answers.filter(is_correct=False).values_list('user_id', flat=True).distinct().iterator():
+        row(user_id).has_wrong_answers = True
+    for user_id, n in answers.filter(answered_at__gte=start).values_list('user_id').annotate(n=Count('id')).order_by():
+        row(user_id).questions_answered = n
+    for user_id, n in apps.get_model('questionbank', 'ModelExamAttempt').objects.filter(
+        submitted_at__gte=start
+    ).values_list('user_id').annotate(n=Count('id')).order_by():
+        row(user_id).mock_tests = n
+    for user_id, n in apps.get_model('questionbank', 'UserFeedView').objects.filter(
+        card__card_type='current_affairs', viewed_date__gte=start.date()
+    ).values_list('user_id').annotate(n=Count('id')).order_by():
+        row(user_id).current_affairs_read = n
+    this_week = answers.filter(answered_at__gte=start, is_correct=True)
+    wrong_pairs = set(answers.filter(
+        is_correct=False, user_id__in=this_week.values('user_id')
+    ).values_list('user_id', 'question_id').distinct().iterator())
+    for pair in this_week.values_list('user_id', 'question_id').iterator():
+        if pair in wrong_pairs:
+            row(pair[0]).wrong_reviewed += 1
+
+    for progress in rows.values():
+        # Missions already complete count as rewarded, so the backfill grants no XP
+        progress.rewarded = [
+            mission_id for mission_id, counter, target in MISSIONS if getattr(progress, counter) >= target
+        ]
+    WeeklyMissionProgress.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0050_useractivityyear'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyMissionProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.CharField(max_length=8)),
+                ('questions_answered', models.PositiveIntegerField(default=0)),
+                ('mock_tests', models.PositiveIntegerField(default=0)),
+                ('current_affairs_read', models.PositiveIntegerField(default=0)),
+                ('wrong_reviewed', models.PositiveIntegerField(default=0, help_text='Correct answers to questions the user had answered wrong before')),
+                ('has_wrong_answers', models.BooleanField(default=False)),
+                ('rewarded', models.JSONField(blank=True, default=list, help_text='Missions whose XP was granted this week')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_missions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_weekly_missions, migrations.RunPython.noop),
+    ]
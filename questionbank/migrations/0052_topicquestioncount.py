@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_topic_counts(apps, schema_editor):
+    # Frozen copy of questionbank.topic_counts.rebuild_topic_counts as of this migration
+    TopicQuestionCount = apps.get_model('questionbank', 'TopicQuestionCount')
+    key_fields = ('topic_id', 'language', 'difficulty', 'institute_id', 'status')
+    rows = apps.get_model('questionbank', 'Question').objects.values_list(*key_fields).annotate(n=Count('id')).order_by()
+    TopicQuestionCount.objects.bulk_create(
+        (TopicQuestionCount(count=n, **dict(zip(key_fields, key))) for *key, n in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutes', '0008_batch_note_attendance_batchmembership'),
+        ('questionbank', '0051_weeklymissionprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicQuestionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=5)),
+                ('difficulty', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('institute', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='institutes.institute')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_counts', to='questionbank.topic')),
+            ],
+            options={
+                'unique_together': {('topic', 'language', 'difficulty', 'institute', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_topic_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0055_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='exam_ids',
+            field=models.TextField(blank=True, default='', editable=False, help_text="Denormalized copy of `exams` (',3,7,'), kept in sync by questionbank.exam_membership"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0056_question_exam_ids_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userdailystats',
+            name='exam_ids',
+            field=models.TextField(blank=True),
+        ),
+    ]
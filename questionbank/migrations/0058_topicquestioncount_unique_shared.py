@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:45
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_shared_duplicates(apps, schema_editor):
+    # Concurrent first saves could create several shared-bank (NULL institute)
+    # rows for one key; fold each group into its oldest row before constraining
+    TopicQuestionCount = apps.get_model('questionbank', 'TopicQuestionCount')
+    duplicates = TopicQuestionCount.objects.filter(institute__isnull=True).values(
+        'topic_id', 'language', 'difficulty', 'status'
+    ).annotate(rows=Count('id'), keep=Min('id'), total=Sum('count')).filter(rows__gt=1).order_by()
+    for group in duplicates:
+        key = {field: group[field] for field in ('topic_id', 'language', 'difficulty', 'status')}
+        TopicQuestionCount.objects.filter(pk=group['keep']).update(count=group['total'])
+        TopicQuestionCount.objects.filter(institute__isnull=True, **key).exclude(pk=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutes', '0008_batch_note_attendance_batchmembership'),
+        ('questionbank', '0057_userdailystats_exam_ids_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_shared_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='topicquestioncount',
+            constraint=models.UniqueConstraint(condition=models.Q(('institute__isnull', True)), fields=('topic', 'language', 'difficulty', 'status'), name='unique_shared_topic_question_count'),
+        ),
+    ]
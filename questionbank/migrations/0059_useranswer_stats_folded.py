@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def unmark_unfolded_answers(apps, schema_editor):
+    # Existing answers start out folded; the ones past the old id checkpoint
+    # have not reached the counters yet
+    checkpoint = apps.get_model('questionbank', 'RollupCheckpoint').objects.filter(name='question_stats').first()
+    apps.get_model('questionbank', 'UserAnswer').objects.filter(
+        id__gt=checkpoint.last_id if checkpoint else 0
+    ).update(stats_folded=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0058_topicquestioncount_unique_shared'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='stats_folded',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(unmark_unfolded_answers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='useranswer',
+            name='stats_folded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(condition=models.Q(('stats_folded', False)), fields=['id'], name='answer_stats_unfolded_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def unmark_unfolded_answers(apps, schema_editor):
+    # Existing answers start out folded; the ones past the old id checkpoint
+    # have not reached the daily stats yet
+    checkpoint = apps.get_model('questionbank', 'RollupCheckpoint').objects.filter(name='daily_stats').first()
+    apps.get_model('questionbank', 'UserAnswer').objects.filter(
+        id__gt=checkpoint.last_id if checkpoint else 0
+    ).update(daily_folded=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0059_useranswer_stats_folded'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='daily_folded',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(unmark_unfolded_answers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='useranswer',
+            name='daily_folded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(condition=models.Q(('daily_folded', False)), fields=['user', 'id'], name='answer_daily_unfolded_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Mod
+
+
+def unmark_pending_events(apps, schema_editor):
+    # Existing events start out applied; the ones past their partition's offset
+    # (under the current partitioning) have not been applied yet
+    RollupCheckpoint = apps.get_model('questionbank', 'RollupCheckpoint')
+    AnswerEvent = apps.get_model('questionbank', 'AnswerEvent')
+    partitions = max(1, getattr(settings, 'ANSWER_EVENT_PARTITIONS', 1))
+    offsets = dict(RollupCheckpoint.objects.filter(name__startswith='answer_events:').values_list('name', 'last_id'))
+    for partition in range(partitions):
+        AnswerEvent.objects.alias(_partition=Mod('user_id', partitions)).filter(
+            _partition=partition, id__gt=offsets.get(f"answer_events:{partition}/{partitions}", 0)
+        ).update(applied=False)
+    RollupCheckpoint.objects.filter(name__startswith='answer_events:').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0060_useranswer_daily_folded'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answerevent',
+            name='applied',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(unmark_pending_events, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='answerevent',
+            name='applied',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='answerevent',
+            index=models.Index(condition=models.Q(('applied', False)), fields=['id'], name='answer_event_pending_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='rollupcheckpoint',
+            name='last_id',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0061_answerevent_applied'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='difficulty',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+    ]
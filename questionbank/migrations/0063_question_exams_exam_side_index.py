@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:40
+
+from django.db import migrations, models
+
+INDEX = models.Index(fields=['exam', 'question'], name='question_exams_exam_q_idx')
+TRIGRAM_INDEX = 'questionbank_question_exam_ids_trgm'
+
+
+def _through(apps):
+    return apps.get_model('questionbank', 'Question')._meta.get_field('exams').remote_field.through
+
+
+def add_exam_side_index(apps, schema_editor):
+    # in_exams() runs an EXISTS over the auto-created M2M table; this serves it
+    # from the exam side, next to the table's unique (question_id, exam_id) key
+    schema_editor.add_index(_through(apps), INDEX)
+    if schema_editor.connection.vendor == 'postgresql':
+        # Left by earlier builds of migration 0056, which matched exam_ids with LIKE
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+def remove_exam_side_index(apps, schema_editor):
+    schema_editor.remove_index(_through(apps), INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionbank', '0062_useranswer_difficulty'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exam_side_index, remove_exam_side_index),
+    ]
@@ -0,0 +1,271 @@
+"""
+Mock exam generation from compiled, cached per-exam blueprints.
+
+A blueprint is the topic quotas of an exam's paper plus the ids of the exam and
+its related exams. It is compiled from the syllabus topic index and cached, so
+generating a paper only has to sample questions: one windowed query fills every
+topic quota, and a few random_key pivot seeks pad the paper to full length.
+
+Finished papers are also kept in a per-exam, per-language pool (MockExamPaper)
+that `warm_mock_exam_pool` tops up ahead of exam-week traffic. Pool papers are
+shared, so they are never padded from one user's history; personalised papers
+are built live and never pooled.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Case, F, FilteredRelation, FloatField, IntegerField, Q, Value, When, Window,
+)
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .cache_versions import bump_versions, current_version
+from .exam_graph import related_exams
+from .exam_membership import in_exams
+from .models import MockExamPaper, Question, SyllabusTopicIndex
+from .sampling import sample_ids
+from .syllabus_index import _static_syllabus
+
+MOCK_EXAM_SIZE = 100
+BLUEPRINT_VERSION = 'mock_exam_blueprints'
+
+
+def _blueprint_ttl():
+    return getattr(settings, 'MOCK_EXAM_BLUEPRINT_TTL', 3600)
+
+
+def _blueprint_key(exam_id):
+    return f"mock_exam_blueprint:{current_version(BLUEPRINT_VERSION)}:{exam_id}"
+
+
+def invalidate_blueprints():
+    """Drops every cached blueprint in every worker, e.g. after the syllabus index or exam graph changes."""
+    bump_versions(BLUEPRINT_VERSION)
+
+
+def compile_blueprint(exam):
+    """
+    Returns {'exam_id', 'related_exam_ids', 'quotas': [[topic_id, questions], ...]}.
+    Quotas come from the static master syllabus when the exam has one (each entry
+    resolved to its exact-name topic, else the first topic containing it), otherwise
+    from the exam's syllabus parts, falling back to those of related exams.
+    """
+    related_ids = sorted(related_exams(exam).values_list('id', flat=True))
+    rows = list(
+        SyllabusTopicIndex.objects.filter(exam_id__in=related_ids)
+        .order_by('topic_id')
+        .values_list('exam_id', 'topic_id', 'topic__name', 'syllabus_topic', 'marks', 'source')
+    )
+
+    quotas = {}
+    static_syllabus = _static_syllabus(exam.slug)
+    if static_syllabus:
+        matches = {}
+        for exam_id, topic_id, topic_name, entry, marks, source in rows:
+            if exam_id == exam.pk and source == SyllabusTopicIndex.SOURCE_STATIC:
+                matches.setdefault(entry, []).append((topic_id, topic_name))
+        for item in static_syllabus:
+            candidates = matches.get(item['topic'])
+            if not candidates:
+                continue
+            exact = [topic_id for topic_id, name in candidates if name.lower() == item['topic'].lower()]
+            topic_id = exact[0] if exact else candidates[0][0]
+            quotas[topic_id] = max(quotas.get(topic_id, 0), item.get('marks') or 0)
+    else:
+        parts = [row for row in rows if row[5] == SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS]
+        own_parts = [row for row in parts if row[0] == exam.pk]
+        for _, topic_id, _, _, marks, _ in own_parts or parts:
+            quotas[topic_id] = max(quotas.get(topic_id, 0), marks)
+
+    return {
+        'exam_id': exam.pk,
+        'related_exam_ids': related_ids,
+        'quotas': [[topic_id, quota] for topic_id, quota in quotas.items() if quota > 0],
+    }
+
+
+def get_blueprint(exam):
+    key = _blueprint_key(exam.pk)
+    blueprint = cache.get(key)
+    if blueprint is None:
+        blueprint = compile_blueprint(exam)
+        cache.set(key, blueprint, _blueprint_ttl())
+    return blueprint
+
+
+def _rotated_random_key(pivot):
+    return Case(
+        When(random_key__gte=pivot, then=F('random_key') - pivot),
+        default=F('random_key') + (1 - pivot),
+        output_field=FloatField(),
+    )
+
+
+def _fill_quotas(blueprint, language=None):
+    """
+    Picks every topic's quota in one query: questions are numbered within their
+    topic (questions of the exam or related exams first, then by a rotated random
+    key) and only those numbered within their topic's quota are kept.
+    """
+    quotas = blueprint['quotas']
+    if not quotas:
+        return []
+    candidates = Question.objects.filter(topic_id__in=[topic_id for topic_id, _ in quotas])
+    if language:
+        candidates = candidates.filter(language=language)
+
+    ranked = candidates.annotate(
+        _quota=Case(*[When(topic_id=topic_id, then=Value(quota)) for topic_id, quota in quotas],
+                    output_field=IntegerField()),
+        _from_exam=in_exams(blueprint['related_exam_ids']),
+        _rank=Window(
+            RowNumber(),
+            partition_by=[F('topic_id')],
+            order_by=[F('_from_exam').desc(), _rotated_random_key(random.random()).asc()],
+        ),
+    ).filter(_rank__lte=F('_quota'))
+
+    by_topic = {}
+    for question_id, topic_id in ranked.values_list('id', 'topic_id'):
+        by_topic.setdefault(topic_id, []).append(question_id)
+    # Keep the blueprint's topic order, as the paper is cut at MOCK_EXAM_SIZE
+    return [question_id for topic_id, _ in quotas for question_id in by_topic.get(topic_id, [])]
+
+
+def _pad(blueprint, picked, count, language=None, user=None):
+    """
+    Tops the paper up with `count` more questions, preferring the syllabus
+    topics, then questions of the exam or related exams, then anything. Each
+    preference is sampled with a few random_key pivot seeks, tried only while the
+    paper is still short. With `user`, questions they have answered are only
+    used once nothing else is left.
+    """
+    candidates = Question.objects.all()
+    if language:
+        candidates = candidates.filter(language=language)
+    tiers = []
+    topic_ids = [topic_id for topic_id, _ in blueprint['quotas']]
+    if topic_ids:
+        tiers.append(candidates.filter(topic_id__in=topic_ids))
+    if blueprint['related_exam_ids']:
+        tiers.append(candidates.filter(in_exams(blueprint['related_exam_ids'])))
+    tiers.append(candidates)
+    if user is not None:
+        tiers = [
+            tier.annotate(
+                state=FilteredRelation('user_states', condition=Q(user_states__user=user)),
+            ).filter(state__id__isnull=True)
+            for tier in tiers
+        ] + [candidates]
+
+    padded = []
+    for tier in tiers:
+        if len(padded) >= count:
+            break
+        padded += sample_ids(tier.exclude(id__in=list(picked) + padded), count - len(padded))
+    return padded
+
+
+def pick_paper_ids(exam, language=None, size=MOCK_EXAM_SIZE, user=None):
+    """
+    Returns the question ids of a fresh `size`-question paper for `exam`,
+    padded with questions `user` has not answered when one is given.
+    """
+    blueprint = get_blueprint(exam)
+    picked = _fill_quotas(blueprint, language)[:size]
+    if len(picked) < size:
+        picked += _pad(blueprint, picked, size - len(picked), language, user)
+    return picked
+
+
+def _load_paper(question_ids):
+    questions = Question.objects.select_related('topic').in_bulk(question_ids)
+    paper = [questions[question_id] for question_id in question_ids if question_id in questions]
+    random.shuffle(paper)
+    return paper
+
+
+def generate_mock_exam(exam, language=None, size=MOCK_EXAM_SIZE, user=None):
+    """
+    Returns `size` shuffled Questions (topics loaded) for a fresh mock paper of
+    `exam`, padded with questions `user` has not answered when one is given.
+    """
+    return _load_paper(pick_paper_ids(exam, language, size, user=user))
+
+
+def _pool_size():
+    return getattr(settings, 'MOCK_EXAM_POOL_SIZE', 10)
+
+
+def _max_serves():
+    return getattr(settings, 'MOCK_EXAM_POOL_MAX_SERVES', 200)
+
+
+def _max_age():
+    return timedelta(hours=getattr(settings, 'MOCK_EXAM_POOL_MAX_AGE_HOURS', 72))
+
+
+def _live_papers(exam, language):
+    """Pool papers that are neither stale nor served often enough to be rotated out."""
+    return MockExamPaper.objects.filter(
+        exam=exam, language=language or '',
+        created_at__gte=timezone.now() - _max_age(),
+        served_count__lt=_max_serves(),
+    )
+
+
+def warm_pool(exam, language=None, size=None):
+    """
+    Drops stale and worn-out papers of the exam's pool for `language` and builds
+    new ones until the pool holds `size` (MOCK_EXAM_POOL_SIZE) papers.
+    Returns the number of papers built.
+    """
+    size = _pool_size() if size is None else size
+    live = _live_papers(exam, language)
+    MockExamPaper.objects.filter(exam=exam, language=language or '').exclude(
+        pk__in=live.values('pk')
+    ).delete()
+
+    built = 0
+    for _ in range(max(0, size - live.count())):
+        MockExamPaper.objects.create(
+            exam=exam, language=language or '', question_ids=pick_paper_ids(exam, language)
+        )
+        built += 1
+    return built
+
+
+def pooled_languages():
+    """Returns the (exam_id, language) pairs that currently have a pool."""
+    return set(MockExamPaper.objects.values_list('exam_id', 'language').distinct())
+
+
+def _untaken_paper(exam, user, language):
+    return (
+        _live_papers(exam, language)
+        .exclude(served_to=user)
+        .order_by('served_count', 'created_at')
+        .first()
+    )
+
+
+def take_mock_exam(exam, user, language=None):
+    """
+    Hands `user` the least-served pool paper of `exam` they have not taken yet.
+    Only when no such paper exists is one generated live, without padding from
+    the user's history; it is added to the pool so the warm-up job starts
+    maintaining a pool for this exam and language.
+    """
+    with transaction.atomic():
+        paper = _untaken_paper(exam, user, language)
+        if paper is None:
+            paper = MockExamPaper.objects.create(
+                exam=exam, language=language or '', question_ids=pick_paper_ids(exam, language)
+            )
+        MockExamPaper.objects.filter(pk=paper.pk).update(served_count=F('served_count') + 1)
+        paper.served_to.add(user)
+    return _load_paper(paper.question_ids)
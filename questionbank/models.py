@@ -1,8 +1,15 @@
+import random
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
+
+def random_sort_key():
+    return random.random()
+
 # ===================================================================
 # --- Models for Exam & Content Structure ---
 # ===================================================================
@@ -28,6 +35,10 @@ class Exam(models.Model):
     expected_exam_date = models.DateField(null=True, blank=True, help_text="Expected / scheduled exam date")
     official_syllabus = models.JSONField(default=dict, blank=True, help_text="Official Kerala PSC Mark breakdown & SCERT topic list")
     question_pattern = models.JSONField(default=dict, blank=True, help_text="Official Exam Pattern (100 MCQs, 75 Mins, -0.33 Negative Mark)")
+    related_exams = models.ManyToManyField(
+        'self', symmetrical=False, blank=True, related_name='related_from',
+        help_text="Exams whose name shares a word with this one. Maintained by questionbank.exam_graph."
+    )
 
     def __str__(self):
         return f"{self.name} ({self.year})"
@@ -48,6 +59,10 @@ class Question(models.Model):
     
     # Only the new ManyToManyField remains. This is the final version.
     exams = models.ManyToManyField('Exam', related_name='questions')
+    exam_ids = models.TextField(
+        blank=True, default='', editable=False,
+        help_text="Denormalized copy of `exams` (',3,7,'), kept in sync by questionbank.exam_membership"
+    )
     slug = models.SlugField(max_length=150, null=True, blank=True, unique=True)
     
     sub_topic = models.CharField(max_length=255, blank=True, help_text="e.g., Indian Freedom Movement")
@@ -97,6 +112,7 @@ class Question(models.Model):
     
     times_answered = models.PositiveIntegerField(default=0, db_index=True)
     times_correct = models.PositiveIntegerField(default=0)
+    random_key = models.FloatField(default=random_sort_key, db_index=True, editable=False, help_text="Uniform [0, 1) key used for indexed random sampling")
     
     # --- Prompt 1: New fields ---
     text_hash = models.CharField(max_length=64, unique=True, db_index=True, null=True, blank=True)
@@ -113,6 +129,12 @@ class Question(models.Model):
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='approved')
 
+    class Meta:
+        indexes = [
+            # Lets topic-scoped random sampling seek straight into the topic's keys
+            models.Index(fields=['topic', 'random_key'], name='question_topic_random_idx'),
+        ]
+
     @property
     def global_accuracy(self):
         if self.times_answered == 0:
@@ -261,12 +283,253 @@ class ExamSyllabus(models.Model):
     def __str__(self):
         return f"{self.exam.name}: {self.num_questions} questions from {self.topic.name}"
 
+class SyllabusTopicIndex(models.Model):
+    """
+    Exam -> topic id mapping compiled from syllabus_db.SYLLABUS_DATABASE and ExamSyllabus,
+    so syllabus-restricted queries filter on topic_id instead of chains of name LIKEs.
+    Maintained by questionbank.syllabus_index.
+    """
+    SOURCE_STATIC = 'static'
+    SOURCE_EXAM_SYLLABUS = 'exam_syllabus'
+    SOURCE_CHOICES = (
+        (SOURCE_STATIC, 'Syllabus database'),
+        (SOURCE_EXAM_SYLLABUS, 'Exam syllabus'),
+    )
+
+    exam = models.ForeignKey('Exam', on_delete=models.CASCADE, related_name='syllabus_index')
+    topic = models.ForeignKey('Topic', on_delete=models.CASCADE, related_name='syllabus_index')
+    syllabus_topic = models.CharField(max_length=255, help_text="Syllabus entry the topic was matched from")
+    marks = models.PositiveIntegerField(default=0, help_text="Marks (static syllabus) or questions (exam syllabus) for the entry")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=SOURCE_STATIC)
+
+    class Meta:
+        unique_together = ('exam', 'topic', 'syllabus_topic', 'source')
+        indexes = [
+            models.Index(fields=['exam', 'source', 'topic'], name='syllabus_index_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.exam.name}: {self.topic.name} ({self.syllabus_topic})"
+
 class UserAnswer(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='answers')
     question = models.ForeignKey('Question', on_delete=models.CASCADE, related_name='user_answers')
     selected_option = models.CharField(max_length=1)
     is_correct = models.BooleanField()
-    answered_at = models.DateTimeField(auto_now_add=True)
+    # Set explicitly when answers are applied after the fact (questionbank.answer_events)
+    answered_at = models.DateTimeField(default=timezone.now, editable=False)
+    # The question's difficulty when answered, which TopicProgress counted it under
+    # (blank for answers recorded before it was kept); see questionbank.rescoring
+    difficulty = models.CharField(max_length=20, blank=True, editable=False)
+    # Set by rollup_question_stats once the answer is in Question.times_answered / times_correct
+    stats_folded = models.BooleanField(default=False, editable=False)
+    # Set by rollup_daily_stats once the answer is in UserDailyStats
+    daily_folded = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(stats_folded=False), name='answer_stats_unfolded_idx'),
+            models.Index(fields=['user', 'id'], condition=models.Q(daily_folded=False), name='answer_daily_unfolded_idx'),
+        ]
+
+class UserQuestionState(models.Model):
+    """
+    Per-user, per-question answer summary (when it was last answered and how often)
+    plus its SM-2 review schedule (ease, interval and when it is next due).
+    Derived from UserAnswer by questionbank.question_state; lets the engine rank
+    unseen / due / recent candidates with one indexed join.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='question_states')
+    question = models.ForeignKey('Question', on_delete=models.CASCADE, related_name='user_states')
+    last_answered_at = models.DateTimeField()
+    times_answered = models.PositiveIntegerField(default=0)
+    ease_factor = models.FloatField(default=2.5)
+    interval_days = models.PositiveIntegerField(default=0)
+    repetitions = models.PositiveIntegerField(default=0, help_text="Correct answers in a row")
+    due_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('user', 'question')
+        indexes = [
+            models.Index(fields=['user', 'last_answered_at'], name='question_state_recency_idx'),
+            models.Index(fields=['user', 'due_at'], name='question_state_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - Q{self.question_id} x{self.times_answered}"
+
+class QuestionQueue(models.Model):
+    """
+    Pre-selected "next questions" for one user and one filter combination
+    (exam / topic / language / difficulty). Requests pop ids from the front;
+    `refill_question_queues` tops it up with QuestionEngine picks.
+    """
+    KIND_CHOICES = (
+        ('practice', 'Practice'),
+        ('daily', 'Daily Quiz'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='question_queues')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='practice')
+    filter_key = models.CharField(max_length=255)
+    filters = models.JSONField(default=dict, blank=True)
+    question_ids = models.JSONField(default=list, blank=True)
+    refilled_at = models.DateTimeField(null=True, blank=True)
+    needs_refill = models.BooleanField(default=True, db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'filter_key')
+
+    def __str__(self):
+        return f"{self.user.username} [{self.filter_key}] {len(self.question_ids)} queued"
+
+class MockExamPaper(models.Model):
+    """
+    A pre-generated mock exam paper (questionbank.mock_exam) for one exam and
+    language. `warm_mock_exam_pool` keeps a pool of these per exam so the
+    generate endpoint can hand one out instead of building a paper live.
+    """
+    exam = models.ForeignKey('Exam', on_delete=models.CASCADE, related_name='mock_papers')
+    language = models.CharField(max_length=10, blank=True, help_text="Blank for papers in any language")
+    question_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    served_count = models.PositiveIntegerField(default=0)
+    served_to = models.ManyToManyField(User, blank=True, related_name='mock_papers_taken')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['exam', 'language', 'created_at'], name='mock_paper_pool_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.exam.name} [{self.language or 'any'}] paper #{self.pk} x{self.served_count}"
+
+class AnswerEvent(models.Model):
+    """
+    Append-only log of single answers taken by SubmitAnswerView when
+    ANSWER_EVENT_LOG_ENABLED is on. Consumers (questionbank.answer_events) turn
+    events into UserAnswer rows, TopicProgress, XP and streaks in batches,
+    marking each event applied in the same transaction.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='answer_events')
+    question = models.ForeignKey('Question', on_delete=models.CASCADE, related_name='answer_events')
+    selected_option = models.CharField(max_length=1)
+    is_correct = models.BooleanField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    applied = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(applied=False), name='answer_event_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.user_id} -> Q{self.question_id} {self.selected_option}"
+
+class RollupCheckpoint(models.Model):
+    """
+    Lock row of an incremental rollup job: runs hold it while they fold and mark
+    answers, so they never overlap. See questionbank.question_stats.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+class CacheVersion(models.Model):
+    """
+    Version of a family of cached entries (answer keys, dashboard payloads).
+    Writes bump it and readers key their cache entries on it, so a bump made by
+    one worker process is seen by every other one. See questionbank.cache_versions.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class UserDailyStats(models.Model):
+    """
+    Answers a user gave on one day, per topic and per exam set of the answered
+    questions (exam_ids: their sorted, comma-separated exam ids when folded in).
+    Folded from UserAnswer by questionbank.daily_stats; the progress dashboard
+    reads these instead of the user's answer history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    topic = models.ForeignKey('Topic', on_delete=models.CASCADE, related_name='daily_stats')
+    exam_ids = models.TextField(blank=True)
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'date', 'topic', 'exam_ids')
+
+    def __str__(self):
+        return f"{self.user_id} {self.date} topic {self.topic_id}: {self.correct}/{self.answered}"
+
+class UserActivityYear(models.Model):
+    """
+    One user's study activity in one calendar year: a 16-bit counter per day
+    (answers given plus feed cards read) packed into `days`. Maintained by
+    questionbank.activity; the activity calendar, heatmap and active-day
+    badges read it instead of scanning answers and feed views.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_years')
+    year = models.PositiveSmallIntegerField()
+    days = models.BinaryField(default=b'', help_text="uint16 activity counter per day of the year (366 entries)")
+
+    class Meta:
+        unique_together = ('user', 'year')
+
+    def __str__(self):
+        return f"{self.user_id} activity {self.year}"
+
+class WeeklyMissionProgress(models.Model):
+    """
+    One user's weekly mission counters for the ISO week in `week` ('2026-W42').
+    Maintained by questionbank.weekly_missions as answers, mock tests and feed
+    reads come in; the first event of a new week resets the counters.
+    `has_wrong_answers` carries over between weeks.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='weekly_missions')
+    week = models.CharField(max_length=8)
+    questions_answered = models.PositiveIntegerField(default=0)
+    mock_tests = models.PositiveIntegerField(default=0)
+    current_affairs_read = models.PositiveIntegerField(default=0)
+    wrong_reviewed = models.PositiveIntegerField(default=0, help_text="Correct answers to questions the user had answered wrong before")
+    has_wrong_answers = models.BooleanField(default=False)
+    rewarded = models.JSONField(default=list, blank=True, help_text="Missions whose XP was granted this week")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} missions {self.week}"
+
+class TopicQuestionCount(models.Model):
+    """
+    Number of questions per topic, language, difficulty, institute (NULL for the
+    shared bank) and status. Maintained from Question saves and deletes by
+    questionbank.topic_counts, so topic listings read every count in one query.
+    """
+    topic = models.ForeignKey('Topic', on_delete=models.CASCADE, related_name='question_counts')
+    language = models.CharField(max_length=5)
+    difficulty = models.CharField(max_length=20)
+    institute = models.ForeignKey('institutes.Institute', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('topic', 'language', 'difficulty', 'institute', 'status')
+        constraints = [
+            # NULL institutes never collide under unique_together, so the shared bank needs its own constraint
+            models.UniqueConstraint(
+                fields=['topic', 'language', 'difficulty', 'status'], condition=models.Q(institute__isnull=True),
+                name='unique_shared_topic_question_count',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic_id} {self.language}/{self.difficulty}/{self.status}: {self.count}"
 
 class Bookmark(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -318,6 +581,9 @@ class DailyExamAttempt(models.Model):
     score = models.FloatField()
     time_taken = models.IntegerField(help_text="Time taken in seconds")
     submitted_at = models.DateTimeField(auto_now_add=True)
+    responses = models.BinaryField(
+        default=b'', help_text="Answer sheet aligned to the paper's question order (see questionbank.response_sheet)"
+    )
 
     class Meta:
         # A user can only attempt a specific daily exam once
@@ -346,11 +612,38 @@ class ModelExamAttempt(models.Model):
     score = models.FloatField()
     time_taken = models.IntegerField(help_text="Time taken in seconds")
     submitted_at = models.DateTimeField(auto_now_add=True)
+    responses = models.BinaryField(
+        default=b'', help_text="Answer sheet aligned to the paper's question order (see questionbank.response_sheet)"
+    )
 
     class Meta:
         ordering = ['-score', 'time_taken']
 
 
+class ExamScoreHistogram(models.Model):
+    """
+    Score and time distribution of one model or daily exam's attempts, in
+    fixed-width buckets. Maintained incrementally on every attempt insert by
+    questionbank.score_histogram, so percentiles and ranks never sort attempts.
+    """
+    MODEL_EXAM = 'model_exam'
+    DAILY_EXAM = 'daily_exam'
+    PAPER_TYPES = [(MODEL_EXAM, 'Model Exam'), (DAILY_EXAM, 'Daily Exam')]
+
+    paper_type = models.CharField(max_length=20, choices=PAPER_TYPES)
+    paper_id = models.PositiveIntegerField()
+    attempts = models.PositiveIntegerField(default=0)
+    score_buckets = models.JSONField(default=list, help_text="Attempt counts per score bucket, lowest first")
+    time_buckets = models.JSONField(default=list, help_text="Attempt counts per time-taken bucket, fastest first")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('paper_type', 'paper_id')
+
+    def __str__(self):
+        return f"{self.paper_type} {self.paper_id}: {self.attempts} attempts"
+
+
 
 class PreviousYearPaper(models.Model):
     title = models.CharField(max_length=255, help_text="e.g., LDC Main Exam 2017")
@@ -517,6 +810,7 @@ class PracticeSession(models.Model):
         ('mixed', 'Mixed Practice'),
         ('pyq', 'Previous Year Questions'),
         ('weak_area', 'Weak Area Drill'),
+        ('review', 'Spaced Review'),
     ]
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='practice_sessions')
     session_type = models.CharField(max_length=20, choices=SESSION_TYPES)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .engine import QuestionEngine
+from .models import Question, QuestionQueue, UserQuestionState
+
+# Filters that make up a queue's key; anything else is not queueable.
+QUEUE_FILTERS = ('exam_id', 'topic_id', 'language', 'difficulty')
+
+
+def _queue_size():
+    return getattr(settings, 'QUESTION_QUEUE_SIZE', 50)
+
+
+def _low_watermark():
+    return getattr(settings, 'QUESTION_QUEUE_LOW_WATERMARK', 15)
+
+
+def _max_age():
+    return timedelta(hours=getattr(settings, 'QUESTION_QUEUE_MAX_AGE_HOURS', 24))
+
+
+def queue_filters(filters):
+    return {name: filters[name] for name in QUEUE_FILTERS if filters.get(name)}
+
+
+def queue_key(kind, filters, institute_id=None):
+    key = f"{kind}:" + ';'.join(f"{name}={value}" for name, value in queue_filters(filters).items())
+    if institute_id:
+        # The engine adds the institute's own questions, so each tenancy gets its own queue
+        key += f"@institute={institute_id}"
+    return key
+
+
+def _engine_pick(user, kind, filters, limit, exclude_ids=()):
+    """Asks the engine for questions, so queued picks follow the same prioritization."""
+    if kind == 'daily':
+        return QuestionEngine.get_daily_quiz(
+            user, limit=limit, language=filters.get('language'), exclude_ids=exclude_ids
+        )
+    engine_filters = dict(filters)
+    if exclude_ids:
+        engine_filters['exclude_ids'] = list(exclude_ids)
+    return QuestionEngine.get_questions_for_user(user, engine_filters, limit=limit)
+
+
+def _pick_ids(queue):
+    """Returns (question ids, pick time) for a fresh engine pick for the queue."""
+    picked_at = timezone.now()
+    question_ids = list(
+        _engine_pick(queue.user, queue.kind, queue.filters, _queue_size()).values_list('id', flat=True)
+    )
+    return question_ids, picked_at
+
+
+def _drop_answered(user, question_ids, since):
+    """Lazily skips queued ids the user has answered since the queue was filled."""
+    if not question_ids or since is None:
+        return question_ids
+    answered = set(
+        UserQuestionState.objects.filter(
+            user=user, question_id__in=question_ids, last_answered_at__gte=since
+        ).values_list('question_id', flat=True)
+    )
+    return [qid for qid in question_ids if qid not in answered]
+
+
+def pop_questions(user, filters, count, kind='practice'):
+    """
+    Returns up to `count` Questions for an authenticated user from their queue for
+    these filters, creating the queue from one engine pick on first use. Queues
+    that fall below the low watermark (or get too old) are flagged for the
+    background refill; if a queue runs dry the remainder comes straight from the engine.
+    """
+    filters = queue_filters(filters)
+    profile = user.userprofile if hasattr(user, 'userprofile') else None
+    if not filters.get('language') and profile and profile.preferred_language:
+        # Key on the effective language so switching it does not serve the old queue
+        filters['language'] = profile.preferred_language
+    key = queue_key(kind, filters, institute_id=profile.institute_id if profile else None)
+
+    with transaction.atomic():
+        queue = QuestionQueue.objects.select_for_update().filter(user=user, filter_key=key).first()
+        if queue is None:
+            picked_at = timezone.now()
+            fresh = list(_engine_pick(user, kind, filters, _queue_size()))
+            queue, created = QuestionQueue.objects.get_or_create(user=user, filter_key=key, defaults={
+                'kind': kind,
+                'filters': filters,
+                'question_ids': [q.id for q in fresh[count:]],
+                'refilled_at': picked_at,
+                'needs_refill': len(fresh) - count < _low_watermark(),
+            })
+            if created:
+                # Just picked, so the head is served as is without another answered check
+                return fresh[:count]
+            queue = QuestionQueue.objects.select_for_update().get(pk=queue.pk)
+
+        picked = []
+        pending = list(queue.question_ids)
+        while len(picked) < count and pending:
+            wanted = count - len(picked)
+            picked += _drop_answered(user, pending[:wanted], queue.refilled_at)
+            pending = pending[wanted:]
+
+        queue.question_ids = pending
+        if len(pending) < _low_watermark() or queue.refilled_at < timezone.now() - _max_age():
+            queue.needs_refill = True
+        queue.save(update_fields=['question_ids', 'needs_refill'])
+
+    by_id = Question.objects.in_bulk(picked)
+    questions = [by_id[qid] for qid in picked if qid in by_id]
+    if len(questions) < count:
+        exclude_ids = [q.id for q in questions] + pending
+        questions += list(_engine_pick(user, kind, filters, count - len(questions), exclude_ids))
+    return questions
+
+
+def drop_user_queues(user_id):
+    """Discards a user's queues, e.g. after their preferred exams change."""
+    QuestionQueue.objects.filter(user_id=user_id).delete()
+
+
+def refill_pending_queues(limit=None):
+    """Refills every queue flagged as low. Returns the number of queues refilled."""
+    pending = QuestionQueue.objects.filter(needs_refill=True).select_related('user').order_by('id')
+    if limit:
+        pending = pending[:limit]
+
+    refilled = 0
+    for queue in pending:
+        # Pick outside the row lock so pops are not blocked by the engine query
+        question_ids, picked_at = _pick_ids(queue)
+        with transaction.atomic():
+            locked = QuestionQueue.objects.select_for_update().filter(pk=queue.pk).first()
+            if locked is None:
+                continue
+            locked.question_ids = question_ids
+            locked.refilled_at = picked_at
+            locked.needs_refill = False
+            locked.save(update_fields=['question_ids', 'refilled_at', 'needs_refill'])
+        refilled += 1
+    return refilled
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import UserAnswer, UserQuestionState
+
+# SM-2 scheduling. Answers are binary, so a correct answer is graded as quality 5
+# and a wrong one as quality 2 (a lapse: the question starts over at one day).
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+QUALITY_CORRECT = 5
+QUALITY_WRONG = 2
+
+STATE_FIELDS = ('last_answered_at', 'times_answered', 'ease_factor', 'interval_days', 'repetitions', 'due_at')
+
+
+def sm2_step(ease_factor, interval_days, repetitions, is_correct):
+    """Applies one answer to an SM-2 schedule. Returns (ease_factor, interval_days, repetitions)."""
+    quality = QUALITY_CORRECT if is_correct else QUALITY_WRONG
+    if is_correct:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1
+        elif repetitions == 2:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * ease_factor))
+    else:
+        repetitions = 0
+        interval_days = 1
+    ease_factor += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return max(MIN_EASE, round(ease_factor, 2)), interval_days, repetitions
+
+
+def schedule_review(answers):
+    """
+    Replays `answers` -- (answered_at, is_correct) pairs in the order they were
+    given -- and returns the resulting state fields for a UserQuestionState row.
+    """
+    ease_factor, interval_days, repetitions = INITIAL_EASE, 0, 0
+    last_answered_at = None
+    for answered_at, is_correct in answers:
+        ease_factor, interval_days, repetitions = sm2_step(ease_factor, interval_days, repetitions, is_correct)
+        last_answered_at = answered_at
+    return {
+        'last_answered_at': last_answered_at,
+        'times_answered': len(answers),
+        'ease_factor': ease_factor,
+        'interval_days': interval_days,
+        'repetitions': repetitions,
+        'due_at': last_answered_at + timedelta(days=interval_days),
+    }
+
+
+def _answer_history(**filters):
+    """Returns {(user_id, question_id): [(answered_at, is_correct), ...]} in answer order."""
+    history = {}
+    for user_id, question_id, answered_at, is_correct in UserAnswer.objects.filter(**filters).order_by(
+        'answered_at', 'id'
+    ).values_list('user_id', 'question_id', 'answered_at', 'is_correct'):
+        history.setdefault((user_id, question_id), []).append((answered_at, is_correct))
+    return history
+
+
+def refresh_question_states(user_ids, question_ids):
+    """
+    Recomputes the UserQuestionState rows for every (user, question) pair in
+    `user_ids` x `question_ids` from the UserAnswer table, replaying each pair's
+    answers through SM-2. Pairs without answers lose their row. Used after
+    answers are created, edited, deleted or moved.
+    """
+    user_ids, question_ids = list(user_ids), list(question_ids)
+    if not user_ids or not question_ids:
+        return
+
+    summaries = {
+        key: schedule_review(answers)
+        for key, answers in _answer_history(user_id__in=user_ids, question_id__in=question_ids).items()
+    }
+
+    with transaction.atomic():
+        existing = {
+            (state.user_id, state.question_id): state
+            for state in UserQuestionState.objects.select_for_update().filter(
+                user_id__in=user_ids, question_id__in=question_ids
+            )
+        }
+        gone = [state.pk for key, state in existing.items() if key not in summaries]
+        if gone:
+            UserQuestionState.objects.filter(pk__in=gone).delete()
+
+        to_update, to_create = [], []
+        for key, row in summaries.items():
+            state = existing.get(key)
+            if state is None:
+                to_create.append(UserQuestionState(user_id=key[0], question_id=key[1], **row))
+            elif any(getattr(state, field) != row[field] for field in STATE_FIELDS):
+                for field in STATE_FIELDS:
+                    setattr(state, field, row[field])
+                to_update.append(state)
+
+        if to_update:
+            UserQuestionState.objects.bulk_update(to_update, STATE_FIELDS)
+        if to_create:
+            UserQuestionState.objects.bulk_create(to_create, ignore_conflicts=True)
+
+
+def rebuild_question_states(user_id):
+    """Recomputes every state row for one user."""
+    history = _answer_history(user_id=user_id)
+    with transaction.atomic():
+        UserQuestionState.objects.filter(user_id=user_id).delete()
+        UserQuestionState.objects.bulk_create([
+            UserQuestionState(user_id=user_id, question_id=question_id, **schedule_review(answers))
+            for (_, question_id), answers in history.items()
+        ], batch_size=1000)
+    return len(history)
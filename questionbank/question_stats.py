@@ -0,0 +1,95 @@
+"""
+Global per-question answer counters (Question.times_answered / times_correct).
+
+Answer paths never touch the Question row; `rollup_question_stats` periodically
+folds the UserAnswer rows not yet marked `stats_folded` into the counters with
+one set-based UPDATE per batch and marks them in the same transaction. Picking
+rows by the flag rather than by an id high-water mark means answers whose
+transactions commit out of id order are folded by the next run, not skipped.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+
+from .answer_keys import invalidate_question_keys
+from .models import Question, RollupCheckpoint, UserAnswer
+from .topic_counts import refresh_topic_counts
+
+CHECKPOINT_NAME = 'question_stats'
+
+# Accuracy bands used by recalibrate_difficulty
+EASY_ACCURACY = 0.7
+HARD_ACCURACY = 0.4
+
+
+def lock_rollup():
+    """
+    Locks the rollup until the end of the current transaction, for writers that
+    must not race it over which answers are folded (questionbank.rescoring).
+    """
+    RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT_NAME)
+
+
+def _fold(answer_ids):
+    """Adds the answers `answer_ids` to their questions' counters in one UPDATE."""
+    answers = UserAnswer.objects.filter(id__in=answer_ids)
+    per_question = answers.filter(question_id=OuterRef('pk')).order_by().values('question_id')
+    return Question.objects.filter(pk__in=answers.values('question_id')).update(
+        times_answered=F('times_answered') + Subquery(per_question.annotate(n=Count('id')).values('n')),
+        times_correct=F('times_correct') + Subquery(
+            per_question.annotate(n=Count('id', filter=Q(is_correct=True))).values('n')
+        ),
+    )
+
+
+def rollup_question_stats(batch_size=50000):
+    """
+    Folds every UserAnswer not folded yet into the question counters, in batches
+    of `batch_size` answers. Returns (answers folded, questions updated).
+    """
+    folded = updated = 0
+    while True:
+        with transaction.atomic():
+            # The lock row serialises concurrent runs
+            lock_rollup()
+            ready = list(UserAnswer.objects.filter(stats_folded=False).order_by('id').values_list(
+                'id', flat=True
+            )[:batch_size])
+            if not ready:
+                break
+            updated += _fold(ready)
+            UserAnswer.objects.filter(id__in=ready).update(stats_folded=True)
+            folded += len(ready)
+        if len(ready) < batch_size:
+            break
+    return folded, updated
+
+
+def reset_question_stats():
+    """Zeroes every counter and unmarks every answer, so the next rollup recounts all answers."""
+    with transaction.atomic():
+        lock_rollup()
+        Question.objects.exclude(times_answered=0, times_correct=0).update(times_answered=0, times_correct=0)
+        UserAnswer.objects.filter(stats_folded=True).update(stats_folded=False)
+
+
+def recalibrate_difficulty(min_answers=30):
+    """
+    Re-labels questions with at least `min_answers` answers from their observed
+    accuracy (easy >= 70%, hard < 40%, medium in between) in one UPDATE, then
+    recounts the affected topics' question counts and drops the questions'
+    answer keys. Returns the number of questions whose difficulty changed.
+    """
+    observed = Case(
+        When(times_correct__gte=F('times_answered') * EASY_ACCURACY, then=Value('easy')),
+        When(times_correct__lt=F('times_answered') * HARD_ACCURACY, then=Value('hard')),
+        default=Value('medium'),
+    )
+    relabelled = Question.objects.filter(times_answered__gte=max(1, min_answers)).alias(
+        observed_difficulty=observed
+    ).exclude(difficulty=F('observed_difficulty'))
+    relabelled_rows = list(relabelled.values_list('id', 'topic_id'))
+    changed = relabelled.update(difficulty=observed)
+    refresh_topic_counts({topic_id for _, topic_id in relabelled_rows})
+    # Answer keys carry the difficulty
+    invalidate_question_keys([question_id for question_id, _ in relabelled_rows])
+    return changed
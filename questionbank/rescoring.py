@@ -0,0 +1,242 @@
+"""
+Re-scoring after questions' answer keys are corrected.
+
+`rescore_questions` re-grades everything recorded against the given questions
+with their current correct answers: UserAnswer.is_correct (and through it the
+TopicProgress counters, question states, the global question counters and the
+daily stats rollup), pending AnswerEvents, practice session answers and session
+scores, and the scores of model and daily exam attempts, decoded from their
+response sheets (and with them the exams' score histograms). Rows are read in
+keyset-paginated chunks, compared in memory and written back with a few
+set-based UPDATEs per chunk; the affected users' cached dashboards are dropped.
+"""
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, Count, F, IntegerField, OuterRef, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from .daily_stats import correct_folded_answers
+from .grading import DIFFICULTIES, grade_sheet, percentage_score
+from .models import (
+    AnswerEvent, DailyExam, DailyExamAttempt, ModelExam, ModelExamAttempt, PracticeSession,
+    Question, SessionAnswer, TopicProgress, UserAnswer,
+)
+from .question_state import refresh_question_states
+from .question_stats import lock_rollup as lock_question_stats
+from .response_sheet import ResponseSheet
+from .score_histogram import PAPERS as HISTOGRAM_PAPERS, update_histogram
+from .user_cache import bump_user_data
+
+
+def _chunks(rows, chunk_size):
+    """Yields `rows` (a values_list() whose first column is the id) in id order, `chunk_size` at a time."""
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id).order_by('id')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def _is_correct(selected, correct_answer):
+    return bool(selected) and selected == correct_answer
+
+
+def _set_flags(model, flips):
+    """Writes flipped is_correct values: one UPDATE per direction."""
+    for now_correct in (True, False):
+        ids = [row_id for row_id, flipped_to in flips if flipped_to == now_correct]
+        if ids:
+            model.objects.filter(id__in=ids).update(is_correct=now_correct)
+
+
+def _apply_progress_deltas(flips, keys):
+    """
+    Moves the users' TopicProgress correct counters by the flipped answers
+    (`flips`: (user_id, question_id, now_correct, difficulty when answered)),
+    one UPDATE per distinct (topic, difficulty, delta) group of users. The
+    per-difficulty counter is the one the answer was counted under, not the
+    question's current difficulty; answers recorded without it only move
+    total_correct.
+    """
+    deltas = {}
+    for user_id, question_id, now_correct, difficulty in flips:
+        topic_id = keys[question_id][1]
+        if topic_id:
+            group = (topic_id, difficulty if difficulty in DIFFICULTIES else None, user_id)
+            deltas[group] = deltas.get(group, 0) + (1 if now_correct else -1)
+
+    groups = {}
+    for (topic_id, difficulty, user_id), delta in deltas.items():
+        if delta:
+            groups.setdefault((topic_id, difficulty, delta), []).append(user_id)
+    for (topic_id, difficulty, delta), user_ids in groups.items():
+        fields = ['total_correct'] + ([f"{difficulty}_correct"] if difficulty else [])
+        TopicProgress.objects.filter(topic_id=topic_id, user_id__in=user_ids).update(
+            **{field: Greatest(F(field) + delta, Value(0)) for field in fields}
+        )
+
+
+def _apply_counter_deltas(flips):
+    """Moves Question.times_correct by the flipped answers that were already folded into it."""
+    deltas = {}
+    for question_id, now_correct in flips:
+        deltas[question_id] = deltas.get(question_id, 0) + (1 if now_correct else -1)
+    whens = [When(id=question_id, then=Value(delta)) for question_id, delta in deltas.items() if delta]
+    if whens:
+        Question.objects.filter(id__in=list(deltas)).update(
+            times_correct=Greatest(
+                F('times_correct') + Case(*whens, default=Value(0), output_field=IntegerField()), Value(0)
+            )
+        )
+
+
+def _rescore_user_answers(keys, chunk_size, users):
+    rows = UserAnswer.objects.filter(question_id__in=list(keys)).values_list(
+        'id', 'user_id', 'question_id', 'selected_option', 'is_correct', 'answered_at', 'difficulty'
+    )
+    changed = 0
+    for chunk in _chunks(rows, chunk_size):
+        flips = [
+            (answer_id, user_id, question_id, not was_correct, answered_at, difficulty)
+            for answer_id, user_id, question_id, selected, was_correct, answered_at, difficulty in chunk
+            if _is_correct(selected, keys[question_id][0]) != was_correct
+        ]
+        if not flips:
+            continue
+        with transaction.atomic():
+            # Holding the rollup lock keeps rollup_question_stats from folding
+            # these answers between reading their flags and flipping them
+            lock_question_stats()
+            folded = set(UserAnswer.objects.filter(
+                id__in=[flip[0] for flip in flips], stats_folded=True
+            ).values_list('id', flat=True))
+            _set_flags(UserAnswer, [(answer_id, now_correct) for answer_id, _, _, now_correct, _, _ in flips])
+            _apply_progress_deltas([flip[1:4] + flip[5:] for flip in flips], keys)
+            _apply_counter_deltas([
+                (question_id, now_correct) for answer_id, _, question_id, now_correct, _, _ in flips if answer_id in folded
+            ])
+            correct_folded_answers([
+                (answer_id, user_id, answered_at, keys[question_id][1], keys[question_id][3], now_correct)
+                for answer_id, user_id, question_id, now_correct, answered_at, _ in flips
+            ])
+        refresh_question_states({flip[1] for flip in flips}, {flip[2] for flip in flips})
+        users.update(flip[1] for flip in flips)
+        changed += len(flips)
+    return changed
+
+
+def _rescore_answer_events(keys):
+    """Re-grades events the consumers have not applied yet, in one UPDATE."""
+    AnswerEvent.objects.filter(question_id__in=list(keys), applied=False).update(is_correct=Case(
+        *[When(question_id=question_id, selected_option=correct, then=Value(True))
+          for question_id, (correct, *_) in keys.items() if correct],
+        default=Value(False), output_field=BooleanField(),
+    ))
+
+
+def _rescore_sessions(keys, chunk_size, users):
+    rows = SessionAnswer.objects.filter(question_id__in=list(keys)).values_list(
+        'id', 'session_id', 'question_id', 'selected_option', 'is_correct'
+    )
+    changed, session_ids = 0, set()
+    for chunk in _chunks(rows, chunk_size):
+        flips = [
+            (answer_id, session_id, not was_correct)
+            for answer_id, session_id, question_id, selected, was_correct in chunk
+            if _is_correct(selected, keys[question_id][0]) != was_correct
+        ]
+        if flips:
+            _set_flags(SessionAnswer, [(answer_id, now_correct) for answer_id, _, now_correct in flips])
+            session_ids.update(session_id for _, session_id, _ in flips)
+            changed += len(flips)
+    if session_ids:
+        sessions = PracticeSession.objects.filter(id__in=session_ids, completed_at__isnull=False)
+        sessions.update(correct_count=Coalesce(Subquery(
+            SessionAnswer.objects.filter(session_id=OuterRef('pk'), is_correct=True)
+            .order_by().values('session_id').annotate(n=Count('id')).values('n')[:1]
+        ), 0))
+        users.update(sessions.values_list('user_id', flat=True))
+    return changed
+
+
+def _rescore_attempts(attempts, chunk_size, users):
+    """
+    Re-grades `attempts` from their response sheets with grade_sheet and scores
+    them like a fresh submission (grading.percentage_score), moving them in the
+    score histograms.
+    """
+    paper_type, paper_field = HISTOGRAM_PAPERS[attempts.model]
+    rows = attempts.exclude(responses=b'').values_list('id', 'user_id', paper_field, 'score', 'time_taken', 'responses')
+    correct_answers = {}
+    changed = 0
+    for chunk in _chunks(rows, chunk_size):
+        sheets = [(row[:5], ResponseSheet.from_bytes(row[5])) for row in chunk]
+        unknown = {question_id for _, sheet in sheets for question_id in sheet.question_ids} - correct_answers.keys()
+        if unknown:
+            correct_answers.update(Question.objects.filter(id__in=unknown).values_list('id', 'correct_answer'))
+        updates, moves = [], {}
+        for (attempt_id, user_id, paper_id, score, time_taken), sheet in sheets:
+            questions = [
+                Question(id=question_id, correct_answer=correct_answers.get(question_id))
+                for question_id in sheet.question_ids
+            ]
+            new_score = percentage_score(grade_sheet(
+                questions, {question_id: selected for question_id, selected, _ in sheet}
+            ))
+            if abs(new_score - score) > 1e-9:
+                updates.append(attempts.model(id=attempt_id, score=new_score))
+                added, removed = moves.setdefault(paper_id, ([], []))
+                added.append((new_score, time_taken))
+                removed.append((score, time_taken))
+                users.add(user_id)
+        if updates:
+            with transaction.atomic():
+                attempts.model.objects.bulk_update(updates, ['score'])
+                for paper_id, (added, removed) in moves.items():
+                    update_histogram(paper_type, paper_id, added=added, removed=removed)
+            changed += len(updates)
+    return changed
+
+
+def rescore_questions(question_ids, chunk_size=1000):
+    """
+    Re-grades every answer and attempt recorded against `question_ids` with the
+    questions' current correct answers. Returns a summary dict: the number of
+    answers, session answers and attempts changed and the ids of the users whose
+    stats changed.
+    """
+    keys = {
+        question_id: (correct, topic_id, difficulty, exam_ids)
+        for question_id, correct, topic_id, difficulty, exam_ids in Question.objects.filter(
+            id__in=list(question_ids)
+        ).values_list('id', 'correct_answer', 'topic_id', 'difficulty', 'exam_ids')
+    }
+    summary = {'answers': 0, 'session_answers': 0, 'attempts': 0, 'users': set()}
+    if not keys:
+        return summary
+
+    users = summary['users']
+    summary['answers'] = _rescore_user_answers(keys, chunk_size, users)
+    _rescore_answer_events(keys)
+    summary['session_answers'] = _rescore_sessions(keys, chunk_size, users)
+    summary['attempts'] = _rescore_attempts(
+        ModelExamAttempt.objects.filter(model_exam__in=ModelExam.objects.filter(questions__in=list(keys))),
+        chunk_size, users,
+    ) + _rescore_attempts(
+        DailyExamAttempt.objects.filter(daily_exam__in=DailyExam.objects.filter(questions__in=list(keys))),
+        chunk_size, users,
+    )
+    bump_user_data(*users)
+    return summary
+
+
+def describe_rescore(summary):
+    return (
+        f"Re-scored {summary['answers']} answers, {summary['session_answers']} practice answers and "
+        f"{summary['attempts']} exam attempts; stats changed for {len(summary['users'])} users."
+    )
@@ -0,0 +1,94 @@
+"""
+Compact response vectors stored on model and daily exam attempts.
+
+An attempt keeps its whole answer sheet in one `responses` blob: the paper's
+question ids in answer-key order, one byte per question for the selected option
+(0 when unanswered) and, when the client sent them, seconds spent per question.
+Reviewing, re-scoring or aggregating an attempt decodes that single row in
+O(n) instead of joining its UserAnswer rows.
+"""
+import struct
+import zlib
+from array import array
+
+HEADER = struct.Struct('<BI')  # flags, question count
+HAS_TIMES = 0x01
+MAX_SECONDS = 0xFFFF
+
+
+def _option_byte(selected):
+    if not selected or len(selected) != 1 or ord(selected) > 0xFF:
+        return 0
+    return ord(selected)
+
+
+class ResponseSheet:
+    """
+    One attempt's answers aligned to its paper's question order.
+    Serialized as a header, 64-bit question ids, one option byte per question and
+    optional 16-bit seconds per question, compressed with zlib.
+    """
+    __slots__ = ('question_ids', 'selections', 'seconds')
+
+    def __init__(self, question_ids=(), selections=b'', seconds=None):
+        self.question_ids = array('Q', question_ids)
+        self.selections = bytes(selections)
+        self.seconds = array('H', seconds) if seconds is not None else None
+
+    @classmethod
+    def from_answer_key(cls, answer_key, answers, times=None):
+        """
+        Builds the sheet for `answers` ({question id: selected option}) over the
+        questions of `answer_key`; `times` ({question id: seconds}) is optional.
+        """
+        selections = bytes(_option_byte(selected) for selected in answer_key.sheet(answers))
+        seconds = None
+        if times:
+            times = {str(question_id): value for question_id, value in times.items()}
+            seconds = [
+                min(max(int(times.get(str(question_id)) or 0), 0), MAX_SECONDS)
+                for question_id in answer_key.question_ids
+            ]
+        return cls(answer_key.question_ids, selections, seconds)
+
+    @classmethod
+    def from_bytes(cls, data):
+        sheet = cls()
+        if not data:
+            return sheet
+        raw = zlib.decompress(bytes(data))
+        flags, count = HEADER.unpack_from(raw)
+        offset = HEADER.size
+        sheet.question_ids.frombytes(raw[offset:offset + count * 8])
+        offset += count * 8
+        sheet.selections = raw[offset:offset + count]
+        offset += count
+        if flags & HAS_TIMES:
+            sheet.seconds = array('H')
+            sheet.seconds.frombytes(raw[offset:offset + count * 2])
+        return sheet
+
+    def to_bytes(self):
+        if not self.question_ids:
+            return b''
+        flags = HAS_TIMES if self.seconds is not None else 0
+        parts = [HEADER.pack(flags, len(self.question_ids)), self.question_ids.tobytes(), self.selections]
+        if self.seconds is not None:
+            parts.append(self.seconds.tobytes())
+        return zlib.compress(b''.join(parts))
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __iter__(self):
+        """Yields (question id, selected option or '', seconds or None) in paper order."""
+        seconds = self.seconds if self.seconds is not None else [None] * len(self.question_ids)
+        for question_id, option, spent in zip(self.question_ids, self.selections, seconds):
+            yield question_id, chr(option) if option else '', spent
+
+    def marks(self, correct_answers):
+        """Returns one bool per question: whether its selection equals `correct_answers[question id]`."""
+        return [
+            bool(selected) and selected == correct_answers.get(question_id)
+            for question_id, selected, _ in self
+        ]
@@ -0,0 +1,114 @@
+import random
+
+from django.db.models import Case, IntegerField, Max, Min, Value, When
+
+# Id-range probing draws this many candidate ids per wanted row, and gives up
+# after a few rounds when the filter is too sparse for probing to pay off.
+PROBE_OVERSAMPLE = 3
+PROBE_ROUNDS = 4
+# Random-key sampling seeks a fresh random pivot for every SAMPLE_CHUNK rows,
+# using at most SAMPLE_PIVOTS pivots (larger samples take longer runs per pivot)
+SAMPLE_CHUNK = 5
+SAMPLE_PIVOTS = 4
+
+
+def _has_random_key(model):
+    return any(f.name == 'random_key' for f in model._meta.concrete_fields)
+
+
+def _seek(queryset, pivot, k):
+    """Up to `k` ids from `pivot` onwards in `random_key` order, wrapping around to the start."""
+    ids = list(
+        queryset.filter(random_key__gte=pivot).order_by('random_key').values_list('pk', flat=True)[:k]
+    )
+    if len(ids) < k:
+        ids += list(
+            queryset.filter(random_key__lt=pivot).order_by('random_key').values_list('pk', flat=True)[:k - len(ids)]
+        )
+    return ids
+
+
+def _sample_by_random_key(queryset, k):
+    """
+    Seeks into the indexed `random_key` column at a fresh random pivot for
+    every chunk of rows, so questions that neighbour each other in key order
+    are not served together; rows already taken are skipped.
+    """
+    chunk_size = max(SAMPLE_CHUNK, -(-k // SAMPLE_PIVOTS))
+    ids = []
+    while len(ids) < k:
+        wanted = min(chunk_size, k - len(ids))
+        chunk = _seek(queryset.exclude(pk__in=ids) if ids else queryset, random.random(), wanted)
+        ids += dict.fromkeys(chunk)
+        if len(chunk) < wanted:
+            # The seek wrapped around without filling up: nothing is left
+            break
+    return ids
+
+
+def _sample_by_id_range(queryset, k):
+    """
+    Draws random ids between the smallest and largest matching primary key and
+    keeps the ones that exist and match the filter (rejection sampling).
+    Falls back to sampling the full id list when the matches are too sparse.
+    """
+    bounds = queryset.order_by().aggregate(low=Min('pk'), high=Max('pk'))
+    low, high = bounds['low'], bounds['high']
+    if low is None:
+        return []
+
+    span = high - low + 1
+    found = []
+    seen = set()
+    for _ in range(PROBE_ROUNDS):
+        wanted = k - len(found)
+        if wanted <= 0:
+            break
+        draws = min(span, wanted * PROBE_OVERSAMPLE)
+        candidates = {random.randint(low, high) for _ in range(draws)} - seen
+        seen.update(candidates)
+        hits = list(queryset.filter(pk__in=candidates).values_list('pk', flat=True).distinct())
+        random.shuffle(hits)
+        found += hits[:wanted]
+        if len(seen) >= span:
+            break
+
+    if len(found) < k and len(seen) < span:
+        remaining = list(queryset.exclude(pk__in=found).values_list('pk', flat=True).distinct())
+        found += random.sample(remaining, min(k - len(found), len(remaining)))
+    return found
+
+
+def sample_ids(queryset, k):
+    """
+    Returns up to `k` random primary keys from `queryset` without ORDER BY RANDOM().
+    Models with an indexed `random_key` column (Question) are sampled by seeking
+    into that index; everything else uses id-range probing.
+    """
+    if k <= 0:
+        return []
+    if _has_random_key(queryset.model):
+        ids = _sample_by_random_key(queryset, k)
+    else:
+        ids = _sample_by_id_range(queryset, k)
+    random.shuffle(ids)
+    return ids
+
+
+def sample(queryset, k):
+    """
+    Returns a queryset of up to `k` random rows matching `queryset`.
+    Only the sampled rows are shuffled by the database, never the whole set.
+    """
+    return queryset.filter(pk__in=sample_ids(queryset, k)).order_by('?')
+
+
+def random_order(queryset):
+    """
+    Orders an unbounded Question queryset randomly by rotating the indexed
+    `random_key` column around a random pivot instead of sorting on RANDOM().
+    """
+    pivot = random.random()
+    return queryset.annotate(
+        _random_wrap=Case(When(random_key__gte=pivot, then=Value(0)), default=Value(1), output_field=IntegerField())
+    ).order_by('_random_wrap', 'random_key')
@@ -0,0 +1,151 @@
+"""
+Per-exam score histograms for model and daily exam attempts.
+
+Each paper has one ExamScoreHistogram row holding attempt counts in fixed-width
+score buckets (one percentage point wide) and time buckets (one minute wide,
+the last one open-ended). Attempt inserts, deletes and re-scores adjust the row
+under a row lock, so a percentile, a rank estimate or the cohort distribution
+is read from a single row in time independent of the number of attempts.
+"""
+from django.db import transaction
+
+from .models import DailyExamAttempt, ExamScoreHistogram, ModelExamAttempt
+
+SCORE_BUCKETS = 101          # scores are percentages; 100 gets a bucket of its own
+TIME_BUCKET_SECS = 60
+TIME_BUCKETS = 181           # up to three hours, then everything slower
+DISTRIBUTION_BANDS = 10
+
+# Attempt model -> (paper type, paper foreign key)
+PAPERS = {
+    ModelExamAttempt: (ExamScoreHistogram.MODEL_EXAM, 'model_exam_id'),
+    DailyExamAttempt: (ExamScoreHistogram.DAILY_EXAM, 'daily_exam_id'),
+}
+
+
+def score_bucket(score):
+    return min(max(int(score or 0), 0), SCORE_BUCKETS - 1)
+
+
+def time_bucket(seconds):
+    return min(max(int(seconds or 0) // TIME_BUCKET_SECS, 0), TIME_BUCKETS - 1)
+
+
+def _bump(buckets, size, index, delta):
+    if len(buckets) < size:
+        buckets.extend([0] * (size - len(buckets)))
+    buckets[index] = max(buckets[index] + delta, 0)
+
+
+def update_histogram(paper_type, paper_id, added=(), removed=()):
+    """
+    Applies attempts to a paper's histogram under a row lock: `added` and
+    `removed` are (score, time_taken) pairs. A paper's row is created by its
+    first added attempt.
+    """
+    if not added and not removed:
+        return
+    with transaction.atomic():
+        if added:
+            histogram, _ = ExamScoreHistogram.objects.select_for_update().get_or_create(
+                paper_type=paper_type, paper_id=paper_id
+            )
+        else:
+            histogram = ExamScoreHistogram.objects.select_for_update().filter(
+                paper_type=paper_type, paper_id=paper_id
+            ).first()
+            if histogram is None:
+                return
+        for attempts, delta in ((added, 1), (removed, -1)):
+            for score, time_taken in attempts:
+                _bump(histogram.score_buckets, SCORE_BUCKETS, score_bucket(score), delta)
+                _bump(histogram.time_buckets, TIME_BUCKETS, time_bucket(time_taken), delta)
+        histogram.attempts = max(histogram.attempts + len(added) - len(removed), 0)
+        histogram.save(update_fields=['attempts', 'score_buckets', 'time_buckets', 'updated_at'])
+
+
+def record_attempt(attempt, removed=False):
+    paper_type, paper_field = PAPERS[type(attempt)]
+    entry = [(attempt.score, attempt.time_taken)]
+    update_histogram(
+        paper_type, getattr(attempt, paper_field), added=() if removed else entry, removed=entry if removed else ()
+    )
+
+
+def get_histogram(paper_type, paper_id):
+    """The paper's histogram, or an empty unsaved one when nobody has attempted it yet."""
+    return (
+        ExamScoreHistogram.objects.filter(paper_type=paper_type, paper_id=paper_id).first()
+        or ExamScoreHistogram(paper_type=paper_type, paper_id=paper_id)
+    )
+
+
+def standing(histogram, score):
+    """
+    Where `score` stands among the paper's attempts: the percentage of attempts
+    scoring below it (ties count half) and a rank estimate (1 + attempts in
+    higher buckets).
+    """
+    if not histogram.attempts:
+        return {'attempts': 0, 'percentile': None, 'rank': None}
+    buckets = histogram.score_buckets
+    index = score_bucket(score)
+    below = sum(buckets[:index])
+    same = buckets[index] if index < len(buckets) else 0
+    return {
+        'attempts': histogram.attempts,
+        'percentile': round((below + same / 2) / histogram.attempts * 100, 1),
+        'rank': histogram.attempts - below - same + 1,
+    }
+
+
+def distribution(histogram):
+    """Cohort distribution: attempt counts in ten score bands and in ten-minute time bands."""
+    scores = histogram.score_buckets + [0] * (SCORE_BUCKETS - len(histogram.score_buckets))
+    band = (SCORE_BUCKETS - 1) // DISTRIBUTION_BANDS
+    score_bands = [
+        {'from': i * band, 'to': (i + 1) * band, 'count': sum(scores[i * band:(i + 1) * band])}
+        for i in range(DISTRIBUTION_BANDS)
+    ]
+    # The top band includes perfect scores
+    score_bands[-1]['count'] += scores[SCORE_BUCKETS - 1]
+
+    times = histogram.time_buckets
+    minutes_per_band = 10
+    time_bands = []
+    for start in range(0, len(times), minutes_per_band):
+        count = sum(times[start:start + minutes_per_band])
+        if count:
+            time_bands.append({'from_minutes': start, 'to_minutes': start + minutes_per_band, 'count': count})
+    return {'scores': score_bands, 'times': time_bands}
+
+
+def build_histograms(histogram_model, attempts):
+    """
+    Builds unsaved `histogram_model` rows from `attempts`, an iterable of
+    (paper type, paper id, score, time taken).
+    """
+    histograms = {}
+    for paper_type, paper_id, score, time_taken in attempts:
+        histogram = histograms.get((paper_type, paper_id))
+        if histogram is None:
+            histogram = histograms[(paper_type, paper_id)] = histogram_model(
+                paper_type=paper_type, paper_id=paper_id, attempts=0, score_buckets=[], time_buckets=[]
+            )
+        _bump(histogram.score_buckets, SCORE_BUCKETS, score_bucket(score), 1)
+        _bump(histogram.time_buckets, TIME_BUCKETS, time_bucket(time_taken), 1)
+        histogram.attempts += 1
+    return list(histograms.values())
+
+
+def rebuild_histograms():
+    """Recomputes every histogram from the attempt tables. Returns the number of histograms written."""
+    histograms = build_histograms(ExamScoreHistogram, (
+        (paper_type, *row)
+        for attempt_model, (paper_type, paper_field) in PAPERS.items()
+        for row in attempt_model.objects.values_list(paper_field, 'score', 'time_taken').iterator()
+    ))
+    with transaction.atomic():
+        ExamScoreHistogram.objects.all().delete()
+        ExamScoreHistogram.objects.bulk_create(histograms)
+    return len(histograms)
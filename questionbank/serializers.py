@@ -8,6 +8,7 @@ from .models import (
     UserProfile, UserAnswer, ExamSyllabus, CurrentAffairs,
     MasterStudyPlan, UserExamProgress
 )
+from .topic_counts import topic_question_counts
 # --- Cross-application models ---
 from institutes.models import Institute
 
@@ -36,12 +37,14 @@ class QuestionSerializer(serializers.ModelSerializer):
     topic = TopicSerializer(read_only=True)
     options = serializers.SerializerMethodField()
     correct_answer = serializers.SerializerMethodField()
+    global_accuracy = serializers.ReadOnlyField()
 
     class Meta:
         model = Question
         fields = [
             'id', 'text', 'options', 'correct_answer', 'explanation', 
-            'difficulty', 'institute', 'topic', 'sub_topic', 'exams'
+            'difficulty', 'institute', 'topic', 'sub_topic', 'exams',
+            'times_answered', 'global_accuracy'
         ]
 
     def get_options(self, obj):
@@ -285,6 +288,8 @@ class DailyExamAttemptSerializer(serializers.ModelSerializer):
 class SubmitDailyExamSerializer(serializers.Serializer):
     answers = serializers.JSONField()
     time_taken = serializers.IntegerField(required=False, default=0)
+    # Optional {question id: seconds spent}, kept in the attempt's response sheet
+    question_times = serializers.DictField(child=serializers.IntegerField(min_value=0), required=False, default=dict)
 
 
 
@@ -484,16 +489,30 @@ from .models import TopicProgress, PracticeSession, SessionAnswer
 
 class TopicListSerializer(serializers.ModelSerializer):
     question_count = serializers.SerializerMethodField()
+    question_breakdown = serializers.SerializerMethodField()
     user_accuracy = serializers.SerializerMethodField()
     is_weak_area = serializers.SerializerMethodField()
     last_practiced = serializers.SerializerMethodField()
 
     class Meta:
         model = Topic
-        fields = ['id', 'name', 'slug', 'image', 'question_count', 'user_accuracy', 'is_weak_area', 'last_practiced']
+        fields = ['id', 'name', 'slug', 'image', 'question_count', 'question_breakdown', 'user_accuracy', 'is_weak_area', 'last_practiced']
+
+    def _get_counts(self, obj):
+        # Every topic's counts in one query, unless the view passed them in
+        if not hasattr(self, '_counts_cache'):
+            self._counts_cache = self.context.get('question_counts')
+            if self._counts_cache is None:
+                self._counts_cache = topic_question_counts()
+        return self._counts_cache.get(obj.id)
 
     def get_question_count(self, obj):
-        return obj.questions_topic.count()
+        counts = self._get_counts(obj)
+        return counts['total'] if counts else 0
+
+    def get_question_breakdown(self, obj):
+        counts = self._get_counts(obj)
+        return {key: counts[key] for key in ('by_language', 'by_difficulty')} if counts else {'by_language': {}, 'by_difficulty': {}}
 
     def _get_progress(self, obj):
         request = self.context.get('request')
@@ -1,6 +1,34 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import UserAnswer, TopicProgress
+from django.utils import timezone
+from .models import (
+    DailyExam, DailyExamAttempt, Exam, ExamScoreHistogram, ExamSyllabus, ModelExam, ModelExamAttempt, Question,
+    Topic, TopicProgress, UserAnswer, UserExamProgress, UserFeedView, UserProfile, WeeklyMissionProgress,
+)
+from .grading import apply_topic_progress
+from .question_state import refresh_question_states
+from .question_queue import drop_user_queues
+from .exam_graph import refresh_related_exams
+from .syllabus_index import refresh_exam_index, refresh_topic_index, index_syllabus_part, unindex_syllabus_part
+from .mock_exam import invalidate_blueprints
+from .answer_keys import (
+    KEY_UPDATE_FIELDS as ANSWER_KEY_UPDATE_FIELDS, PAPERS as ANSWER_KEY_PAPERS, invalidate_paper_keys,
+    invalidate_question_keys, question_key_fields, question_key_versions, stored_key_fields,
+)
+from .cache_versions import bump_versions
+from .score_histogram import record_attempt
+from .exam_membership import refresh_exam_ids
+from .activity import record_activity
+from .weekly_missions import bump_missions, count_answers
+from .user_cache import bump_content, bump_user_data
+from .topic_counts import KEY_UPDATE_FIELDS as COUNT_KEY_UPDATE_FIELDS, move_question, question_key, stored_key
+
+@receiver(pre_save, sender=UserAnswer)
+def keep_answer_difficulty(sender, instance, **kwargs):
+    if instance.pk is None and not instance.difficulty and not kwargs.get('raw'):
+        instance.difficulty = instance.question.difficulty or ''
+
 
 @receiver(post_save, sender=UserAnswer)
 def update_topic_progress(sender, instance, created, **kwargs):
@@ -8,28 +36,277 @@ def update_topic_progress(sender, instance, created, **kwargs):
         return
     if not created:
         return
+    apply_topic_progress(instance.user_id, [(instance.question, instance.is_correct)])
+
+
+@receiver(post_save, sender=UserAnswer)
+@receiver(post_delete, sender=UserAnswer)
+def update_question_state(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    refresh_question_states([instance.user_id], [instance.question_id])
+
+
+@receiver(pre_save, sender=Exam)
+def track_exam_changes(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._name_changed = instance._slug_changed = True
+        return
+    old = Exam.objects.filter(pk=instance.pk).values('name', 'slug').first() or {}
+    instance._name_changed = old.get('name') != instance.name
+    instance._slug_changed = old.get('slug') != instance.slug
+
+
+@receiver(post_save, sender=Exam)
+def update_exam_graph(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created or getattr(instance, '_name_changed', False):
+        refresh_related_exams(instance)
+    if created or getattr(instance, '_slug_changed', False):
+        refresh_exam_index(instance)
+    if created or getattr(instance, '_name_changed', False) or getattr(instance, '_slug_changed', False):
+        invalidate_blueprints()
+
+
+@receiver(pre_save, sender=Topic)
+def track_topic_rename(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._name_changed = True
+        return
+    old_name = Topic.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    instance._name_changed = old_name != instance.name
+
+
+@receiver(post_save, sender=Topic)
+def update_topic_syllabus_index(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created or getattr(instance, '_name_changed', False):
+        refresh_topic_index(instance)
+        invalidate_blueprints()
+
+
+@receiver(pre_save, sender=ExamSyllabus)
+def track_syllabus_part_key(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._indexed_key = None
+        return
+    instance._indexed_key = ExamSyllabus.objects.filter(pk=instance.pk).values_list('exam_id', 'topic_id').first()
+
+
+@receiver(post_save, sender=ExamSyllabus)
+def index_exam_syllabus(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    index_syllabus_part(instance, getattr(instance, '_indexed_key', None))
+    invalidate_blueprints()
+
+
+@receiver(post_delete, sender=ExamSyllabus)
+def unindex_exam_syllabus(sender, instance, **kwargs):
+    unindex_syllabus_part(instance)
+    invalidate_blueprints()
+
+
+@receiver(m2m_changed, sender=UserProfile.preferred_exams.through)
+def reset_question_queues(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        drop_user_queues(instance.user_id)
+    elif pk_set:
+        for user_id in UserProfile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True):
+            drop_user_queues(user_id)
+
+
+@receiver(pre_save, sender=Question)
+def track_answer_key_change(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or kwargs.get('raw'):
+        # A new question is in no paper yet
+        instance._answer_key_changed = False
+    elif update_fields is not None and not ANSWER_KEY_UPDATE_FIELDS.intersection(update_fields):
+        instance._answer_key_changed = False
+    else:
+        instance._answer_key_changed = stored_key_fields(instance.pk) != question_key_fields(instance)
+
+
+@receiver(post_save, sender=Question)
+def drop_answer_keys(sender, instance, **kwargs):
+    if getattr(instance, '_answer_key_changed', False):
+        invalidate_question_keys([instance.pk])
+
+
+@receiver(pre_delete, sender=Question)
+def remember_answer_key_versions(sender, instance, **kwargs):
+    # The cascade removes the paper rows without m2m_changed
+    instance._answer_key_versions = question_key_versions([instance.pk])
+
+
+@receiver(post_delete, sender=Question)
+def drop_deleted_answer_keys(sender, instance, **kwargs):
+    bump_versions(*getattr(instance, '_answer_key_versions', ()))
+
+
+@receiver(m2m_changed, sender=ModelExam.questions.through)
+@receiver(m2m_changed, sender=DailyExam.questions.through)
+def drop_paper_answer_keys(sender, instance, action, reverse, pk_set, **kwargs):
+    kind, paper_field = next((kind, field) for kind, through, field in ANSWER_KEY_PAPERS if through is sender)
+    if action == 'pre_clear' and reverse:
+        instance._cleared_paper_ids = list(
+            sender.objects.filter(question_id=instance.pk).values_list(paper_field, flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_paper_keys(kind, [instance.pk])
+    else:
+        invalidate_paper_keys(kind, pk_set if action != 'post_clear' else getattr(instance, '_cleared_paper_ids', []))
+
+
+@receiver(post_save, sender=ModelExamAttempt)
+@receiver(post_save, sender=DailyExamAttempt)
+def add_attempt_to_histogram(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    record_attempt(instance)
+
+
+@receiver(post_delete, sender=ModelExamAttempt)
+@receiver(post_delete, sender=DailyExamAttempt)
+def remove_attempt_from_histogram(sender, instance, **kwargs):
+    record_attempt(instance, removed=True)
+
+
+@receiver(post_delete, sender=ModelExam)
+@receiver(post_delete, sender=DailyExam)
+def drop_score_histogram(sender, instance, **kwargs):
+    paper_type = ExamScoreHistogram.MODEL_EXAM if sender is ModelExam else ExamScoreHistogram.DAILY_EXAM
+    ExamScoreHistogram.objects.filter(paper_type=paper_type, paper_id=instance.pk).delete()
+
+
+@receiver(m2m_changed, sender=Question.exams.through)
+def sync_question_exam_ids(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_question_ids = list(instance.questions.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.exam_ids = refresh_exam_ids([instance.pk])[instance.pk]
+    else:
+        refresh_exam_ids(pk_set if action != 'post_clear' else getattr(instance, '_cleared_question_ids', []))
+
+
+@receiver(pre_delete, sender=Exam)
+def remember_exam_questions(sender, instance, **kwargs):
+    # The cascade removes the M2M rows without m2m_changed, so their questions are refreshed afterwards
+    instance._member_question_ids = list(instance.questions.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Exam)
+def drop_deleted_exam_ids(sender, instance, **kwargs):
+    refresh_exam_ids(getattr(instance, '_member_question_ids', []))
+
+
+@receiver(post_save, sender=UserFeedView)
+def mark_activity(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    record_activity(instance.user_id)
+
+
+@receiver(post_save, sender=UserAnswer)
+def mark_answer_activity(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    record_activity(instance.user_id, day=timezone.localtime(instance.answered_at).date())
+
+
+@receiver(post_save, sender=ModelExamAttempt)
+def count_mission_mock_test(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    bump_missions(instance.user_id, mock_tests=1)
+
+
+@receiver(post_save, sender=UserAnswer)
+def count_mission_answer(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    count_answers([(instance.user_id, instance.question_id, instance.answered_at, instance.is_correct)])
+
+
+@receiver(post_save, sender=UserFeedView)
+def count_mission_current_affairs(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or not created:
+        return
+    if instance.card.card_type == 'current_affairs':
+        bump_missions(instance.user_id, current_affairs_read=1)
 
-    topic = instance.question.topic
-    if not topic:
+
+@receiver(post_save, sender=UserAnswer)
+@receiver(post_delete, sender=UserAnswer)
+@receiver(post_save, sender=ModelExamAttempt)
+@receiver(post_delete, sender=ModelExamAttempt)
+@receiver(post_save, sender=DailyExamAttempt)
+@receiver(post_delete, sender=DailyExamAttempt)
+@receiver(post_save, sender=UserFeedView)
+@receiver(post_save, sender=TopicProgress)
+@receiver(post_delete, sender=TopicProgress)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=UserExamProgress)
+@receiver(post_save, sender=WeeklyMissionProgress)
+def bump_user_payloads(sender, instance, **kwargs):
+    bump_user_data(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def bump_new_user_payloads(sender, instance, created, **kwargs):
+    # Payloads cached for a deleted user with the same id must not be served
+    if created:
+        bump_user_data(instance.id)
+
+
+@receiver(m2m_changed, sender=UserProfile.preferred_exams.through)
+def bump_preference_payloads(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
         return
+    if not reverse:
+        bump_user_data(instance.user_id)
+    elif pk_set:
+        bump_user_data(*UserProfile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
 
-    difficulty = instance.question.difficulty  # 'easy', 'medium', 'hard'
 
-    progress, _ = TopicProgress.objects.get_or_create(
-        user=instance.user,
-        topic=topic
-    )
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+@receiver(post_save, sender=ExamSyllabus)
+@receiver(post_delete, sender=ExamSyllabus)
+def bump_content_payloads(sender, **kwargs):
+    bump_content()
 
-    progress.total_attempted += 1
-    if instance.is_correct:
-        progress.total_correct += 1
 
-    if difficulty in ('easy', 'medium', 'hard'):
-        attempted_field = f"{difficulty}_attempted"
-        correct_field = f"{difficulty}_correct"
-        
-        setattr(progress, attempted_field, getattr(progress, attempted_field) + 1)
-        if instance.is_correct:
-            setattr(progress, correct_field, getattr(progress, correct_field) + 1)
+@receiver(pre_save, sender=Question)
+def track_question_count_key(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or kwargs.get('raw'):
+        instance._counted_key = None
+    elif update_fields is not None and not COUNT_KEY_UPDATE_FIELDS.intersection(update_fields):
+        # e.g. counter or explanation updates: the key cannot have changed
+        instance._counted_key = question_key(instance)
+    else:
+        instance._counted_key = stored_key(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def update_topic_question_counts(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    move_question(None if created else getattr(instance, '_counted_key', None), question_key(instance))
+
 
-    progress.save()
+@receiver(post_delete, sender=Question)
+def drop_topic_question_count(sender, instance, **kwargs):
+    move_question(question_key(instance), None)
@@ -0,0 +1,155 @@
+import hashlib
+import inspect
+import json
+
+from django.db import connection, transaction
+
+from .cache_versions import current_version
+from .models import CacheVersion, Exam, ExamSyllabus, SyllabusTopicIndex, Topic
+from .syllabus_db import SYLLABUS_DATABASE, resolve_exam_slug
+
+# CacheVersion row holding the fingerprint of the syllabus data the index was compiled from
+FINGERPRINT_NAME = 'syllabus_database'
+
+
+def _static_syllabus(exam_slug):
+    slug_key = resolve_exam_slug(exam_slug)
+    if slug_key and slug_key in SYLLABUS_DATABASE:
+        return SYLLABUS_DATABASE[slug_key]['syllabus']
+    return []
+
+
+def _static_rows(exam_id, syllabus, topics):
+    """
+    Matches each syllabus entry against topic names the same way the old
+    `topic__name__icontains=<entry>` filters did.
+    """
+    rows = []
+    for item in syllabus:
+        entry = item['topic'].lower()
+        for topic_id, topic_name in topics:
+            if entry in topic_name.lower():
+                rows.append(SyllabusTopicIndex(
+                    exam_id=exam_id, topic_id=topic_id, syllabus_topic=item['topic'],
+                    marks=item.get('marks') or 0, source=SyllabusTopicIndex.SOURCE_STATIC
+                ))
+    return rows
+
+
+def _exam_syllabus_rows(parts):
+    return [
+        SyllabusTopicIndex(
+            exam_id=exam_id, topic_id=topic_id, syllabus_topic=topic_name,
+            marks=num_questions, source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS
+        )
+        for exam_id, topic_id, topic_name, num_questions in parts
+    ]
+
+
+def syllabus_fingerprint():
+    """A hash of SYLLABUS_DATABASE and the slug aliases, as a positive 63-bit integer."""
+    source = json.dumps(SYLLABUS_DATABASE, sort_keys=True) + inspect.getsource(resolve_exam_slug)
+    return int.from_bytes(hashlib.sha256(source.encode()).digest()[:8], 'big') >> 1
+
+
+def rebuild_syllabus_index():
+    """
+    Recompiles the whole index and records the fingerprint of the syllabus data
+    it was compiled from. Runs after migrate when needed and from rebuild_syllabus_index.
+    """
+    topics = list(Topic.objects.values_list('id', 'name'))
+    rows = []
+    for exam_id, slug in Exam.objects.values_list('id', 'slug'):
+        rows += _static_rows(exam_id, _static_syllabus(slug), topics)
+    rows += _exam_syllabus_rows(
+        ExamSyllabus.objects.values_list('exam_id', 'topic_id', 'topic__name', 'num_questions')
+    )
+    with transaction.atomic():
+        SyllabusTopicIndex.objects.all().delete()
+        SyllabusTopicIndex.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        CacheVersion.objects.update_or_create(name=FINGERPRINT_NAME, defaults={'version': syllabus_fingerprint()})
+    from .mock_exam import invalidate_blueprints
+    invalidate_blueprints()
+    return len(rows)
+
+
+def refresh_exam_index(exam):
+    """Recompiles the rows for one exam (created, slug changed, or syllabus parts edited)."""
+    rows = _static_rows(exam.pk, _static_syllabus(exam.slug), list(Topic.objects.values_list('id', 'name')))
+    rows += _exam_syllabus_rows(
+        ExamSyllabus.objects.filter(exam_id=exam.pk).values_list('exam_id', 'topic_id', 'topic__name', 'num_questions')
+    )
+    with transaction.atomic():
+        SyllabusTopicIndex.objects.filter(exam_id=exam.pk).delete()
+        SyllabusTopicIndex.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def refresh_topic_index(topic):
+    """Recompiles the static rows for one topic (created or renamed) across every exam."""
+    rows = []
+    for exam_id, slug in Exam.objects.values_list('id', 'slug'):
+        rows += _static_rows(exam_id, _static_syllabus(slug), [(topic.pk, topic.name)])
+    with transaction.atomic():
+        SyllabusTopicIndex.objects.filter(topic_id=topic.pk, source=SyllabusTopicIndex.SOURCE_STATIC).delete()
+        SyllabusTopicIndex.objects.bulk_create(rows, ignore_conflicts=True)
+        SyllabusTopicIndex.objects.filter(
+            topic_id=topic.pk, source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS
+        ).update(syllabus_topic=topic.name)
+
+
+def reindex_syllabus_key(exam_id, topic_id):
+    """Recompiles the exam-syllabus row for one (exam, topic) pair from the ExamSyllabus rows that still use it."""
+    parts = ExamSyllabus.objects.filter(exam_id=exam_id, topic_id=topic_id).values_list(
+        'exam_id', 'topic_id', 'topic__name', 'num_questions'
+    )
+    with transaction.atomic():
+        SyllabusTopicIndex.objects.filter(
+            exam_id=exam_id, source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS, topic_id=topic_id
+        ).delete()
+        SyllabusTopicIndex.objects.bulk_create(_exam_syllabus_rows(parts[:1]), ignore_conflicts=True)
+
+
+def index_syllabus_part(part, old_key=None):
+    """
+    Keeps the exam-syllabus rows for one saved ExamSyllabus in step. `old_key`
+    is the (exam_id, topic_id) the part was indexed under before an edit.
+    """
+    if old_key is not None and old_key != (part.exam_id, part.topic_id):
+        reindex_syllabus_key(*old_key)
+    reindex_syllabus_key(part.exam_id, part.topic_id)
+
+
+def unindex_syllabus_part(part):
+    reindex_syllabus_key(part.exam_id, part.topic_id)
+
+
+def syllabus_topic_ids(exams, source=SyllabusTopicIndex.SOURCE_STATIC):
+    """
+    Returns the set of topic ids on the syllabus of any of `exams`
+    (an Exam queryset or an iterable of exam ids) in a single indexed query.
+    """
+    return set(
+        SyllabusTopicIndex.objects.filter(exam__in=exams, source=source).values_list('topic_id', flat=True)
+    )
+
+
+def _touches_index(plan):
+    for migration, _ in plan or ():
+        for operation in migration.operations:
+            name = getattr(operation, 'model_name', None) or getattr(operation, 'name', None)
+            if isinstance(name, str) and name.lower() == SyllabusTopicIndex._meta.model_name:
+                return True
+    return False
+
+
+def rebuild_after_migrate(sender, plan=None, **kwargs):
+    # Compile the index when it is first created (or emptied), a migration changed its table,
+    # or SYLLABUS_DATABASE was edited since it was last compiled (deploys run migrate)
+    tables = connection.introspection.table_names()
+    if SyllabusTopicIndex._meta.db_table not in tables or CacheVersion._meta.db_table not in tables:
+        return
+    if (
+        _touches_index(plan) or not SyllabusTopicIndex.objects.exists()
+        or current_version(FINGERPRINT_NAME) != syllabus_fingerprint()
+    ):
+        rebuild_syllabus_index()
@@ -0,0 +1,25 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for per-endpoint SQL query budgets.
+
+        self.assertQueryBudget('get', '/api/leaderboard/', budget=8)
+
+    Fails when the request runs more than `budget` queries and lists the
+    statements it ran, so N+1 regressions show up in the test run.
+    """
+
+    def assertQueryBudget(self, method, url, budget, expected_status=200, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertEqual(response.status_code, expected_status, f"{method.upper()} {url}")
+        count = len(ctx.captured_queries)
+        if count > budget:
+            statements = '\n'.join(
+                f"{i}. {q['sql'][:300]}" for i, q in enumerate(ctx.captured_queries, start=1)
+            )
+            self.fail(f"{method.upper()} {url} ran {count} queries, budget is {budget}:\n{statements}")
+        return response
@@ -93,6 +93,8 @@ class GamificationTestCase(TestCase):
         self.assertFalse(freeze_used)
 
 from rest_framework.test import APITestCase
+from django.test import override_settings
+from questionbank.testing import QueryBudgetMixin
 from rest_framework_simplejwt.tokens import RefreshToken
 
 class StudyFeedLimitTestCase(APITestCase):
@@ -485,6 +487,1677 @@ class QuestionEngineTestCase(APITestCase):
             self.assertIn(q, self.questions[:3])
 
 
+class AnsweredExclusionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='answered_student', password='password123')
+        self.topic = Topic.objects.create(name='Economics', slug='economics')
+        self.questions = [
+            Question.objects.create(
+                topic=self.topic,
+                text=f'Economics Question {i}',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'},
+                correct_answer='A'
+            )
+            for i in range(4)
+        ]
+
+    def test_engine_excludes_answered_without_answer_join(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.engine import QuestionEngine
+        from questionbank.models import UserAnswer
+
+        for q in self.questions[:3]:
+            UserAnswer.objects.create(user=self.user, question=q, selected_option='A', is_correct=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = list(QuestionEngine.get_questions_for_user(self.user, filters={'topic_id': self.topic.id}, limit=5))
+        self.assertEqual([q.id for q in result], [self.questions[3].id])
+        for query in ctx.captured_queries:
+            self.assertNotIn('"questionbank_useranswer"', query['sql'])
+
+
+class QuestionStateTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='state_student', password='password123')
+        self.topic = Topic.objects.create(name='Economics', slug='economics')
+        self.questions = [
+            Question.objects.create(
+                topic=self.topic, text=f'Economics Question {i}',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'}, correct_answer='A'
+            )
+            for i in range(4)
+        ]
+
+    def answer(self, question, days_ago=0):
+        from questionbank.models import UserAnswer
+        ua = UserAnswer.objects.create(user=self.user, question=question, selected_option='A', is_correct=True)
+        if days_ago:
+            ua.answered_at = timezone.now() - timedelta(days=days_ago)
+            ua.save()
+        return ua
+
+    def test_state_follows_answers(self):
+        from questionbank.models import UserQuestionState
+        first = self.answer(self.questions[0], days_ago=3)
+        self.answer(self.questions[0])
+        state = UserQuestionState.objects.get(user=self.user, question=self.questions[0])
+        self.assertEqual(state.times_answered, 2)
+        self.assertGreater(state.last_answered_at, first.answered_at)
+
+        self.questions[0].user_answers.exclude(pk=first.pk).delete()
+        state.refresh_from_db()
+        self.assertEqual((state.times_answered, state.last_answered_at), (1, first.answered_at))
+        first.delete()
+        self.assertFalse(UserQuestionState.objects.filter(user=self.user).exists())
+
+    def test_tiers_are_selected_separately(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.engine import QuestionEngine
+        UserProfile.objects.get_or_create(user=self.user)
+        self.user = User.objects.select_related('userprofile').get(pk=self.user.pk)
+        self.answer(self.questions[0], days_ago=45)
+        self.answer(self.questions[1], days_ago=40)
+        self.answer(self.questions[2])
+        self.answer(self.questions[3])
+
+        # Preferred-exam and topic checks, two pivot seeks per tier (each wraps around
+        # while short), then fetching the picked questions; no ranked sort of the candidates
+        with CaptureQueriesContext(connection) as ctx:
+            picked = list(QuestionEngine.get_questions_for_user(self.user, {'topic_id': self.topic.id}, limit=3))
+        self.assertEqual(len(ctx.captured_queries), 7)
+        seeks = [q['sql'] for q in ctx.captured_queries if 'LIMIT' in q['sql'] and 'ORDER BY' in q['sql']]
+        self.assertEqual(len(seeks), 4)
+        for sql in seeks:
+            self.assertNotIn('CASE', sql)
+        self.assertEqual({q.id for q in picked}, {self.questions[0].id, self.questions[1].id})
+
+        unlimited = QuestionEngine.get_questions_for_user(self.user, {'topic_id': self.topic.id})
+        self.assertEqual({q.id for q in unlimited}, {self.questions[0].id, self.questions[1].id})
+
+    def test_sm2_schedule_replays_answers(self):
+        from questionbank.models import UserAnswer, UserQuestionState
+        from questionbank.question_state import schedule_review
+        start = timezone.now() - timedelta(days=30)
+        schedule = schedule_review([(start, True), (start, True), (start, True)])
+        self.assertEqual((schedule['repetitions'], schedule['interval_days']), (3, 16))
+        self.assertEqual(schedule['due_at'], start + timedelta(days=16))
+
+        lapsed = schedule_review([(start, True), (start, True), (start, False)])
+        self.assertEqual((lapsed['repetitions'], lapsed['interval_days']), (0, 1))
+        self.assertLess(lapsed['ease_factor'], schedule['ease_factor'])
+
+        self.answer(self.questions[0], days_ago=10)
+        wrong = UserAnswer.objects.create(user=self.user, question=self.questions[0], selected_option='B', is_correct=False)
+        state = UserQuestionState.objects.get(user=self.user, question=self.questions[0])
+        self.assertEqual((state.repetitions, state.interval_days), (0, 1))
+        self.assertEqual(state.due_at, wrong.answered_at + timedelta(days=1))
+
+    def test_review_session_serves_due_questions(self):
+        from rest_framework.test import APIClient
+        from questionbank.engine import QuestionEngine
+        self.answer(self.questions[0], days_ago=3)
+        self.answer(self.questions[1], days_ago=10)
+        self.answer(self.questions[2])
+
+        with self.assertNumQueries(2):
+            due = list(QuestionEngine.get_due_reviews(self.user, limit=5))
+        self.assertEqual([q.id for q in due], [self.questions[1].id, self.questions[0].id])
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post('/api/practice/start/', {'session_type': 'review', 'count': 5}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual({q['id'] for q in response.data['questions']}, {self.questions[0].id, self.questions[1].id})
+
+class QuestionQueueTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='queue_student', password='password123')
+        self.topic = Topic.objects.create(name='Geography', slug='geography')
+        self.questions = [
+            Question.objects.create(
+                topic=self.topic, text=f'Geography Question {i}',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'}, correct_answer='A'
+            )
+            for i in range(8)
+        ]
+
+    def test_pop_skips_questions_answered_since_refill(self):
+        from questionbank.models import QuestionQueue, UserAnswer
+        from questionbank.question_queue import pop_questions
+        filters = {'topic_id': self.topic.id}
+        first = pop_questions(self.user, filters, 2)
+        self.assertEqual(len(first), 2)
+
+        queue = QuestionQueue.objects.get(user=self.user)
+        self.assertEqual(len(queue.question_ids), 6)
+        self.assertTrue(queue.needs_refill)  # below the low watermark
+
+        UserAnswer.objects.create(user=self.user, question_id=queue.question_ids[0], selected_option='A', is_correct=True)
+        second = pop_questions(self.user, filters, 2)
+        self.assertNotIn(queue.question_ids[0], [q.id for q in second])
+        self.assertEqual(len(second), 2)
+        self.assertFalse({q.id for q in first} & {q.id for q in second})
+
+    def test_background_refill_and_drain_fallback(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from questionbank.models import QuestionQueue
+        from questionbank.question_queue import pop_questions
+        filters = {'topic_id': self.topic.id}
+        self.assertEqual(len(pop_questions(self.user, filters, 8)), 8)
+        # An empty queue still serves from the engine
+        self.assertEqual(len(pop_questions(self.user, filters, 3)), 3)
+
+        call_command('refill_question_queues', stdout=StringIO())
+        queue = QuestionQueue.objects.get(user=self.user)
+        self.assertFalse(queue.needs_refill)
+        self.assertEqual(len(queue.question_ids), 8)
+
+    def test_institute_questions_get_their_own_queue(self):
+        from institutes.models import Institute
+        from questionbank.question_queue import pop_questions
+        filters = {'topic_id': self.topic.id}
+        self.assertEqual(len(pop_questions(self.user, filters, 2)), 2)
+
+        institute = Institute.objects.create(name='Queue Academy', owner=self.user)
+        private = Question.objects.create(
+            topic=self.topic, text='Academy Geography Question', institute=institute,
+            options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'}, correct_answer='A'
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        profile.institute = institute
+        profile.save()
+        self.user = User.objects.select_related('userprofile').get(pk=self.user.pk)
+
+        served = [q.id for q in pop_questions(self.user, filters, 1)]
+        self.assertEqual(self.user.question_queues.count(), 2)
+        queue = self.user.question_queues.get(filter_key__endswith=f'@institute={institute.id}')
+        self.assertIn(private.id, served + queue.question_ids)
+
+class CohortSelectionTestCase(TestCase):
+    def setUp(self):
+        self.topic = Topic.objects.create(name='Biology', slug='biology')
+        self.questions = [
+            Question.objects.create(
+                topic=self.topic, text=f'Biology Question {i}',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'}, correct_answer='A'
+            )
+            for i in range(12)
+        ]
+        self.users = [User.objects.create(username=f'cohort_{i}') for i in range(20)]
+        for user in self.users:
+            UserProfile.objects.get_or_create(user=user)
+
+    def test_cohort_selection_in_a_handful_of_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.engine import QuestionEngine
+        from questionbank.models import UserAnswer
+
+        for q in self.questions[:10]:
+            UserAnswer.objects.create(user=self.users[0], question=q, selected_option='A', is_correct=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            picks = QuestionEngine.get_questions_for_users(self.users, {'topic_id': self.topic.id}, limit=3)
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+
+        # Same tiering as the single-user engine: only the two unseen questions are left for user 0
+        self.assertEqual({q.id for q in picks[self.users[0].id]}, {q.id for q in self.questions[10:]})
+        for user in self.users[1:]:
+            self.assertEqual(len(picks[user.id]), 3)
+
+    def test_heavy_user_outside_the_shared_draw(self):
+        from questionbank.engine import QuestionEngine
+        from questionbank.models import UserAnswer
+        for q in self.questions[:10]:
+            UserAnswer.objects.create(user=self.users[0], question=q, selected_option='A', is_correct=True)
+        # The pool's draw (4 of 12 questions) rarely holds both unseen questions; the user gets their own sample
+        for _ in range(5):
+            picks = QuestionEngine.get_questions_for_users(self.users[:1], {'topic_id': self.topic.id}, limit=2)
+            self.assertEqual({q.id for q in picks[self.users[0].id]}, {q.id for q in self.questions[10:]})
+
+    def test_non_overlapping_sets(self):
+        from questionbank.engine import QuestionEngine
+        picks = QuestionEngine.get_questions_for_users(
+            self.users[:4], {'topic_id': self.topic.id}, limit=3, overlap=False
+        )
+        handed_out = [q.id for user in self.users[:4] for q in picks[user.id]]
+        self.assertEqual(len(handed_out), 12)
+        self.assertEqual(len(set(handed_out)), 12)
+
+    def test_batch_selection(self):
+        from institutes.models import Batch, BatchMembership, Institute
+        from questionbank.engine import QuestionEngine
+        institute = Institute.objects.create(name='Cohort Academy', owner=self.users[-1])
+        batch = Batch.objects.create(institute=institute, name='Morning')
+        for user in self.users[:5]:
+            BatchMembership.objects.create(batch=batch, student_profile=user.userprofile)
+        picks = QuestionEngine.get_questions_for_batch(batch, {'topic_id': self.topic.id}, limit=2)
+        self.assertEqual(set(picks), {user.id for user in self.users[:5]})
+
+class RandomSamplingTestCase(TestCase):
+    def setUp(self):
+        self.topic1 = Topic.objects.create(name='Physics', slug='physics')
+        self.topic2 = Topic.objects.create(name='Chemistry', slug='chemistry')
+        for i in range(30):
+            Question.objects.create(
+                topic=self.topic1 if i % 3 else self.topic2,
+                text=f'Sampling Question {i}',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'},
+                correct_answer='A'
+            )
+
+    def test_sample_questions_by_random_key(self):
+        from questionbank.sampling import sample
+        qs = Question.objects.filter(topic=self.topic2)
+        picked = list(sample(qs, 4))
+        self.assertEqual(len(picked), 4)
+        self.assertEqual(len({q.id for q in picked}), 4)
+        self.assertTrue(all(q.topic_id == self.topic2.id for q in picked))
+
+        # Asking for more rows than match returns every match exactly once
+        self.assertEqual(sorted(q.id for q in sample(qs, 50)), sorted(qs.values_list('id', flat=True)))
+
+    def test_sample_takes_a_pivot_per_chunk(self):
+        from unittest import mock
+        from questionbank.sampling import SAMPLE_CHUNK, sample_ids
+        topic = Topic.objects.create(name='Pivot Topic', slug='pivot-topic')
+        questions = [
+            Question.objects.create(topic=topic, text=f'Pivot question {i}', options={'A': '1'}, correct_answer='A')
+            for i in range(20)
+        ]
+        for i, question in enumerate(questions):
+            Question.objects.filter(pk=question.pk).update(random_key=i / 20)
+        with mock.patch('questionbank.sampling.random.random', side_effect=[0.0, 0.5]):
+            ids = sample_ids(Question.objects.filter(topic=topic), 2 * SAMPLE_CHUNK)
+        self.assertEqual(
+            set(ids), {q.id for q in questions[:SAMPLE_CHUNK] + questions[10:10 + SAMPLE_CHUNK]}
+        )
+
+    def test_sample_by_id_range_probing(self):
+        from questionbank.sampling import sample_ids
+        cards = [
+            StudyFeedCard.objects.create(card_type='fact', title=f'Fact {i}', content_data={})
+            for i in range(12)
+        ]
+        wanted = {c.id for c in cards if c.id % 4 == 0}
+        ids = sample_ids(StudyFeedCard.objects.filter(id__in=wanted), 10)
+        self.assertEqual(set(ids), wanted)
+        self.assertEqual(sample_ids(StudyFeedCard.objects.none(), 3), [])
+        self.assertEqual(len(sample_ids(StudyFeedCard.objects.all(), 5)), 5)
+
+    def test_random_order_keeps_every_row(self):
+        from questionbank.sampling import random_order
+        qs = Question.objects.filter(topic=self.topic1)
+        self.assertEqual(sorted(q.id for q in random_order(qs)), sorted(qs.values_list('id', flat=True)))
+
+class ExamGraphTestCase(TestCase):
+    def setUp(self):
+        self.ldc = Exam.objects.create(name='LDC Kerala', slug='ldc-kerala', year=2025)
+        self.ldc_typist = Exam.objects.create(name='LDC Typist', slug='ldc-typist', year=2025)
+        self.vfa = Exam.objects.create(name='VFA', slug='vfa', year=2025)
+
+    def test_edges_created_with_exam(self):
+        from questionbank.exam_graph import related_exams
+        self.assertEqual(set(related_exams(self.ldc)), {self.ldc, self.ldc_typist})
+        self.assertEqual(set(related_exams(self.ldc_typist)), {self.ldc, self.ldc_typist})
+        # Short words are ignored, so the exam only relates to itself
+        self.assertEqual(set(related_exams(self.vfa)), {self.vfa})
+        self.assertEqual(
+            set(related_exams(Exam.objects.filter(id__in=[self.ldc.id, self.vfa.id]))),
+            {self.ldc, self.ldc_typist, self.vfa}
+        )
+
+    def test_rename_refreshes_edges(self):
+        from questionbank.exam_graph import related_exams
+        self.vfa.name = 'VFA Kerala'
+        self.vfa.save()
+        self.assertEqual(set(related_exams(self.vfa)), {self.vfa, self.ldc})
+        self.assertIn(self.vfa, set(related_exams(self.ldc)))
+
+        self.vfa.name = 'VFA'
+        self.vfa.save()
+        self.assertNotIn(self.vfa, set(related_exams(self.ldc)))
+
+    def test_rebuild_matches_incremental_graph(self):
+        from questionbank.exam_graph import rebuild_exam_graph, related_exam_map
+        before = related_exam_map()
+        rebuild_exam_graph()
+        self.assertEqual(related_exam_map(), before)
+        self.assertEqual(before[self.ldc.id], {self.ldc.id, self.ldc_typist.id})
+
+class SyllabusIndexTestCase(TestCase):
+    def setUp(self):
+        self.history = Topic.objects.create(name='Kerala History', slug='kerala-history')
+        self.cooking = Topic.objects.create(name='Cooking', slug='cooking')
+        self.exam = Exam.objects.create(name='Village Field Assistant', slug='village-field-assistant', year=2026)
+
+    def static_ids(self):
+        from questionbank.syllabus_index import syllabus_topic_ids
+        return syllabus_topic_ids([self.exam.id])
+
+    def test_static_syllabus_resolves_to_topic_ids(self):
+        from questionbank.models import SyllabusTopicIndex
+        self.assertEqual(self.static_ids(), {self.history.id})
+        row = SyllabusTopicIndex.objects.get(exam=self.exam, topic=self.history)
+        self.assertEqual((row.syllabus_topic, row.marks), ('History', 5))
+
+        # Topic created or renamed after the exam is picked up
+        physics = Topic.objects.create(name='Physics Basics', slug='physics-basics')
+        self.cooking.name = 'Chemistry Lab'
+        self.cooking.save()
+        self.assertEqual(self.static_ids(), {self.history.id, physics.id, self.cooking.id})
+
+    def test_exam_syllabus_parts_are_indexed(self):
+        from questionbank.models import ExamSyllabus, SyllabusTopicIndex
+        from questionbank.syllabus_index import syllabus_topic_ids
+        other = Exam.objects.create(name='Custom Board Exam', slug='custom-board', year=2026)
+        part = ExamSyllabus.objects.create(exam=other, topic=self.cooking, num_questions=12)
+        self.assertEqual(syllabus_topic_ids([other.id]), set())
+        self.assertEqual(
+            syllabus_topic_ids([other.id], source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS), {self.cooking.id}
+        )
+
+        # Re-pointing a part moves its row instead of leaving the old pairing behind
+        part.topic = self.history
+        part.save()
+        self.assertEqual(
+            syllabus_topic_ids([other.id], source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS), {self.history.id}
+        )
+        part.delete()
+        self.assertEqual(syllabus_topic_ids([other.id], source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS), set())
+
+    def test_migrate_rebuilds_only_when_needed(self):
+        from unittest.mock import patch
+        from questionbank import syllabus_index
+        from questionbank.models import SyllabusTopicIndex
+        unrelated = type('Migration', (), {'operations': []})
+        syllabus_index.rebuild_syllabus_index()
+        with patch.object(syllabus_index, 'rebuild_syllabus_index') as rebuild:
+            syllabus_index.rebuild_after_migrate(None, plan=[(unrelated, False)])
+            self.assertFalse(rebuild.called)
+            SyllabusTopicIndex.objects.all().delete()
+            syllabus_index.rebuild_after_migrate(None, plan=[(unrelated, False)])
+            self.assertTrue(rebuild.called)
+
+    def test_migrate_rebuilds_after_syllabus_edits(self):
+        from unittest.mock import patch
+        from questionbank import syllabus_index
+        unrelated = type('Migration', (), {'operations': []})
+        syllabus_index.rebuild_syllabus_index()
+        edited = {**syllabus_index.SYLLABUS_DATABASE, 'new-exam': {'syllabus': [{'topic': 'History', 'marks': 5}]}}
+        with patch.object(syllabus_index, 'SYLLABUS_DATABASE', edited):
+            with patch.object(syllabus_index, 'rebuild_syllabus_index') as rebuild:
+                syllabus_index.rebuild_after_migrate(None, plan=[(unrelated, False)])
+                self.assertTrue(rebuild.called)
+            syllabus_index.rebuild_syllabus_index()
+            with patch.object(syllabus_index, 'rebuild_syllabus_index') as rebuild:
+                syllabus_index.rebuild_after_migrate(None, plan=[(unrelated, False)])
+                self.assertFalse(rebuild.called)
+
+    def test_engine_filters_by_indexed_topic_ids(self):
+        from questionbank.engine import QuestionEngine
+        from questionbank.syllabus_index import rebuild_syllabus_index
+        for topic in (self.history, self.cooking):
+            q = Question.objects.create(
+                topic=topic, text=f'{topic.name} question',
+                options={'A': 'AnsA', 'B': 'AnsB', 'C': 'AnsC', 'D': 'AnsD'}, correct_answer='A'
+            )
+            q.exams.add(self.exam)
+        picked = list(QuestionEngine.get_questions_for_user(None, {'exam_id': self.exam.id}))
+        self.assertEqual([q.topic_id for q in picked], [self.history.id])
+
+        before = self.static_ids()
+        rebuild_syllabus_index()
+        self.assertEqual(self.static_ids(), before)
+
+class MockExamBlueprintTestCase(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from questionbank.models import ExamSyllabus
+        cache.clear()
+        self.user = User.objects.create(username='mock_student')
+        self.client.force_authenticate(user=self.user)
+        self.exam = Exam.objects.create(name='Mock Board Paper', slug='mock-board-paper', year=2025)
+        self.history = Topic.objects.create(name='Mock History', slug='mock-history')
+        self.science = Topic.objects.create(name='Mock Science', slug='mock-science')
+        self.other = Topic.objects.create(name='Mock Other', slug='mock-other')
+        ExamSyllabus.objects.create(exam=self.exam, topic=self.history, num_questions=30)
+        ExamSyllabus.objects.create(exam=self.exam, topic=self.science, num_questions=20)
+        for topic, total in ((self.history, 40), (self.science, 25), (self.other, 80)):
+            Question.objects.bulk_create([
+                Question(topic=topic, text=f"{topic.name} {i}", options={'A': '1', 'B': '2'}, correct_answer='A')
+                for i in range(total)
+            ])
+        self.tagged = list(Question.objects.filter(topic=self.history).order_by('id')[:10])
+        for question in self.tagged:
+            question.exams.add(self.exam)
+
+    def test_paper_fills_quotas_and_pads_in_few_queries(self):
+        from collections import Counter
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.mock_exam import generate_mock_exam, get_blueprint
+        get_blueprint(self.exam)
+
+        # Blueprint version, quota window query, loading the picked questions, and the padding
+        # seeks (each may wrap around): two pivots for the 15 spare syllabus questions, one for
+        # the exhausted exam tier and four for the remaining 35
+        with CaptureQueriesContext(connection) as ctx:
+            paper = generate_mock_exam(self.exam)
+        self.assertLessEqual(len(ctx.captured_queries), 3 + 2 * (2 + 1 + 4))
+        self.assertFalse(any('_pad_tier' in q['sql'] or '_shuffle' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(len(paper), 100)
+        self.assertEqual(len({q.id for q in paper}), 100)
+        counts = Counter(q.topic_id for q in paper)
+        self.assertEqual(counts[self.history.id], 40)
+        self.assertEqual(counts[self.science.id], 25)
+        self.assertEqual(counts[self.other.id], 35)
+
+    def test_quotas_prefer_exam_questions(self):
+        from questionbank.mock_exam import _fill_quotas, get_blueprint
+        picked = set(_fill_quotas(get_blueprint(self.exam)))
+        self.assertEqual(len(picked), 50)
+        self.assertTrue({q.id for q in self.tagged} <= picked)
+
+    def test_blueprint_is_cached_and_invalidated(self):
+        from questionbank.models import ExamSyllabus
+        from questionbank.mock_exam import get_blueprint
+        self.assertEqual(sorted(get_blueprint(self.exam)['quotas']), sorted([[self.history.id, 30], [self.science.id, 20]]))
+        # Only the blueprint version lookup
+        with self.assertNumQueries(1):
+            get_blueprint(self.exam)
+
+        ExamSyllabus.objects.filter(exam=self.exam, topic=self.science).delete()
+        ExamSyllabus.objects.create(exam=self.exam, topic=self.other, num_questions=5)
+        self.assertEqual(sorted(get_blueprint(self.exam)['quotas']), sorted([[self.history.id, 30], [self.other.id, 5]]))
+
+    def test_generate_view_does_not_create_topics(self):
+        static_exam = Exam.objects.create(name='LDC Mock Exam', slug='ldc', year=2025)
+        topics_before = Topic.objects.count()
+        response = self.client.get(f'/api/generate-mock-exam/{static_exam.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['questions']), 100)
+        self.assertEqual(Topic.objects.count(), topics_before)
+
+class MockExamPoolTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='pool_student')
+        self.client.force_authenticate(user=self.user)
+        self.exam = Exam.objects.create(name='Pool Board Paper', slug='pool-board-paper', year=2025)
+        topic = Topic.objects.create(name='Pool Topic', slug='pool-topic')
+        Question.objects.bulk_create([
+            Question(topic=topic, text=f"Pool question {i}", options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(120)
+        ])
+
+    def test_warm_command_fills_pool_and_refreshes_stale_papers(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from questionbank.models import MockExamPaper
+        call_command('warm_mock_exam_pool', exam_ids=[self.exam.id], size=3, stdout=StringIO())
+        self.assertEqual(MockExamPaper.objects.filter(exam=self.exam, language='').count(), 3)
+        self.assertEqual(len(MockExamPaper.objects.first().question_ids), 100)
+
+        stale = MockExamPaper.objects.first()
+        MockExamPaper.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=30))
+        # Existing pools are refreshed without naming the exam again
+        call_command('warm_mock_exam_pool', size=3, stdout=StringIO())
+        self.assertEqual(MockExamPaper.objects.filter(exam=self.exam).count(), 3)
+        self.assertFalse(MockExamPaper.objects.filter(pk=stale.pk).exists())
+
+    def test_endpoint_serves_untaken_papers_then_falls_back_to_live(self):
+        from questionbank.mock_exam import warm_pool
+        from questionbank.models import MockExamPaper
+        warm_pool(self.exam, size=2)
+        url = f'/api/generate-mock-exam/{self.exam.id}/'
+
+        # GET builds a fresh paper per request and writes nothing
+        pool_papers = {tuple(sorted(ids)) for ids in MockExamPaper.objects.values_list('question_ids', flat=True)}
+        papers = [tuple(sorted(q['id'] for q in self.client.get(url).data['questions'])) for _ in range(2)]
+        self.assertEqual([len(paper) for paper in papers], [100, 100])
+        self.assertNotEqual(papers[0], papers[1])
+        self.assertFalse(pool_papers.intersection(papers))
+        self.assertEqual(self.user.mock_papers_taken.count(), 0)
+        self.assertFalse(MockExamPaper.objects.filter(served_count__gt=0).exists())
+        self.assertEqual(MockExamPaper.objects.filter(exam=self.exam).count(), 2)
+
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['questions']), 100)
+        # The user got each pool paper once
+        self.assertEqual(self.user.mock_papers_taken.count(), 2)
+        self.assertEqual(MockExamPaper.objects.filter(served_count=1).count(), 2)
+
+        # Both pool papers taken: the next one is built live and added to the pool
+        response = self.client.post(url)
+        self.assertEqual(len(response.data['questions']), 100)
+        self.assertEqual(MockExamPaper.objects.filter(exam=self.exam).count(), 3)
+        self.assertEqual(self.user.mock_papers_taken.count(), 3)
+
+    def test_personal_papers_pad_with_unanswered_questions_and_stay_out_of_the_pool(self):
+        from questionbank.mock_exam import take_mock_exam
+        from questionbank.models import MockExamPaper, UserAnswer
+        answered = {q.id for q in Question.objects.order_by('id')[:30]}
+        for question_id in answered:
+            UserAnswer.objects.create(user=self.user, question_id=question_id, selected_option='A', is_correct=True)
+
+        # 90 unanswered questions go in first; answered ones only make up the rest
+        paper = {q['id'] for q in self.client.get(f'/api/generate-mock-exam/{self.exam.id}/').data['questions']}
+        self.assertEqual(len(paper), 100)
+        self.assertEqual(len(paper - answered), 90)
+        self.assertFalse(MockExamPaper.objects.exists())
+
+        # A paper built for the pool ignores the user's history: a random 100 of the 120
+        # questions, not every unanswered one plus 10 answered
+        for _ in range(3):
+            take_mock_exam(self.exam, self.user)
+        pooled = [set(ids) for ids in MockExamPaper.objects.values_list('question_ids', flat=True)]
+        self.assertEqual(len(pooled), 3)
+        self.assertTrue(all(len(ids & answered) > 10 for ids in pooled))
+
+class GradingServiceTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='grading_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topics = [Topic.objects.create(name=f'Grading Topic {i}', slug=f'grading-topic-{i}') for i in range(4)]
+        Question.objects.bulk_create([
+            Question(
+                topic=self.topics[i % 4], text=f'Grading question {i}', options={'A': '1', 'B': '2'},
+                correct_answer='A', difficulty=('easy', 'medium', 'hard')[i % 3]
+            )
+            for i in range(120)
+        ])
+        self.questions = list(Question.objects.order_by('id'))
+
+    def submit_exam(self, questions):
+        # Every third answer is wrong
+        answers = {str(q.id): 'B' if i % 3 == 0 else 'A' for i, q in enumerate(questions)}
+        return self.client.post(
+            '/api/submit-exam/', {'answers': answers, 'question_ids': [q.id for q in questions]}, format='json'
+        )
+
+    def test_mock_exam_submission_updates_topic_progress(self):
+        from questionbank.models import TopicProgress, UserAnswer, UserQuestionState
+        response = self.submit_exam(self.questions[:100])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results']['correct'], 66)
+        self.assertEqual(UserAnswer.objects.filter(user=self.user).count(), 100)
+        self.assertEqual(UserQuestionState.objects.filter(user=self.user).count(), 100)
+
+        progress = {p.topic_id: p for p in TopicProgress.objects.filter(user=self.user)}
+        for topic in self.topics:
+            answered = [q for q in self.questions[:100] if q.topic_id == topic.id]
+            expected_correct = sum(1 for i, q in enumerate(self.questions[:100]) if q.topic_id == topic.id and i % 3)
+            self.assertEqual(progress[topic.id].total_attempted, len(answered))
+            self.assertEqual(progress[topic.id].total_correct, expected_correct)
+            self.assertEqual(
+                progress[topic.id].easy_attempted + progress[topic.id].medium_attempted + progress[topic.id].hard_attempted,
+                len(answered)
+            )
+
+        # A second sheet adds to the existing rows
+        self.submit_exam(self.questions[:4])
+        self.assertEqual(TopicProgress.objects.get(user=self.user, topic=self.topics[0]).total_attempted, 26)
+
+    def test_submission_queries_do_not_grow_with_answers(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        # The first sheet creates the profile-level rows and completes the weekly answer mission
+        self.submit_exam(self.questions[:50])
+        counts = []
+        for sheet in (self.questions[50:60], self.questions[60:120]):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.submit_exam(sheet).status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_practice_submission_is_batched(self):
+        from questionbank.models import SessionAnswer, TopicProgress
+        started = self.client.post('/api/practice/start/', {'count': 50}, format='json')
+        self.assertEqual(started.status_code, 201)
+        answers = [
+            {'question_id': q['id'], 'selected_option': 'A' if i % 2 else '', 'time_spent_secs': 3}
+            for i, q in enumerate(started.data['questions'])
+        ]
+        response = self.assertQueryBudget(
+            'post', f"/api/practice/{started.data['session_id']}/submit/", budget=36,
+            data={'answers': answers, 'total_time_secs': 150}, format='json'
+        )
+        self.assertEqual(response.data['correct_count'], 25)
+        self.assertEqual(SessionAnswer.objects.filter(session_id=started.data['session_id'], is_correct=True).count(), 25)
+        self.assertEqual(sum(TopicProgress.objects.filter(user=self.user).values_list('total_attempted', flat=True)), 25)
+
+    def test_daily_exam_records_answers(self):
+        from questionbank.models import DailyExam, TopicProgress
+        daily = DailyExam.objects.create(date=timezone.localdate())
+        daily.questions.set(self.questions[:5])
+        answers = {str(q.id): 'A' for q in self.questions[:4]}
+        response = self.client.post(f'/api/daily-exams/{daily.id}/submit/', {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['correct_count'], response.data['total_questions']), (4, 5))
+        self.assertEqual(response.data['gamification']['xp_earned'], 90)
+        self.assertEqual(sum(TopicProgress.objects.filter(user=self.user).values_list('total_correct', flat=True)), 4)
+
+class QuestionStatsRollupTestCase(TestCase):
+    def setUp(self):
+        from questionbank.models import UserAnswer
+        self.UserAnswer = UserAnswer
+        topic = Topic.objects.create(name='Stats Topic', slug='stats-topic')
+        self.easy_q, self.hard_q = [
+            Question.objects.create(topic=topic, text=f'Stats question {i}', options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(2)
+        ]
+        self.users = [User.objects.create(username=f'stats_{i}') for i in range(10)]
+
+    def answer(self, question, correct_users):
+        self.UserAnswer.objects.bulk_create([
+            self.UserAnswer(user=user, question=question, selected_option='A', is_correct=i < correct_users)
+            for i, user in enumerate(self.users)
+        ])
+
+    def test_rollup_is_incremental_and_recalibrates(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from questionbank.question_stats import rollup_question_stats
+        self.answer(self.easy_q, correct_users=9)
+        # An id taken by a transaction that commits only after the first rollup
+        late = self.UserAnswer.objects.create(user=self.users[0], question=self.hard_q, selected_option='B', is_correct=False)
+        late.delete()
+        self.answer(self.hard_q, correct_users=2)
+
+        # Rollup lock/create, the batch ids, the counter UPDATE, the flag UPDATE (plus savepoints)
+        with self.assertNumQueries(9):
+            self.assertEqual(rollup_question_stats(), (20, 2))
+        self.easy_q.refresh_from_db()
+        self.assertEqual((self.easy_q.times_answered, self.easy_q.times_correct), (10, 9))
+        self.assertEqual(rollup_question_stats(), (0, 0))
+
+        self.UserAnswer.objects.create(id=late.id, user=self.users[0], question=self.hard_q, selected_option='B', is_correct=False)
+        self.assertEqual(rollup_question_stats(), (1, 1))
+        self.hard_q.refresh_from_db()
+        self.assertEqual((self.hard_q.times_answered, self.hard_q.times_correct), (11, 2))
+
+        self.answer(self.easy_q, correct_users=10)
+        call_command(
+            'rollup_question_stats', batch_size=4, recalibrate_difficulty=True, min_answers=10, stdout=StringIO()
+        )
+        self.easy_q.refresh_from_db()
+        self.hard_q.refresh_from_db()
+        self.assertEqual((self.easy_q.times_answered, self.easy_q.times_correct), (20, 19))
+        self.assertEqual(self.easy_q.global_accuracy, 95.0)
+        self.assertEqual((self.easy_q.difficulty, self.hard_q.difficulty), ('easy', 'hard'))
+
+        call_command('rollup_question_stats', rebuild=True, stdout=StringIO())
+        self.hard_q.refresh_from_db()
+        self.assertEqual((self.hard_q.times_answered, self.hard_q.times_correct), (11, 2))
+
+@override_settings(ANSWER_EVENT_LOG_ENABLED=True)
+class AnswerEventLogTestCase(APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f'event_student_{i}') for i in range(2)]
+        for user in self.users:
+            UserProfile.objects.get_or_create(user=user)
+        topic = Topic.objects.create(name='Event Topic', slug='event-topic')
+        self.topic = topic
+        self.questions = [
+            Question.objects.create(topic=topic, text=f'Event question {i}', options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(3)
+        ]
+
+    def submit(self, user, question, option):
+        self.client.force_authenticate(user=user)
+        return self.client.post('/api/submit-answer/', {'question': question.id, 'selected_option': option}, format='json')
+
+    def test_submit_only_appends_and_consumer_applies_once(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from questionbank.models import AnswerEvent, TopicProgress, UserAnswer
+        with self.assertNumQueries(2):
+            response = self.submit(self.users[0], self.questions[0], 'A')
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['is_correct'])
+        self.submit(self.users[0], self.questions[1], 'B')
+        self.submit(self.users[1], self.questions[0], 'A')
+        self.assertFalse(UserAnswer.objects.exists())
+
+        call_command('consume_answer_events', stdout=StringIO())
+        self.assertEqual(UserAnswer.objects.count(), 3)
+        progress = TopicProgress.objects.get(user=self.users[0], topic=self.topic)
+        self.assertEqual((progress.total_attempted, progress.total_correct), (2, 1))
+        profile = UserProfile.objects.get(user=self.users[0])
+        self.assertEqual((profile.total_xp, profile.current_streak), (12, 1))
+
+        # Applied events are not applied again; pruning drops them
+        call_command('consume_answer_events', prune=True, stdout=StringIO())
+        self.assertEqual(UserAnswer.objects.count(), 3)
+        self.assertFalse(AnswerEvent.objects.exists())
+
+    @override_settings(ANSWER_EVENT_PARTITIONS=2)
+    def test_partitions_consume_disjoint_users(self):
+        from questionbank.answer_events import drain_answer_events
+        from questionbank.models import UserAnswer
+        for user in self.users:
+            self.submit(user, self.questions[2], 'A')
+        partition = self.users[0].id % 2
+        self.assertEqual(drain_answer_events(partition, 2), 1)
+        self.assertEqual(list(UserAnswer.objects.values_list('user_id', flat=True)), [self.users[0].id])
+        self.assertEqual(drain_answer_events(1 - partition, 2), 1)
+        self.assertEqual(drain_answer_events(partition, 2), 0)
+
+    def test_repartitioning_does_not_replay_and_backdated_answers_are_rolled_up(self):
+        from questionbank.answer_events import drain_answer_events
+        from questionbank.daily_stats import rollup_daily_stats
+        from questionbank.models import AnswerEvent, UserAnswer
+        from questionbank.question_stats import rollup_question_stats
+        for user in self.users:
+            self.submit(user, self.questions[0], 'A')
+        AnswerEvent.objects.update(created_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(drain_answer_events(), 2)
+        self.assertEqual(drain_answer_events(0, 2) + drain_answer_events(1, 2), 0)
+        self.assertEqual(UserAnswer.objects.count(), 2)
+        self.assertEqual(UserProfile.objects.get(user=self.users[0]).total_xp, 10)
+
+        answered_at = dict(UserAnswer.objects.values_list('user_id', 'answered_at'))
+        self.assertEqual(answered_at, dict(AnswerEvent.objects.values_list('user_id', 'created_at')))
+        self.assertEqual(rollup_question_stats(), (2, 1))
+        self.assertEqual(rollup_daily_stats(), 2)
+
+class AnswerKeyTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import ModelExam
+        self.user = User.objects.create(username='answer_key_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topic = Topic.objects.create(name='Answer Key Topic', slug='answer-key-topic')
+        Question.objects.bulk_create([
+            Question(topic=self.topic, text=f'Key question {i}', options={'A': '1', 'B': '2'},
+                     correct_answer='AB'[i % 2], difficulty='medium')
+            for i in range(10)
+        ])
+        self.questions = list(Question.objects.order_by('id'))
+        exam = Exam.objects.create(name='Answer Key Exam', slug='answer-key-exam', year=2025)
+        self.model_exam = ModelExam.objects.create(name='Key Paper 1', exam=exam)
+        self.model_exam.questions.set(self.questions)
+
+    def submit(self, answers):
+        return self.client.post(
+            f'/api/model-exams/{self.model_exam.id}/submit/', {'answers': answers, 'time_taken': 60}, format='json'
+        )
+
+    def test_key_grades_like_grade_sheet(self):
+        from questionbank.answer_keys import model_exam_key
+        from questionbank.grading import grade_sheet
+        answers = {str(q.id): 'A' for q in self.questions[:7]}
+        key = model_exam_key(self.model_exam.id)
+        self.assertEqual(len(key), 10)
+        self.assertEqual(
+            [(q.id, selected, ok) for q, selected, ok in key.grade(answers)],
+            [(q.id, selected, ok) for q, selected, ok in grade_sheet(self.questions, answers)],
+        )
+        self.assertEqual(key.score(answers), 4)
+
+    def test_submission_does_not_load_question_rows(self):
+        from questionbank.models import UserAnswer
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        answers = {str(q.id): 'A' for q in self.questions}
+        self.submit(answers)  # builds and caches the key
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.submit(answers)
+        self.assertEqual((response.data['correct_count'], response.data['total_questions']), (5, 10))
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if '"questionbank_question"."text"' in q['sql']])
+        self.assertEqual(UserAnswer.objects.filter(user=self.user, is_correct=True).count(), 10)
+
+    def test_question_save_and_membership_change_invalidate_keys(self):
+        from questionbank.answer_keys import model_exam_key
+        answers = {str(q.id): 'A' for q in self.questions}
+        self.assertEqual(model_exam_key(self.model_exam.id).score(answers), 5)
+
+        question = self.questions[1]
+        question.correct_answer = 'A'
+        question.save()
+        self.assertEqual(model_exam_key(self.model_exam.id).score(answers), 6)
+
+        self.model_exam.questions.remove(self.questions[0])
+        self.assertEqual(len(model_exam_key(self.model_exam.id)), 9)
+        self.assertEqual(self.submit(answers).data['correct_count'], 5)
+
+    def test_only_key_changes_drop_only_their_papers(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.answer_keys import model_exam_key
+        from questionbank.models import ModelExam
+        other_exam = ModelExam.objects.create(name='Key Paper 2', exam=self.model_exam.exam)
+        other_exam.questions.set(self.questions[5:])
+        for paper in (self.model_exam, other_exam):
+            model_exam_key(paper.id)
+
+        def rebuilt(paper):
+            # One version read for a cached key; the rebuild adds the key query
+            with CaptureQueriesContext(connection) as ctx:
+                model_exam_key(paper.id)
+            return len(ctx.captured_queries) > 1
+
+        question = self.questions[0]
+        question.explanation = 'Edited explanation'
+        question.save()
+        question.times_answered += 1
+        question.save(update_fields=['times_answered'])
+        self.assertEqual((rebuilt(self.model_exam), rebuilt(other_exam)), (False, False))
+
+        question.difficulty = 'hard'
+        question.save()
+        self.assertEqual((rebuilt(self.model_exam), rebuilt(other_exam)), (True, False))
+
+        self.questions[9].delete()
+        self.assertEqual((rebuilt(self.model_exam), rebuilt(other_exam)), (True, True))
+        self.assertEqual(len(model_exam_key(other_exam.id)), 4)
+
+    def test_edit_in_another_process_invalidates_keys(self):
+        from unittest.mock import patch
+        from django.core.cache.backends.locmem import LocMemCache
+        from questionbank.answer_keys import model_exam_key
+        answers = {str(q.id): 'A' for q in self.questions}
+        self.assertEqual(model_exam_key(self.model_exam.id).score(answers), 5)
+
+        # A second worker process has its own local-memory cache
+        other_process = LocMemCache('answer-keys-other-process', {})
+        with patch('questionbank.answer_keys.cache', other_process):
+            self.assertEqual(model_exam_key(self.model_exam.id).score(answers), 5)
+            question = self.questions[1]
+            question.correct_answer = 'A'
+            question.save()
+        self.assertEqual(model_exam_key(self.model_exam.id).score(answers), 6)
+
+
+class ResponseSheetTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import ModelExam
+        self.user = User.objects.create(username='sheet_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        topic = Topic.objects.create(name='Sheet Topic', slug='sheet-topic')
+        Question.objects.bulk_create([
+            Question(topic=topic, text=f'Sheet question {i}', options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(6)
+        ])
+        self.questions = list(Question.objects.order_by('id'))
+        exam = Exam.objects.create(name='Sheet Exam', slug='sheet-exam', year=2025)
+        self.model_exam = ModelExam.objects.create(name='Sheet Paper', exam=exam)
+        self.model_exam.questions.set(self.questions)
+
+    def test_round_trip(self):
+        from questionbank.answer_keys import model_exam_key
+        from questionbank.response_sheet import ResponseSheet
+        key = model_exam_key(self.model_exam.id)
+        answers = {str(self.questions[0].id): 'A', self.questions[2].id: 'B'}
+        sheet = ResponseSheet.from_answer_key(key, answers, {str(self.questions[0].id): 42})
+        decoded = ResponseSheet.from_bytes(sheet.to_bytes())
+        self.assertEqual(list(decoded)[:3], [
+            (self.questions[0].id, 'A', 42), (self.questions[1].id, '', 0), (self.questions[2].id, 'B', 0),
+        ])
+        self.assertEqual(decoded.marks({q.id: 'A' for q in self.questions})[:3], [True, False, False])
+        self.assertIsNone(ResponseSheet.from_bytes(ResponseSheet.from_answer_key(key, answers).to_bytes()).seconds)
+        self.assertEqual(len(ResponseSheet.from_bytes(b'')), 0)
+
+    def test_attempt_review(self):
+        from questionbank.models import ModelExamAttempt
+        answers = {str(q.id): 'AB'[i % 2] for i, q in enumerate(self.questions[:4])}
+        self.client.post(
+            f'/api/model-exams/{self.model_exam.id}/submit/',
+            {'answers': answers, 'time_taken': 90, 'question_times': {str(self.questions[1].id): 7}}, format='json'
+        )
+        attempt = ModelExamAttempt.objects.get(user=self.user)
+        response = self.client.get(f'/api/model-exams/attempts/{attempt.id}/review/')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual([r['is_correct'] for r in results], [True, False, True, False, False, False])
+        self.assertEqual((results[1]['selected_option'], results[1]['time_spent_secs']), ('B', 7))
+        self.assertEqual(results[5]['selected_option'], '')
+
+        other = User.objects.create(username='sheet_other')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f'/api/model-exams/attempts/{attempt.id}/review/').status_code, 404)
+
+
+class RescoringTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import ModelExam
+        self.topic = Topic.objects.create(name='Rescore Topic', slug='rescore-topic')
+        Question.objects.bulk_create([
+            Question(topic=self.topic, text=f'Rescore question {i}', options={'A': '1', 'B': '2'},
+                     correct_answer='A', difficulty='easy')
+            for i in range(4)
+        ])
+        self.questions = list(Question.objects.order_by('id'))
+        exam = Exam.objects.create(name='Rescore Exam', slug='rescore-exam', year=2025)
+        self.model_exam = ModelExam.objects.create(name='Rescore Paper', exam=exam)
+        self.model_exam.questions.set(self.questions)
+        self.users = [User.objects.create(username=f'rescore_{i}') for i in range(3)]
+        for user in self.users:
+            UserProfile.objects.get_or_create(user=user)
+        # Users 0 and 1 pick A for the first question, user 2 picks B
+        for user, first_pick in zip(self.users, 'AAB'):
+            self.client.force_authenticate(user=user)
+            answers = {str(self.questions[0].id): first_pick, **{str(q.id): 'A' for q in self.questions[1:]}}
+            self.client.post(f'/api/model-exams/{self.model_exam.id}/submit/', {'answers': answers}, format='json')
+
+    def test_corrected_key_regrades_history(self):
+        from questionbank.models import ModelExamAttempt, TopicProgress, UserAnswer
+        from questionbank.question_stats import rollup_question_stats
+        from questionbank.rescoring import rescore_questions
+        rollup_question_stats()
+
+        question = Question.objects.get(pk=self.questions[0].pk)
+        question.correct_answer = 'B'
+        # Relabelled since it was answered: the answers stay counted as easy
+        question.difficulty = 'hard'
+        question.save()
+        summary = rescore_questions([question.id], chunk_size=2)
+
+        self.assertEqual((summary['answers'], summary['attempts']), (3, 3))
+        self.assertEqual(summary['users'], {user.id for user in self.users})
+        self.assertEqual(
+            list(UserAnswer.objects.filter(question=question).order_by('user_id').values_list('is_correct', flat=True)),
+            [False, False, True],
+        )
+        scores = dict(ModelExamAttempt.objects.values_list('user_id', 'score'))
+        self.assertEqual([scores[user.id] for user in self.users], [75.0, 75.0, 100.0])
+        from questionbank.models import ExamScoreHistogram
+        buckets = ExamScoreHistogram.objects.get(paper_id=self.model_exam.id).score_buckets
+        self.assertEqual((buckets[75], buckets[100], sum(buckets)), (2, 1, 3))
+        progress = {p.user_id: p for p in TopicProgress.objects.filter(topic=self.topic)}
+        self.assertEqual([progress[user.id].total_correct for user in self.users], [3, 3, 4])
+        self.assertEqual([progress[user.id].easy_correct for user in self.users], [3, 3, 4])
+        self.assertEqual([progress[user.id].hard_correct for user in self.users], [0, 0, 0])
+        question.refresh_from_db()
+        self.assertEqual((question.times_answered, question.times_correct), (3, 1))
+
+        # Nothing left to change on a second run
+        summary = rescore_questions([question.id])
+        self.assertEqual((summary['answers'], summary['attempts'], len(summary['users'])), (0, 0, 0))
+
+        # A re-scored attempt scores like the same sheet submitted now
+        self.client.force_authenticate(user=self.users[0])
+        answers = {str(q.id): 'A' for q in self.questions}
+        response = self.client.post(f'/api/model-exams/{self.model_exam.id}/submit/', {'answers': answers}, format='json')
+        self.assertEqual(response.data['score'], scores[self.users[0].id])
+
+    def test_command_reports_users(self):
+        from io import StringIO
+        from django.core.management import call_command
+        Question.objects.filter(pk=self.questions[1].pk).update(correct_answer='B')
+        out = StringIO()
+        call_command('rescore_questions', str(self.questions[1].id), stdout=out)
+        self.assertIn('stats changed for 3 users', out.getvalue())
+
+
+class ScoreHistogramTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import ModelExam
+        self.user = User.objects.create(username='histogram_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        exam = Exam.objects.create(name='Histogram Exam', slug='histogram-exam', year=2025)
+        self.model_exam = ModelExam.objects.create(name='Histogram Paper', exam=exam)
+
+    def add_attempts(self, scores):
+        from questionbank.models import ModelExamAttempt
+        for i, score in enumerate(scores):
+            user = User.objects.create(username=f'histogram_{score}_{i}_{ModelExamAttempt.objects.count()}')
+            ModelExamAttempt.objects.create(user=user, model_exam=self.model_exam, score=score, time_taken=600 + i * 60)
+
+    def test_standing_and_stats_endpoint(self):
+        from questionbank.models import ExamScoreHistogram, ModelExamAttempt
+        self.add_attempts([10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+        ModelExamAttempt.objects.create(user=self.user, model_exam=self.model_exam, score=75, time_taken=900)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/model-exams/{self.model_exam.id}/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['attempts'], response.data['score']), (11, 75))
+        self.assertEqual(response.data['rank'], 4)
+        self.assertEqual(response.data['percentile'], round(7.5 / 11 * 100, 1))
+        self.assertEqual([band['count'] for band in response.data['distribution']['scores']], [0, 1, 1, 1, 1, 1, 1, 2, 1, 2])
+
+        what_if = self.client.get(f'/api/model-exams/{self.model_exam.id}/stats/?score=100')
+        self.assertEqual(what_if.data['rank'], 1)
+
+        # Deleting an attempt takes it out; a rebuild yields the same buckets
+        ModelExamAttempt.objects.filter(score=10).delete()
+        histogram = ExamScoreHistogram.objects.get(paper_id=self.model_exam.id)
+        self.assertEqual(histogram.attempts, 10)
+        from questionbank.score_histogram import rebuild_histograms
+        rebuild_histograms()
+        rebuilt = ExamScoreHistogram.objects.get(paper_id=self.model_exam.id)
+        self.assertEqual(
+            (rebuilt.attempts, rebuilt.score_buckets, rebuilt.time_buckets),
+            (histogram.attempts, histogram.score_buckets, histogram.time_buckets),
+        )
+
+    def test_submission_returns_standing(self):
+        self.add_attempts([0, 100])
+        response = self.client.post(f'/api/model-exams/{self.model_exam.id}/submit/', {'answers': {}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['standing'], {'attempts': 3, 'percentile': round(1 / 3 * 100, 1), 'rank': 2})
+
+        self.add_attempts(range(100))
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/model-exams/{self.model_exam.id}/stats/')
+
+
+class DailyStatsRollupTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import UserAnswer
+        self.UserAnswer = UserAnswer
+        self.user = User.objects.create(username='daily_stats_student')
+        self.profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.focus = Exam.objects.create(name='Daily Focus Exam', slug='daily-focus-exam', year=2025)
+        self.other = Exam.objects.create(name='Daily Other Exam', slug='daily-other-exam', year=2025)
+        self.profile.preferred_exams.add(self.focus)
+        self.topics = [Topic.objects.create(name=f'Daily Topic {i}', slug=f'daily-topic-{i}') for i in range(2)]
+        self.questions = []
+        for i in range(6):
+            question = Question.objects.create(
+                topic=self.topics[i % 2], text=f'Daily question {i}', options={'A': '1', 'B': '2'}, correct_answer='A'
+            )
+            # 0-1: focus only, 2-3: both exams, 4-5: other only
+            question.exams.set([self.focus] if i < 2 else [self.focus, self.other] if i < 4 else [self.other])
+            self.questions.append(question)
+
+    def answer(self, days_ago, correct_pattern):
+        from questionbank.grading import record_answers
+        record_answers(
+            self.user, [(question, 'A', correct) for question, correct in zip(self.questions, correct_pattern)],
+            answered_at=[timezone.now() - timedelta(days=days_ago)] * len(correct_pattern),
+        )
+
+    def dashboard(self, mode):
+        data = self.client.get(f'/api/my-progress-dashboard/?mode={mode}').data
+        return (
+            data['overall_stats'],
+            sorted((row['question__topic__id'], row['total'], row['correct']) for row in data['topic_performance']),
+            sorted((row['question__exams__name'], row['total'], row['correct']) for row in data['exam_performance']),
+            [day['count'] for day in data['heatmap_data'] if day['count']],
+        )
+
+    def test_dashboard_is_the_same_before_and_after_rollup(self):
+        from questionbank.daily_stats import rollup_daily_stats
+        from questionbank.user_cache import bump_user_data
+        self.answer(3, [True, False, True, True, False, True])
+        self.answer(1, [True, True, False, True, True, True])
+
+        unfolded = {mode: self.dashboard(mode) for mode in ('focus', 'overall')}
+        overall, topics, exams, heatmap = unfolded['overall']
+        self.assertEqual((overall['total_answered'], overall['correct']), (12, 9))
+        self.assertEqual(exams, [('Daily Focus Exam', 8, 6), ('Daily Other Exam', 8, 6)])
+        self.assertEqual(heatmap, [6, 6])
+        focus, _, focus_exams, focus_heatmap = unfolded['focus']
+        self.assertEqual((focus['total_answered'], focus['correct']), (8, 6))
+        self.assertEqual(focus_exams, [('Daily Focus Exam', 8, 6)])
+        self.assertEqual(focus_heatmap, [6, 6])
+
+        self.assertEqual(rollup_daily_stats(batch_size=5), 12)
+        self.assertEqual({mode: self.dashboard(mode) for mode in ('focus', 'overall')}, unfolded)
+
+        # Answers not folded yet are merged in without waiting for the job
+        late = self.UserAnswer.objects.create(user=self.user, question=self.questions[0], selected_option='A', is_correct=True)
+        late.delete()
+        self.answer(0, [False] * 6)
+        overall = self.dashboard('overall')[0]
+        self.assertEqual((overall['total_answered'], overall['correct']), (18, 9))
+
+        # An answer whose transaction commits after later ids were folded is folded by the next run
+        self.assertEqual(rollup_daily_stats(), 6)
+        self.UserAnswer.objects.create(id=late.id, user=self.user, question=self.questions[0], selected_option='A', is_correct=True)
+        bump_user_data(self.user.id)
+        self.assertEqual(self.dashboard('overall')[0]['total_answered'], 19)
+        self.assertEqual(rollup_daily_stats(), 1)
+        bump_user_data(self.user.id)
+        overall = self.dashboard('overall')[0]
+        self.assertEqual((overall['total_answered'], overall['correct']), (19, 10))
+
+    def test_dashboard_queries_do_not_grow_with_answers(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.daily_stats import rollup_daily_stats
+        counts = []
+        for batches in (1, 10):
+            for _ in range(batches):
+                self.answer(2, [True] * 6)
+            rollup_daily_stats()
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get('/api/my-progress-dashboard/')
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class ExamMembershipTestCase(TestCase):
+    def setUp(self):
+        self.topic = Topic.objects.create(name='Membership Topic', slug='membership-topic')
+        self.exams = [Exam.objects.create(name=f'Membership Exam {i}', slug=f'membership-exam-{i}', year=2025) for i in range(3)]
+        self.question = Question.objects.create(topic=self.topic, text='Member question', options={'A': '1'}, correct_answer='A')
+        self.other = Question.objects.create(topic=self.topic, text='Other question', options={'A': '1'}, correct_answer='A')
+
+    def exam_ids(self, question):
+        return Question.objects.values_list('exam_ids', flat=True).get(pk=question.pk)
+
+    def test_kept_in_sync_with_m2m(self):
+        first, second, third = self.exams
+        self.question.exams.add(third, first)
+        self.assertEqual(self.question.exam_ids, f',{first.id},{third.id},')
+        self.assertEqual(self.exam_ids(self.question), f',{first.id},{third.id},')
+
+        self.question.exams.remove(third)
+        self.assertEqual(self.exam_ids(self.question), f',{first.id},')
+
+        second.questions.add(self.question, self.other)
+        self.assertEqual(self.exam_ids(self.question), f',{first.id},{second.id},')
+        self.assertEqual(self.exam_ids(self.other), f',{second.id},')
+
+        second.questions.clear()
+        self.assertEqual(self.exam_ids(self.other), '')
+
+        first.delete()
+        self.assertEqual(self.exam_ids(self.question), '')
+
+    def test_filter_has_no_duplicates(self):
+        from questionbank.exam_membership import in_exams, rebuild_exam_ids
+        self.question.exams.set(self.exams[:2])
+        self.other.exams.set(self.exams[2:])
+        in_first_two = Question.objects.filter(in_exams([e.id for e in self.exams[:2]]))
+        self.assertEqual(list(in_first_two.values_list('id', flat=True)), [self.question.id])
+        # Matched through the M2M table, not by scanning the denormalized column
+        self.assertNotIn('LIKE', str(in_first_two.query))
+        self.assertFalse(Question.objects.filter(in_exams([])).exists())
+
+        Question.objects.update(exam_ids='')
+        self.assertEqual(rebuild_exam_ids(batch_size=1), 2)
+        self.assertEqual(self.exam_ids(self.other), f',{self.exams[2].id},')
+
+
+class UserActivityTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='activity_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topic = Topic.objects.create(name='Activity Topic', slug='activity-topic')
+        self.question = Question.objects.create(topic=self.topic, text='Activity question', options={'A': '1'}, correct_answer='A')
+
+    def test_counts_are_packed_per_year(self):
+        from datetime import date
+        from questionbank.activity import daily_counts, decode, record_activity
+        from questionbank.models import UserActivityYear
+        record_activity(self.user.id, 3, day=date(2024, 12, 31))
+        record_activity(self.user.id, day=date(2024, 12, 31))
+        record_activity(self.user.id, 2, day=date(2025, 1, 1))
+        record_activity(self.user.id, 0, day=date(2025, 1, 2))
+
+        row = UserActivityYear.objects.get(user=self.user, year=2024)
+        self.assertEqual(len(row.days), 366 * 2)
+        self.assertEqual(decode(row.days)[365], 4)
+        self.assertEqual(
+            daily_counts(self.user.id, date(2024, 12, 30), date(2025, 1, 2)),
+            {
+                date(2024, 12, 30): 0, date(2024, 12, 31): 4,
+                date(2025, 1, 1): 2, date(2025, 1, 2): 0,
+            },
+        )
+
+    def test_answers_and_feed_reads_are_recorded(self):
+        from questionbank.models import UserActivityYear, UserAnswer
+        from questionbank.activity import daily_counts, decode
+        from questionbank.daily_stats import rollup_daily_stats
+        UserAnswer.objects.create(user=self.user, question=self.question, selected_option='A', is_correct=True)
+        card = StudyFeedCard.objects.create(card_type='fact', title='Activity fact', content_data={})
+        UserFeedView.objects.create(user=self.user, card=card)
+        self.client.post('/api/submit-exam/', {'answers': {str(self.question.id): 'A'}, 'question_ids': [self.question.id]}, format='json')
+
+        today = timezone.localdate()
+        index = today.timetuple().tm_yday - 1
+        self.assertEqual(decode(UserActivityYear.objects.get(user=self.user).days)[index], 3)
+        self.assertEqual(daily_counts(self.user.id, today, today), {today: 3})
+        self.assertEqual(self.client.get('/api/auth/profile/activity/').data, {'activity': [today.strftime('%Y-%m-%d')]})
+
+        # The rollup does not count them again
+        self.assertEqual(rollup_daily_stats(), 2)
+        self.assertEqual(daily_counts(self.user.id, today, today), {today: 3})
+
+    def test_summary_runs(self):
+        from datetime import date
+        from questionbank.activity import activity_summary, record_activity
+        today = date(2025, 1, 3)
+        for days_ago in (0, 1, 2, 5, 6, 7, 8):
+            record_activity(self.user.id, day=today - timedelta(days=days_ago))
+        self.assertEqual(
+            activity_summary(self.user.id, today=today), {'active_days': 7, 'current_run': 3, 'longest_run': 4}
+        )
+        self.assertEqual(activity_summary(self.user.id, today=today + timedelta(days=1))['current_run'], 3)
+        self.assertEqual(activity_summary(self.user.id, today=today + timedelta(days=2))['current_run'], 0)
+
+    def test_rebuild_matches_recorded_activity(self):
+        from questionbank.models import UserActivityYear, UserAnswer
+        from questionbank.activity import rebuild_activity
+        for _ in range(2):
+            UserAnswer.objects.create(user=self.user, question=self.question, selected_option='A', is_correct=True)
+        self.client.post('/api/submit-exam/', {'answers': {str(self.question.id): 'A'}, 'question_ids': [self.question.id]}, format='json')
+        recorded = dict(UserActivityYear.objects.values_list('year', 'days'))
+
+        UserActivityYear.objects.all().delete()
+        self.assertEqual(rebuild_activity(), 1)
+        self.assertEqual(
+            {year: bytes(days) for year, days in UserActivityYear.objects.values_list('year', 'days')},
+            {year: bytes(days) for year, days in recorded.items()},
+        )
+
+
+class WeeklyMissionsTestCase(APITestCase):
+    def setUp(self):
+        from questionbank.models import ModelExam
+        self.user = User.objects.create(username='missions_student')
+        self.profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topic = Topic.objects.create(name='Mission Topic', slug='mission-topic')
+        self.questions = [
+            Question.objects.create(topic=self.topic, text=f'Mission question {i}', options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(60)
+        ]
+        exam = Exam.objects.create(name='Mission Exam', slug='mission-exam', year=2025)
+        self.model_exam = ModelExam.objects.create(name='Mission Paper', exam=exam)
+
+    def missions(self):
+        return {mission['id']: mission for mission in self.client.get('/api/goals/').data['missions']}
+
+    def submit(self, questions, option):
+        return self.client.post('/api/submit-exam/', {
+            'answers': {str(q.id): option for q in questions}, 'question_ids': [q.id for q in questions],
+        }, format='json')
+
+    def test_counters_follow_events_and_grant_xp_once(self):
+        from questionbank.models import ModelExamAttempt, UserAnswer
+        from questionbank.weekly_missions import bump_missions
+        self.assertTrue(self.missions()['review_wrong']['completed'])
+
+        self.submit(self.questions[:5], 'B')
+        missions = self.missions()
+        self.assertEqual(missions['questions_50']['progress'], 5)
+        self.assertEqual(missions['review_wrong']['progress'], 0)
+
+        UserAnswer.objects.create(user=self.user, question=self.questions[0], selected_option='A', is_correct=True)
+        self.profile.refresh_from_db()
+        xp = self.profile.total_xp
+        response = self.submit(self.questions[1:50], 'A')
+        missions = self.missions()
+        self.assertEqual(missions['review_wrong']['progress'], 5)
+        self.assertEqual(missions['questions_50']['progress'], 50)
+        self.assertTrue(missions['questions_50']['completed'])
+
+        # The answer missions' XP comes with the sheet that completes them
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_xp - xp, response.data['gamification']['xp_earned'] + 100 + 50)
+        xp = self.profile.total_xp
+
+        for _ in range(2):
+            ModelExamAttempt.objects.create(user=self.user, model_exam=self.model_exam, score=50, time_taken=60)
+        for i in range(10):
+            card = StudyFeedCard.objects.create(card_type='current_affairs', title=f'News {i}', content_data={})
+            UserFeedView.objects.create(user=self.user, card=card)
+        fact = StudyFeedCard.objects.create(card_type='fact', title='Mission fact', content_data={})
+        UserFeedView.objects.create(user=self.user, card=fact)
+
+        missions = self.missions()
+        self.assertEqual(missions['mock_tests_2']['progress'], 2)
+        self.assertEqual(missions['current_affairs_10']['progress'], 10)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_xp - xp, 150 + 75)
+
+        # Answering past a reached target grants nothing more
+        bump_missions(self.user.id, questions_answered=10, mock_tests=1)
+        for question in self.questions[50:]:
+            UserAnswer.objects.create(user=self.user, question=question, selected_option='A', is_correct=True)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_xp - xp, 150 + 75)
+
+    def test_new_week_resets_counters(self):
+        from questionbank.models import UserAnswer, WeeklyMissionProgress
+        self.submit(self.questions[:3], 'B')
+        WeeklyMissionProgress.objects.filter(user=self.user).update(week='2020-W01', rewarded=['questions_50'])
+        missions = self.missions()
+        self.assertEqual(missions['questions_50']['progress'], 0)
+        self.assertFalse(missions['review_wrong']['completed'])
+
+        self.submit(self.questions[3:5], 'B')
+        self.assertEqual(self.missions()['questions_50']['progress'], 2)
+        progress = WeeklyMissionProgress.objects.get(user=self.user)
+        self.assertEqual((progress.questions_answered, progress.rewarded), (2, []))
+
+        # An answer from last week saved late does not count towards this week
+        UserAnswer.objects.create(
+            user=self.user, question=self.questions[5], selected_option='A', is_correct=True,
+            answered_at=timezone.now() - timedelta(days=7),
+        )
+        progress.refresh_from_db()
+        self.assertEqual(progress.questions_answered, 2)
+
+    def test_goals_cost_does_not_grow_and_rebuild_matches(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from questionbank.daily_stats import reset_daily_stats, rollup_daily_stats
+        from questionbank.models import WeeklyMissionProgress
+        from questionbank.weekly_missions import rebuild_weekly_missions
+        self.submit(self.questions[:10], 'B')
+        counts = []
+        for sheet in (self.questions[:3], self.questions[3:40]):
+            self.submit(sheet, 'A')
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get('/api/goals/')
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        rollup_daily_stats()
+        self.submit(self.questions[40:42], 'A')
+        fields = (
+            'week', 'questions_answered', 'mock_tests', 'current_affairs_read', 'wrong_reviewed', 'has_wrong_answers',
+            'rewarded',
+        )
+        recorded = WeeklyMissionProgress.objects.values_list(*fields).get(user=self.user)
+        self.assertEqual(recorded[1:], (52, 0, 0, 10, True, ['questions_50', 'review_wrong']))
+        self.assertEqual(rebuild_weekly_missions(), 1)
+        self.assertEqual(WeeklyMissionProgress.objects.values_list(*fields).get(user=self.user), recorded)
+
+        # Refolding every answer into the daily stats leaves the missions alone
+        self.profile.refresh_from_db()
+        xp = self.profile.total_xp
+        reset_daily_stats()
+        rollup_daily_stats()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_xp, xp)
+        self.assertEqual(WeeklyMissionProgress.objects.get(user=self.user).questions_answered, 52)
+
+
+class UserPayloadCacheTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='payload_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topic = Topic.objects.create(name='Payload Topic', slug='payload-topic')
+        self.questions = [
+            Question.objects.create(topic=self.topic, text=f'Payload question {i}', options={'A': '1', 'B': '2'}, correct_answer='A')
+            for i in range(4)
+        ]
+
+    def submit(self, questions):
+        return self.client.post('/api/submit-exam/', {
+            'answers': {str(q.id): 'A' for q in questions}, 'question_ids': [q.id for q in questions],
+        }, format='json')
+
+    def test_repeat_requests_skip_the_database(self):
+        first = self.client.get('/api/my-progress-dashboard/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        # Only the version lookup
+        with self.assertNumQueries(1):
+            repeat = self.client.get('/api/my-progress-dashboard/')
+        self.assertEqual((repeat['ETag'], repeat.data), (etag, first.data))
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get('/api/my-progress-dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Query parameters get payloads of their own
+        self.assertNotEqual(self.client.get('/api/my-progress-dashboard/?mode=overall')['ETag'], etag)
+
+    def test_user_writes_invalidate(self):
+        from questionbank.models import UserExamProgress
+        exam = Exam.objects.create(name='Payload Exam', slug='payload-exam', year=2025)
+        urls = ['/api/my-progress-dashboard/', '/api/goals/', '/api/analytics/topic-summary/', '/api/analytics/weak-areas/']
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+
+        self.submit(self.questions[:3])
+        for url in urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+            etags[url] = response['ETag']
+        self.assertEqual(self.client.get('/api/goals/').data['missions'][0]['progress'], 3)
+
+        # Another user's answers leave the payloads alone
+        other = User.objects.create(username='payload_other')
+        self.client.force_authenticate(user=other)
+        self.submit(self.questions)
+        self.client.force_authenticate(user=self.user)
+        for url in urls:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code, 304, url)
+
+        url = f'/api/my-exam-progress/{exam.id}/'
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        UserExamProgress.objects.filter(user=self.user, exam=exam).get().save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_writes_in_another_process_invalidate(self):
+        from unittest.mock import patch
+        from django.core.cache.backends.locmem import LocMemCache
+        url = '/api/analytics/topic-summary/'
+        first = self.client.get(url)
+
+        # A second worker process, with its own local-memory cache, handles an answer sheet and a new topic
+        other_process = LocMemCache('user-payloads-other-process', {})
+        with patch('questionbank.user_cache.cache', other_process), \
+                patch('questionbank.answer_keys.cache', other_process):
+            self.submit(self.questions[:2])
+            Topic.objects.create(name='Payload Topic 2', slug='payload-topic-2')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data, first.data)
+        self.assertEqual(len(response.data), 2)
+
+    def test_content_changes_invalidate(self):
+        etag = self.client.get('/api/analytics/topic-summary/')['ETag']
+        Topic.objects.create(name='Payload Topic 2', slug='payload-topic-2')
+        response = self.client.get('/api/analytics/topic-summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+
+class TopicQuestionCountTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='count_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.topics = [Topic.objects.create(name=f'Count Topic {i}', slug=f'count-topic-{i}') for i in range(2)]
+
+    def question(self, topic, **fields):
+        return Question.objects.create(topic=topic, text=f'Count question {Question.objects.count()}', options={'A': '1'}, correct_answer='A', **fields)
+
+    def stored(self):
+        from questionbank.models import TopicQuestionCount
+        return {
+            (row.topic_id, row.language, row.difficulty, row.institute_id, row.status): row.count
+            for row in TopicQuestionCount.objects.filter(count__gt=0)
+        }
+
+    def recounted(self):
+        from questionbank.topic_counts import build_count_rows
+        return {
+            (row.topic_id, row.language, row.difficulty, row.institute_id, row.status): row.count
+            for row in build_count_rows()
+        }
+
+    def test_counts_follow_question_changes(self):
+        first, second = self.topics
+        easy = self.question(first, difficulty='easy')
+        self.question(first, language='ml')
+        moved = self.question(first, status='pending')
+        self.assertEqual(self.stored(), self.recounted())
+
+        moved = Question.objects.get(pk=moved.pk)
+        moved.status = 'approved'
+        moved.topic = second
+        moved.save()
+        easy = Question.objects.get(pk=easy.pk)
+        easy.difficulty = 'hard'
+        easy.save(update_fields=['difficulty'])
+        easy.explanation = 'Because'
+        easy.save(update_fields=['explanation'])
+        self.assertEqual(self.stored(), self.recounted())
+
+        Question.objects.get(pk=easy.pk).delete()
+        self.assertEqual(self.stored(), self.recounted())
+        self.assertEqual(self.stored(), {
+            (first.id, 'ml', 'medium', None, 'approved'): 1, (second.id, 'en', 'medium', None, 'approved'): 1,
+        })
+
+    def test_shared_bank_keys_have_one_row(self):
+        from django.db import IntegrityError, transaction
+        from questionbank.models import TopicQuestionCount
+        from questionbank.topic_counts import apply_deltas
+        key = (self.topics[0].id, 'en', 'medium', None, 'approved')
+        apply_deltas({key: 2})
+        apply_deltas({key: 1})
+        self.assertEqual(TopicQuestionCount.objects.get(institute__isnull=True).count, 3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TopicQuestionCount.objects.create(
+                topic=self.topics[0], language='en', difficulty='medium', status='approved', count=1
+            )
+
+    def test_recalibration_and_rebuild(self):
+        from questionbank.models import TopicQuestionCount
+        from questionbank.question_stats import recalibrate_difficulty
+        from questionbank.topic_counts import rebuild_topic_counts
+        question = self.question(self.topics[0])
+        Question.objects.filter(pk=question.pk).update(times_answered=40, times_correct=40)
+        self.assertEqual(recalibrate_difficulty(min_answers=30), 1)
+        self.assertEqual(self.stored(), {(self.topics[0].id, 'en', 'easy', None, 'approved'): 1})
+
+        TopicQuestionCount.objects.all().delete()
+        self.assertEqual(rebuild_topic_counts(), 1)
+        self.assertEqual(self.stored(), self.recounted())
+
+    def test_topic_list_counts_in_one_query(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        counts = []
+        for extra in (0, 5):
+            for i in range(extra):
+                topic = Topic.objects.create(name=f'Extra Topic {i}', slug=f'extra-topic-{i}')
+                self.question(topic)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get('/api/topics/')
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        self.question(self.topics[0], difficulty='easy')
+        self.question(self.topics[0], language='ml')
+        listed = {topic['slug']: topic for topic in self.client.get('/api/topics/').data}
+        self.assertEqual(listed['count-topic-0']['question_count'], 2)
+        self.assertEqual(listed['count-topic-0']['question_breakdown'], {
+            'by_language': {'en': 1, 'ml': 1}, 'by_difficulty': {'easy': 1, 'medium': 1},
+        })
+        self.assertEqual(listed['count-topic-1']['question_count'], 0)
+
+
+class BenchmarkCommandTestCase(TestCase):
+    def test_benchmark_engine_writes_results_and_rolls_back(self):
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            call_command(
+                'benchmark_engine', questions_per_topic=30, topics=2, users=2, answers_per_user=10,
+                limit=5, runs=1, output=output, stdout=StringIO()
+            )
+            with open(output) as fh:
+                results = json.load(fh)
+
+            out = StringIO()
+            call_command(
+                'benchmark_engine', questions_per_topic=30, topics=2, users=2, answers_per_user=10,
+                limit=5, runs=1, compare=output, stdout=out
+            )
+
+        self.assertIn('engine_stale', results['cases'])
+        self.assertGreater(results['cases']['practice_start']['queries'], 0)
+        self.assertIn('engine_unseen', out.getvalue())
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+class QueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    # Budgets must hold regardless of how many exams, topics and answers exist
+    BUDGETS = {
+        '/api/my-progress-dashboard/': 12,
+        '/api/my-progress-dashboard/?mode=overall': 10,
+        '/api/leaderboard/': 3,
+        '/api/syllabuses/': 9,
+        '/api/analytics/topic-summary/': 6,
+    }
+
+    def setUp(self):
+        from questionbank.models import ExamSyllabus, Syllabus, UserAnswer
+        self.ExamSyllabus, self.Syllabus, self.UserAnswer = ExamSyllabus, Syllabus, UserAnswer
+        self.user = User.objects.create(username='budget_student')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.seeded = 0
+
+    def seed(self, exams):
+        created = []
+        for _ in range(exams):
+            i = self.seeded = self.seeded + 1
+            exam = Exam.objects.create(name=f"Budget Exam {i}", slug=f"budget-exam-{i}", year=2025)
+            topic = Topic.objects.create(name=f"Budget Topic {i}", slug=f"budget-topic-{i}")
+            if i % 3 == 1:
+                self.Syllabus.objects.create(exam=exam, details='Official syllabus')
+            if i % 3 != 0:
+                self.ExamSyllabus.objects.create(exam=exam, topic=topic, num_questions=5)
+            for j in range(3):
+                q = Question.objects.create(
+                    topic=topic, text=f"Budget question {i}-{j}",
+                    options={'A': '1', 'B': '2'}, correct_answer='A'
+                )
+                q.exams.add(exam)
+                self.UserAnswer.objects.create(user=self.user, question=q, selected_option='A', is_correct=j % 2 == 0)
+            other = User.objects.create(username=f"budget_other_{i}")
+            UserProfile.objects.get_or_create(user=other)
+            created.append(exam)
+        self.user.userprofile.preferred_exams.set(created[:2])
+
+    def test_endpoints_stay_within_budget_as_data_grows(self):
+        for exams in (2, 6):
+            self.seed(exams)
+            for url, budget in self.BUDGETS.items():
+                self.assertQueryBudget('get', url, budget)
+
+    def test_budget_failure_lists_statements(self):
+        with self.assertRaises(AssertionError) as ctx:
+            self.assertQueryBudget('get', '/api/leaderboard/', budget=0)
+        self.assertIn('budget is 0', str(ctx.exception))
+        self.assertIn('SELECT', str(ctx.exception))
+
+    @override_settings(DEBUG=True)
+    def test_middleware_reports_query_stats_in_debug(self):
+        response = self.client.get('/api/leaderboard/')
+        self.assertEqual(response['X-DB-Query-Count'], str(self.BUDGETS['/api/leaderboard/']))
+        self.assertIn('X-DB-Time-Ms', response)
+
+    def test_middleware_hides_headers_outside_debug(self):
+        with self.assertLogs('questionbank.middleware', level='INFO') as logs:
+            response = self.client.get('/api/leaderboard/')
+        self.assertNotIn('X-DB-Query-Count', response)
+        self.assertIn('/api/leaderboard/: 3 queries', logs.output[0])
+
 from questionbank.utils import find_similar_questions
 
 class CommunitySubmissionAndDeduplicationTestCase(APITestCase):
@@ -0,0 +1,108 @@
+"""
+Question counts per topic, language, difficulty, institute and status
+(TopicQuestionCount).
+
+Question saves and deletes move the counts of the key they leave and the key
+they enter (see questionbank.signals); set-based rewrites such as difficulty
+recalibration refresh the topics they touch. Topic listings read all counts --
+totals and the language/difficulty breakdown -- with one grouped query.
+`manage.py rebuild_topic_counts` recounts everything, e.g. after bulk imports.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+
+from .models import Question, TopicQuestionCount
+
+KEY_FIELDS = ('topic_id', 'language', 'difficulty', 'institute_id', 'status')
+# Question.save(update_fields=...) names that can move a question to another key
+KEY_UPDATE_FIELDS = frozenset(KEY_FIELDS) | {'topic', 'institute'}
+
+
+def question_key(question):
+    return tuple(getattr(question, field) for field in KEY_FIELDS)
+
+
+def stored_key(question_id):
+    """The key a saved question currently counts under, or None."""
+    return Question.objects.filter(pk=question_id).values_list(*KEY_FIELDS).first()
+
+
+def apply_deltas(deltas):
+    """
+    Adds `deltas` ({key: delta}) to the counts, creating missing rows for
+    positive deltas. A row created concurrently is found by get_or_create
+    (the unique constraints cover shared-bank keys too) and updated instead.
+    """
+    for key, delta in deltas.items():
+        if not delta or key[0] is None:
+            continue
+        filters = dict(zip(KEY_FIELDS, key))
+        with transaction.atomic():
+            updated = TopicQuestionCount.objects.filter(**filters).update(count=Greatest(F('count') + delta, Value(0)))
+            if not updated and delta > 0:
+                row, created = TopicQuestionCount.objects.get_or_create(defaults={'count': delta}, **filters)
+                if not created:
+                    TopicQuestionCount.objects.filter(pk=row.pk).update(count=F('count') + delta)
+
+
+def move_question(old_key, new_key):
+    """Moves one question between keys; None stands for "not counted" (created or deleted)."""
+    if old_key == new_key:
+        return
+    deltas = {}
+    if old_key is not None:
+        deltas[old_key] = -1
+    if new_key is not None:
+        deltas[new_key] = deltas.get(new_key, 0) + 1
+    apply_deltas(deltas)
+
+
+def build_count_rows(topic_ids=None):
+    """Builds unsaved count rows by grouping questions, optionally only for `topic_ids`."""
+    questions = Question.objects.all()
+    if topic_ids is not None:
+        questions = questions.filter(topic_id__in=list(topic_ids))
+    return [
+        TopicQuestionCount(count=n, **dict(zip(KEY_FIELDS, key)))
+        for *key, n in questions.values_list(*KEY_FIELDS).annotate(n=Count('id')).order_by().iterator()
+    ]
+
+
+def refresh_topic_counts(topic_ids):
+    """Recounts the given topics, after changes that bypassed Question signals."""
+    topic_ids = list(topic_ids)
+    if not topic_ids:
+        return
+    rows = build_count_rows(topic_ids)
+    with transaction.atomic():
+        TopicQuestionCount.objects.filter(topic_id__in=topic_ids).delete()
+        TopicQuestionCount.objects.bulk_create(rows)
+
+
+def rebuild_topic_counts():
+    """Recounts every topic. Returns the number of count rows written."""
+    rows = build_count_rows()
+    with transaction.atomic():
+        TopicQuestionCount.objects.all().delete()
+        TopicQuestionCount.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def topic_question_counts(topic_ids=None, **filters):
+    """
+    Returns {topic_id: {'total': n, 'by_language': {...}, 'by_difficulty': {...}}}
+    in one query. `filters` narrow the rows, e.g. status='approved'.
+    """
+    rows = TopicQuestionCount.objects.filter(count__gt=0, **filters)
+    if topic_ids is not None:
+        rows = rows.filter(topic_id__in=list(topic_ids))
+    counts = {}
+    for topic_id, language, difficulty, n in rows.values_list('topic_id', 'language', 'difficulty').annotate(
+        n=Sum('count')
+    ).order_by():
+        entry = counts.setdefault(topic_id, {'total': 0, 'by_language': {}, 'by_difficulty': {}})
+        entry['total'] += n
+        entry['by_language'][language] = entry['by_language'].get(language, 0) + n
+        entry['by_difficulty'][difficulty] = entry['by_difficulty'].get(difficulty, 0) + n
+    return counts
@@ -56,6 +56,8 @@ urlpatterns = [
     path('daily-exams/', views.DailyExamListView.as_view(), name='daily-exam-list'),
     path('daily-exams/<int:pk>/submit/', views.SubmitDailyExamView.as_view(), name='submit-daily-exam'),
     path('daily-exams/<int:pk>/leaderboard/', views.DailyExamLeaderboardView.as_view(), name='daily-exam-leaderboard'),
+    path('daily-exams/<int:pk>/stats/', views.DailyExamScoreStatsView.as_view(), name='daily-exam-stats'),
+    path('daily-exams/attempts/<int:pk>/review/', views.DailyExamAttemptReviewView.as_view(), name='daily-exam-attempt-review'),
 
     # path('bulk-upload/',views.BulkUploadView.as_view(), name='bulk_upload'),
     # path('text-upload/', views.TextUploadView.as_view(), name='text_upload'),
@@ -66,6 +68,8 @@ urlpatterns = [
     path('exams/<int:exam_id>/model-exams/', views.ModelExamListView.as_view(), name='model-exam-list'),
     path('model-exams/<int:pk>/', views.ModelExamDetailView.as_view(), name='model-exam-detail'),
     path('model-exams/<int:pk>/submit/', views.SubmitModelExamView.as_view(), name='submit-model-exam'),
+    path('model-exams/<int:pk>/stats/', views.ModelExamScoreStatsView.as_view(), name='model-exam-stats'),
+    path('model-exams/attempts/<int:pk>/review/', views.ModelExamAttemptReviewView.as_view(), name='model-exam-attempt-review'),
 
 
     path('exams/<int:exam_id>/pyq/', views.PYQListView.as_view(), name='pyq-list'),
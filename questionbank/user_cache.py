@@ -0,0 +1,83 @@
+"""
+Versioned per-user cache for the personal dashboard payloads.
+
+Every user has a data version that answer, attempt, progress and profile
+writes bump (see questionbank.signals); a content version covers the shared
+topics, exams and syllabi those payloads are built from. Both are CacheVersion
+rows, so a write handled by one worker process invalidates the payloads every
+other process has cached. Views wrapped with `cache_user_payload` keep their
+rendered payload under the versions and today's date, so a repeat request is
+one indexed version lookup plus one cache get: a 304 when the client's
+If-None-Match still matches, the cached payload otherwise.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache_versions import bump_versions, current_versions
+
+CONTENT_VERSION = 'user_payload_content'
+
+
+def _payload_ttl():
+    return getattr(settings, 'USER_PAYLOAD_CACHE_TTL', 3600)
+
+
+def _user_version(user_id):
+    return f"user_data:{user_id}"
+
+
+def bump_user_data(*user_ids):
+    """Invalidates the cached payloads of `user_ids` after their data changed."""
+    bump_versions(*[_user_version(user_id) for user_id in user_ids])
+
+
+def bump_content():
+    """Invalidates every user's cached payloads after shared content (topics, exams, syllabi) changed."""
+    bump_versions(CONTENT_VERSION)
+
+
+def _matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+
+def cache_user_payload(get):
+    """
+    Decorates a view's get() to serve the authenticated user's payload from the
+    cache and answer conditional requests with 304. Anonymous requests and
+    non-200 responses go straight through.
+    """
+    @wraps(get)
+    def cached_get(view, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return get(view, request, *args, **kwargs)
+
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        payload_key = f"user_payload:{request.user.id}:{type(view).__name__}:{path}"
+        user_version = _user_version(request.user.id)
+        found = current_versions(user_version, CONTENT_VERSION)
+        versions = (found[user_version], found[CONTENT_VERSION], timezone.localdate().isoformat())
+        etag = '"%s"' % hashlib.sha1(f"{payload_key}:{versions}".encode()).hexdigest()
+
+        if _matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            entry = cache.get(payload_key)
+            if entry is not None and entry[0] == versions:
+                response = Response(entry[1])
+            else:
+                response = get(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(payload_key, (versions, response.data), _payload_ttl())
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return cached_get
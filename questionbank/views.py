@@ -19,14 +19,19 @@ from rest_framework_simplejwt.tokens import RefreshToken
 # Local application imports
 from .models import (
     Exam, Topic, Question, Bookmark, Report, UserProfile, 
-    UserAnswer, ExamCategory, ExamSyllabus, UserFeedView
+    UserAnswer, ExamCategory, ExamSyllabus, UserFeedView, SyllabusTopicIndex,
+    UserExamProgress, WeeklyMissionProgress,
 )
+from .user_cache import cache_user_payload
 from .serializers import (
     ExamSerializer, TopicSerializer, QuestionSerializer, QuestionMockSerializer,
     BookmarkSerializer, ReportSerializer, UserSerializer, 
     UserProfileSerializer, UserAnswerSerializer, ExamCategorySerializer,
     QuestionSubmissionSerializer, UserSubmissionSerializer
 )
+from .sampling import sample
+from .exam_graph import related_exams, related_exam_map
+from .syllabus_index import syllabus_topic_ids
 
 # Cross-application imports
 from institutes.models import Message, InstituteJoinRequest
@@ -202,16 +207,7 @@ class TopicListView(generics.ListAPIView):
         if user and user.is_authenticated and hasattr(user, 'userprofile'):
             user_prefs = user.userprofile.preferred_exams.all()
             if user_prefs.exists():
-                q_obj = Q()
-                for exam in user_prefs:
-                    q_obj |= Q(id=exam.id)
-                    words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-                    if words:
-                        sub_q = Q()
-                        for word in words:
-                            sub_q |= Q(name__icontains=word)
-                        q_obj |= sub_q
-                preferred_exams = Exam.objects.filter(q_obj).distinct()
+                preferred_exams = related_exams(user_prefs)
 
         if preferred_exams.exists():
             syllabus_topics = Topic.objects.filter(examsyllabus__exam__in=preferred_exams).distinct()
@@ -265,12 +261,15 @@ class DailyQuestionView(views.APIView):
     def get(self, request):
         user = request.user
         language = request.query_params.get('language')
-        from .engine import QuestionEngine
-        qs = QuestionEngine.get_daily_quiz(user, limit=1, language=language)
-        if not qs.exists():
+        if user.is_authenticated:
+            from .question_queue import pop_questions
+            questions = pop_questions(user, {'language': language}, 1, kind='daily')
+        else:
+            from .engine import QuestionEngine
+            questions = list(QuestionEngine.get_daily_quiz(user, limit=1, language=language))
+        if not questions:
             return Response({'error': 'No questions available'}, status=status.HTTP_404_NOT_FOUND)
-        question = qs.first()
-        return Response(QuestionSerializer(question, context={'request': request}).data)
+        return Response(QuestionSerializer(questions[0], context={'request': request}).data)
 
 
 
@@ -282,8 +281,12 @@ class DailyQuizView(views.APIView):
         limit = request.query_params.get('limit', '10')
         limit_val = int(limit) if limit and limit.isdigit() else 10
         language = request.query_params.get('language')
-        from .engine import QuestionEngine
-        qs = QuestionEngine.get_daily_quiz(user, limit=limit_val, language=language)
+        if user.is_authenticated:
+            from .question_queue import pop_questions
+            qs = pop_questions(user, {'language': language}, limit_val, kind='daily')
+        else:
+            from .engine import QuestionEngine
+            qs = QuestionEngine.get_daily_quiz(user, limit=limit_val, language=language)
         serializer = QuestionSerializer(qs, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -304,10 +307,10 @@ class WeeklyCurrentAffairsQuizView(views.APIView):
             publication_date__gte=cutoff
         ).values_list('title', flat=True)
         # Match Questions in the topic whose text matches recent current affairs titles
-        qs = Question.objects.filter(topic=topic, text__in=recent_ca_titles).order_by('?')[:15]
+        qs = sample(Question.objects.filter(topic=topic, text__in=recent_ca_titles), 15)
         if qs.count() < 5:
             # Fallback: return random questions from the Daily Current Affairs topic
-            qs = Question.objects.filter(topic=topic).order_by('?')[:15]
+            qs = sample(Question.objects.filter(topic=topic), 15)
         serializer = QuestionSerializer(qs, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -333,122 +336,34 @@ class WeakAreaQuestionsView(generics.ListAPIView):
 # ===================================================================
 
 class GenerateMockExamView(views.APIView):
-    """Generates a full mock exam based on the ExamSyllabus, padded to exactly 100 questions."""
+    """
+    Generates a full mock exam based on the ExamSyllabus, padded to exactly 100 questions.
+    GET builds a fresh paper on every request, padded with questions the user has not
+    answered, and writes nothing; POST takes a pre-generated pool paper instead,
+    marking it as served to the user.
+    """
     permission_classes = [IsAuthenticated]
     def get(self, request, exam_id):
         exam = get_object_or_404(Exam, pk=exam_id)
-        syllabus_parts = exam.syllabus_parts.all()
-        language = request.query_params.get('language')
-        
-        # Find similar exams if direct syllabus doesn't exist
-        words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-        similar_exams = Exam.objects.filter(id=exam.id)
-        if words:
-            q_obj = Q()
-            for word in words:
-                q_obj |= Q(name__icontains=word)
-            similar_exams = Exam.objects.filter(q_obj)
-
-        # Check static master syllabus database first
-        from .syllabus_db import resolve_exam_slug, SYLLABUS_DATABASE
-        slug_key = resolve_exam_slug(exam.slug)
-        static_syllabus = None
-        if slug_key and slug_key in SYLLABUS_DATABASE:
-            static_syllabus = SYLLABUS_DATABASE[slug_key]['syllabus']
-
-        topic_num_questions = {}
-        if static_syllabus:
-            for item in static_syllabus:
-                t_name = item['topic']
-                marks = item['marks']
-                topic_obj = Topic.objects.filter(name__iexact=t_name).first()
-                if not topic_obj:
-                    topic_obj = Topic.objects.filter(name__icontains=t_name).first()
-                if not topic_obj:
-                    from django.utils.text import slugify
-                    topic_obj = Topic.objects.create(name=t_name, slug=slugify(t_name))
-                topic_num_questions[topic_obj.id] = marks
-        else:
-            if not syllabus_parts.exists():
-                syllabus_parts = ExamSyllabus.objects.filter(exam__in=similar_exams)
-                
-            for part in syllabus_parts:
-                topic_num_questions[part.topic_id] = max(
-                    topic_num_questions.get(part.topic_id, 0),
-                    part.num_questions
-                )
-            
-        all_questions = []
-        seen_ids = set()
-        
-        # 1. Primary: Load questions according to syllabus topic weightage
-        for topic_id, num_qs in topic_num_questions.items():
-            if num_qs <= 0:
-                continue
-            q_filter = Q(topic_id=topic_id)
-            if language:
-                q_filter &= Q(language=language)
-            
-            # Prefer questions linked to this or similar exams
-            exam_q_filter = q_filter & Q(exams__in=similar_exams)
-            questions = list(Question.objects.filter(exam_q_filter).order_by('?')[:num_qs])
-            
-            # Fall back to general questions under this topic if there is a deficit
-            if len(questions) < num_qs:
-                fallback_qs = list(Question.objects.filter(q_filter).exclude(id__in=[q.id for q in questions]).order_by('?')[:num_qs - len(questions)])
-                questions.extend(fallback_qs)
-                
-            for q in questions:
-                if q.id not in seen_ids:
-                    all_questions.append(q)
-                    seen_ids.add(q.id)
-                    
-        # 2. Pad to exactly 100 if we have a deficit
-        # Level 1 padding: Get more questions from the syllabus topics
-        if len(all_questions) < 100:
-            topic_ids = list(topic_num_questions.keys())
-            if topic_ids:
-                q_filter = Q(topic_id__in=topic_ids)
-                if language:
-                    q_filter &= Q(language=language)
-                additional_qs = list(Question.objects.filter(q_filter).exclude(id__in=seen_ids).order_by('?')[:100 - len(all_questions)])
-                for q in additional_qs:
-                    if q.id not in seen_ids:
-                        all_questions.append(q)
-                        seen_ids.add(q.id)
-                        
-        # Level 2 padding: Get questions associated with this exam or similar exams
-        if len(all_questions) < 100:
-            q_filter = Q(exams__in=similar_exams)
-            if language:
-                q_filter &= Q(language=language)
-            exam_qs = list(Question.objects.filter(q_filter).exclude(id__in=seen_ids).order_by('?')[:100 - len(all_questions)])
-            for q in exam_qs:
-                if q.id not in seen_ids:
-                    all_questions.append(q)
-                    seen_ids.add(q.id)
-                    
-        # Level 3 padding: Get any general/active questions in the database
-        if len(all_questions) < 100:
-            q_filter = Q()
-            if language:
-                q_filter &= Q(language=language)
-            any_qs = list(Question.objects.filter(q_filter).exclude(id__in=seen_ids).order_by('?')[:100 - len(all_questions)])
-            for q in any_qs:
-                if q.id not in seen_ids:
-                    all_questions.append(q)
-                    seen_ids.add(q.id)
-                    
-        # If we somehow exceeded 100 questions (due to weightage sum), slice it down
-        if len(all_questions) > 100:
-            all_questions = all_questions[:100]
-            
-        shuffle(all_questions)
-        response_data = {
+        from .mock_exam import generate_mock_exam
+        questions = generate_mock_exam(exam, language=request.query_params.get('language'), user=request.user)
+        return Response(self.paper_data(exam, questions))
+
+    def post(self, request, exam_id):
+        exam = get_object_or_404(Exam, pk=exam_id)
+        language = request.data.get('language') or request.query_params.get('language')
+
+        # Served from the pre-generated paper pool; built live from the exam's blueprint only when it is empty
+        from .mock_exam import take_mock_exam
+        questions = take_mock_exam(exam, request.user, language=language)
+        return Response(self.paper_data(exam, questions))
+
+    @staticmethod
+    def paper_data(exam, questions):
+        return {
             'exam_name': exam.name, 'duration_minutes': exam.duration_minutes,
-            'questions': QuestionMockSerializer(all_questions, many=True).data
+            'questions': QuestionMockSerializer(questions, many=True).data
         }
-        return Response(response_data)
 
 
 class SubmitAnswerView(generics.CreateAPIView):
@@ -463,12 +378,24 @@ class SubmitAnswerView(generics.CreateAPIView):
         question = serializer.validated_data['question']
         selected_option = serializer.validated_data['selected_option']
         is_correct = (selected_option == question.correct_answer)
+
+        from .answer_events import XP_CORRECT, XP_WRONG, append_answer_event, log_enabled
+        if log_enabled():
+            # Logged and acknowledged; progress, XP and streak are applied by the event consumers
+            event = append_answer_event(request.user, question, selected_option)
+            response_data = serializer.data
+            response_data.update({
+                'is_correct': is_correct,
+                'event_id': event.id,
+                'gamification': {'xp_earned': XP_CORRECT if is_correct else XP_WRONG, 'pending': True},
+            })
+            return Response(response_data, status=status.HTTP_202_ACCEPTED)
         
         serializer.save(user=request.user, is_correct=is_correct)
         
         # Award XP and update streak
         from questionbank.gamification import award_xp, update_streak
-        xp_earned = 10 if is_correct else 2
+        xp_earned = XP_CORRECT if is_correct else XP_WRONG
         _, level_up, new_level = award_xp(request.user, xp_earned)
         current_streak, longest_streak, freeze_used, streak_promo_awarded = update_streak(request.user)
         
@@ -501,38 +428,26 @@ class SubmitExamView(views.APIView):
         if not all_question_ids:
             raise ValidationError("A list of question IDs is required from the frontend.")
 
-        questions = Question.objects.filter(id__in=all_question_ids)
-        questions_map = {str(q.id): q for q in questions}
-        
-        user_answers_to_create = []
-        correct_count = 0
-        wrong_count = 0
+        questions = Question.objects.filter(id__in=all_question_ids).select_related('topic').prefetch_related('exams')
 
-        for q_id, selected_ans in answers_data.items():
-            question = questions_map.get(str(q_id))
-            if not question: continue
-
-            is_correct = (selected_ans == question.correct_answer)
-            if is_correct:
-                correct_count += 1
-            else:
-                wrong_count += 1
-            
-            user_answers_to_create.append(
-                UserAnswer(user=request.user, question=question, selected_option=selected_ans, is_correct=is_correct)
-            )
+        from .answer_keys import question_set_key
+        from .grading import award_submission, record_answers
+        answered = {str(q_id) for q_id in answers_data}
+        graded = [
+            entry for entry in question_set_key(all_question_ids).grade(answers_data)
+            if str(entry[0].id) in answered
+        ]
+        record_answers(request.user, graded)
 
-        UserAnswer.objects.bulk_create(user_answers_to_create, ignore_conflicts=True)
-        
+        correct_count = sum(1 for _, _, is_correct in graded if is_correct)
+        wrong_count = len(graded) - correct_count
         total_answered = len(answers_data)
         unanswered_count = len(all_question_ids) - total_answered
         final_score = (correct_count * 1) - (wrong_count * 0.33)
 
         # Award XP and update streak
-        from questionbank.gamification import award_xp, update_streak
         xp_earned = (correct_count * 10) + (wrong_count * 2) + 50
-        _, level_up, new_level = award_xp(request.user, xp_earned)
-        current_streak, longest_streak, freeze_used, streak_promo_awarded = update_streak(request.user)
+        gamification = award_submission(request.user, xp_earned)
 
         response_data = {
             'results': {
@@ -543,15 +458,7 @@ class SubmitExamView(views.APIView):
                 'unanswered': unanswered_count,
             },
             'questions': QuestionSerializer(questions, many=True).data,
-            'gamification': {
-                'xp_earned': xp_earned,
-                'level_up': level_up,
-                'new_level': new_level,
-                'current_streak': current_streak,
-                'longest_streak': longest_streak,
-                'freeze_used': freeze_used,
-                'streak_promo_awarded': streak_promo_awarded
-            }
+            'gamification': gamification,
         }
 
         return Response(response_data, status=status.HTTP_200_OK)
@@ -572,6 +479,7 @@ class MyProgressDashboardView(views.APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @cache_user_payload
     def get(self, request):
         user = request.user
         profile = user.userprofile
@@ -604,18 +512,35 @@ class MyProgressDashboardView(views.APIView):
             
             report_title = f"Focus Report: {', '.join([exam.name for exam in focus_exams])}"
             # Filter answers to only include questions from the user's focus exams
-            answers_to_process = all_answers.filter(question__exams__in=focus_exams).distinct()
+            from .exam_membership import in_exams
+            answers_to_process = all_answers.filter(in_exams([exam.id for exam in focus_exams], 'question_id'))
         
         # --- Common badges helper ---
         import datetime
         from django.utils import timezone
         
-        total_answered = answers_to_process.count()
-        correct_count = answers_to_process.filter(is_correct=True).count()
+        # Every figure below comes from the per-day rollups (see questionbank.daily_stats)
+        # and the activity calendar (see questionbank.activity)
+        from .activity import activity_summary, activity_years, daily_counts
+        from .daily_stats import user_day_counts
+        day_counts = user_day_counts(user.id)
+        focus_exam_ids = None
+        if mode == 'focus':
+            focus_exam_ids = {str(exam.id) for exam in focus_exams}
+            day_counts = {
+                key: counts for key, counts in day_counts.items()
+                if focus_exam_ids.intersection(key[2].split(','))
+            }
+
+        total_answered = sum(answered for answered, _ in day_counts.values())
+        correct_count = sum(correct for _, correct in day_counts.values())
         wrong_count = total_answered - correct_count
         net_marks = (correct_count * 1) - (wrong_count * 0.33)
         accuracy = (correct_count * 100.0 / total_answered) if total_answered > 0 else 0
         
+        activity_calendar = activity_years(user.id)
+        activity = activity_summary(user.id, loaded=activity_calendar)
+
         # Generate badges
         badges = [
             {
@@ -681,10 +606,26 @@ class MyProgressDashboardView(views.APIView):
                 'category': 'volume',
                 'earned': total_answered >= 1000,
                 'icon': '🌟'
+            },
+            {
+                'id': 'active_days_30',
+                'name': '30 Study Days',
+                'description': 'Studied on 30 different days',
+                'category': 'consistency',
+                'earned': activity['active_days'] >= 30,
+                'icon': '📅'
+            },
+            {
+                'id': 'active_days_100',
+                'name': '100 Study Days',
+                'description': 'Studied on 100 different days',
+                'category': 'consistency',
+                'earned': activity['active_days'] >= 100,
+                'icon': '🗓️'
             }
         ]
 
-        if not answers_to_process.exists():
+        if not total_answered:
             return Response({
                 'report_title': report_title,
                 'overall_stats': {
@@ -706,42 +647,56 @@ class MyProgressDashboardView(views.APIView):
             })
             
         # --- 1. Calculate Performance by Topic ---
-        topic_performance = answers_to_process.values(
-            'question__topic__name', 
-            'question__topic__id'
-        ).annotate(
-            total=Count('id'),
-            correct=Count(Case(When(is_correct=True, then=1)))
-        ).annotate(
-            wrong=F('total') - F('correct'),
-            accuracy=Cast('correct', FloatField()) * 100.0 / F('total'),
-            marks_lost=(F('wrong') * 1.33)
-        )
+        by_topic, by_exam = {}, {}
+        for (_, topic_id, exam_ids), (answered, correct) in day_counts.items():
+            entry = by_topic.setdefault(topic_id, [0, 0])
+            entry[0] += answered
+            entry[1] += correct
+            # An answer counts towards every (focus) exam of its question, or towards "no exam"
+            exam_keys = [int(exam_id) for exam_id in exam_ids.split(',') if exam_id] or [None]
+            for exam_id in exam_keys:
+                if focus_exam_ids is None or str(exam_id) in focus_exam_ids:
+                    entry = by_exam.setdefault(exam_id, [0, 0])
+                    entry[0] += answered
+                    entry[1] += correct
+
+        topic_names = dict(Topic.objects.filter(id__in=list(by_topic)).values_list('id', 'name'))
+        topic_performance = []
+        for topic_id, (total, correct) in by_topic.items():
+            wrong = total - correct
+            topic_performance.append({
+                'question__topic__name': topic_names.get(topic_id),
+                'question__topic__id': topic_id,
+                'total': total,
+                'correct': correct,
+                'wrong': wrong,
+                'accuracy': correct * 100.0 / total,
+                'marks_lost': wrong * 1.33,
+            })
+        topic_performance.sort(key=lambda row: -row['accuracy'])
 
         # --- 2. Calculate Performance by Exam ---
-        exam_performance = answers_to_process.values(
-            'question__exams__name' # Query through the M2M relationship
-        ).annotate(
-            total=Count('id'),
-            correct=Count(Case(When(is_correct=True, then=1)))
-        ).annotate(
-            accuracy=Cast('correct', FloatField()) * 100.0 / F('total')
+        exam_names = dict(Exam.objects.filter(id__in=[e for e in by_exam if e]).values_list('id', 'name'))
+        exam_totals = {}
+        for exam_id, (total, correct) in by_exam.items():
+            entry = exam_totals.setdefault(exam_names.get(exam_id), [0, 0])
+            entry[0] += total
+            entry[1] += correct
+        exam_performance = sorted(
+            (
+                {'question__exams__name': name, 'total': total, 'correct': correct, 'accuracy': correct * 100.0 / total}
+                for name, (total, correct) in exam_totals.items()
+            ),
+            key=lambda row: -row['accuracy'],
         )
         
         # --- 4. Get Recent Answer History ---
-        recent_answers = answers_to_process.order_by('-answered_at')[:50]
+        recent_answers = answers_to_process.order_by('-answered_at').prefetch_related('question__exams')[:50]
 
         # --- 5. Generate Heatmap data for last 30 days ---
+        # Activity counts every answer and feed card read, not only those of the focus exams
         today = timezone.localdate()
-        thirty_days_ago = today - datetime.timedelta(days=30)
-        daily_activity_qs = UserAnswer.objects.filter(
-            user=user, 
-            answered_at__date__gte=thirty_days_ago
-        ).values('answered_at__date').annotate(count=Count('id')).order_by('answered_at__date')
-        
-        heatmap_dict = { (thirty_days_ago + datetime.timedelta(days=i)): 0 for i in range(31) }
-        for entry in daily_activity_qs:
-            heatmap_dict[entry['answered_at__date']] = entry['count']
+        heatmap_dict = daily_counts(user.id, today - datetime.timedelta(days=30), today, loaded=activity_calendar)
             
         heatmap_data = [
             {'date': dt.strftime('%Y-%m-%d'), 'count': count}
@@ -758,10 +713,12 @@ class MyProgressDashboardView(views.APIView):
                 'accuracy': round(accuracy, 2),
                 'net_marks': round(net_marks, 2)
             },
-            'topic_performance': list(topic_performance.order_by('-accuracy')),
-            'exam_performance': list(exam_performance.order_by('-accuracy')),
-            'strongest_topics': list(topic_performance.order_by('-accuracy')[:3]),
-            'weakest_topics': list(topic_performance.filter(wrong__gt=0).order_by('-marks_lost')[:3]),
+            'topic_performance': topic_performance,
+            'exam_performance': exam_performance,
+            'strongest_topics': topic_performance[:3],
+            'weakest_topics': sorted(
+                (row for row in topic_performance if row['wrong'] > 0), key=lambda row: -row['marks_lost']
+            )[:3],
             'answer_history': DetailedUserAnswerSerializer(recent_answers, many=True).data,
             'heatmap_data': heatmap_data,
             'badges': badges
@@ -916,37 +873,33 @@ class SubmitDailyExamView(APIView):
             answers = serializer.validated_data['answers']
             time_taken = serializer.validated_data['time_taken']
             
-            correct_count = 0
-            questions = daily_exam.questions.all()
-            for q in questions:
-                if str(q.id) in answers and answers[str(q.id)] == q.correct_answer:
-                    correct_count += 1
-            
-            score = (correct_count / questions.count()) * 100 if questions.count() > 0 else 0
-
-            DailyExamAttempt.objects.create(
-                user=request.user, daily_exam=daily_exam, score=score, time_taken=time_taken
+            from .answer_keys import daily_exam_key
+            from .response_sheet import ResponseSheet
+            from .grading import award_submission, percentage_score, record_answers
+            answer_key = daily_exam_key(daily_exam.pk)
+            graded = answer_key.grade(answers)
+            record_answers(request.user, graded)
+            correct_count = sum(1 for _, _, is_correct in graded if is_correct)
+
+            score = percentage_score(graded)
+
+            attempt = DailyExamAttempt.objects.create(
+                user=request.user, daily_exam=daily_exam, score=score, time_taken=time_taken,
+                responses=ResponseSheet.from_answer_key(
+                    answer_key, answers, serializer.validated_data['question_times']
+                ).to_bytes(),
             )
 
             # Award XP and update streak
-            from questionbank.gamification import award_xp, update_streak
             xp_earned = (correct_count * 10) + 50
-            _, level_up, new_level = award_xp(request.user, xp_earned)
-            current_streak, longest_streak, freeze_used, streak_promo_awarded = update_streak(request.user)
+            gamification = award_submission(request.user, xp_earned)
 
             return Response({
                 'score': score, 
                 'correct_count': correct_count, 
-                'total_questions': questions.count(),
-                'gamification': {
-                    'xp_earned': xp_earned,
-                    'level_up': level_up,
-                    'new_level': new_level,
-                    'current_streak': current_streak,
-                    'longest_streak': longest_streak,
-                    'freeze_used': freeze_used,
-                    'streak_promo_awarded': streak_promo_awarded
-                }
+                'total_questions': len(answer_key),
+                'standing': attempt_standing(attempt),
+                'gamification': gamification,
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -977,13 +930,7 @@ class ModelExamListView(generics.ListAPIView):
     def get_queryset(self):
         exam_id = self.kwargs['exam_id']
         exam = get_object_or_404(Exam, pk=exam_id)
-        words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-        similar_exams = Exam.objects.filter(id=exam.id)
-        if words:
-            q_obj = Q()
-            for word in words:
-                q_obj |= Q(name__icontains=word)
-            similar_exams = Exam.objects.filter(q_obj)
+        similar_exams = related_exams(exam)
         return ModelExam.objects.filter(exam__in=similar_exams)
 
 class MockTestsListView(generics.ListAPIView):
@@ -1044,50 +991,130 @@ class SubmitModelExamView(APIView):
             answers = serializer.validated_data['answers']
             time_taken = serializer.validated_data.get('time_taken', 0)
             
-            correct_count = 0
-            questions = model_exam.questions.all()
-            total_questions = questions.count()
-
-            # --- This loop correctly calculates the score ---
-            for question in questions:
-                question_id_str = str(question.id)
-                if question_id_str in answers and answers[question_id_str] == question.correct_answer:
-                    correct_count += 1
+            from .answer_keys import model_exam_key
+            from .response_sheet import ResponseSheet
+            from .grading import award_submission, percentage_score, record_answers
+            answer_key = model_exam_key(model_exam.pk)
+            total_questions = len(answer_key)
+
+            graded = answer_key.grade(answers)
+            record_answers(request.user, graded)
+            correct_count = sum(1 for _, _, is_correct in graded if is_correct)
             
-            score = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+            score = percentage_score(graded)
 
             # --- CORRECTED: Always create a new attempt for each submission ---
-            ModelExamAttempt.objects.create(
+            attempt = ModelExamAttempt.objects.create(
                 user=request.user, 
                 model_exam=model_exam, 
                 score=score, 
-                time_taken=time_taken
+                time_taken=time_taken,
+                responses=ResponseSheet.from_answer_key(
+                    answer_key, answers, serializer.validated_data['question_times']
+                ).to_bytes(),
             )
 
             # Award XP and update streak
-            from questionbank.gamification import award_xp, update_streak
             xp_earned = (correct_count * 10) + 50
-            _, level_up, new_level = award_xp(request.user, xp_earned)
-            current_streak, longest_streak, freeze_used, streak_promo_awarded = update_streak(request.user)
+            gamification = award_submission(request.user, xp_earned)
             
             return Response({
                 'score': score, 
                 'correct_count': correct_count, 
                 'total_questions': total_questions,
-                'gamification': {
-                    'xp_earned': xp_earned,
-                    'level_up': level_up,
-                    'new_level': new_level,
-                    'current_streak': current_streak,
-                    'longest_streak': longest_streak,
-                    'freeze_used': freeze_used,
-                    'streak_promo_awarded': streak_promo_awarded
-                }
+                'standing': attempt_standing(attempt),
+                'gamification': gamification,
             }, status=status.HTTP_200_OK)
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AttemptReviewView(APIView):
+    """
+    Question-by-question review of one of the user's exam attempts, decoded from
+    the attempt's response sheet. Subclasses set `attempt_model`.
+    """
+    permission_classes = [IsAuthenticated]
+    attempt_model = None
+
+    def get(self, request, pk):
+        from .response_sheet import ResponseSheet
+        attempt = get_object_or_404(self.attempt_model, pk=pk, user=request.user)
+        sheet = ResponseSheet.from_bytes(attempt.responses)
+        questions = Question.objects.in_bulk(list(sheet.question_ids))
+        results = []
+        for question_id, selected, seconds in sheet:
+            question = questions.get(question_id)
+            if question is None:
+                continue
+            results.append({
+                'question': QuestionResultSerializer(question, context={'request': request}).data,
+                'selected_option': selected,
+                'is_correct': bool(selected) and selected == question.correct_answer,
+                'time_spent_secs': seconds,
+            })
+        return Response({
+            'score': attempt.score,
+            'time_taken': attempt.time_taken,
+            'submitted_at': attempt.submitted_at,
+            'results': results,
+        })
+
+
+def attempt_standing(attempt):
+    """Percentile and rank of a just-saved attempt among its paper's attempts."""
+    from .score_histogram import PAPERS, get_histogram, standing
+    paper_type, paper_field = PAPERS[type(attempt)]
+    return standing(get_histogram(paper_type, getattr(attempt, paper_field)), attempt.score)
+
+
+class ExamScoreStatsView(APIView):
+    """
+    Cohort statistics of one model or daily exam from its score histogram: the
+    score and time distribution, plus the percentile and rank of `?score=` or,
+    without it, of the user's latest attempt. Subclasses set `attempt_model`.
+    """
+    permission_classes = [IsAuthenticated]
+    attempt_model = None
+
+    def get(self, request, pk):
+        from .score_histogram import PAPERS, distribution, get_histogram, standing
+        paper_type, paper_field = PAPERS[self.attempt_model]
+        histogram = get_histogram(paper_type, pk)
+
+        score = request.query_params.get('score')
+        if score is not None:
+            try:
+                score = float(score)
+            except ValueError:
+                raise ValidationError({'score': 'Must be a number.'})
+        else:
+            score = self.attempt_model.objects.filter(
+                user=request.user, **{paper_field: pk}
+            ).order_by('-submitted_at').values_list('score', flat=True).first()
+
+        data = {'attempts': histogram.attempts, 'distribution': distribution(histogram), 'score': score}
+        if score is not None:
+            data.update(standing(histogram, score))
+        return Response(data)
+
+
+class ModelExamScoreStatsView(ExamScoreStatsView):
+    attempt_model = ModelExamAttempt
+
+
+class DailyExamScoreStatsView(ExamScoreStatsView):
+    attempt_model = DailyExamAttempt
+
+
+class ModelExamAttemptReviewView(AttemptReviewView):
+    attempt_model = ModelExamAttempt
+
+
+class DailyExamAttemptReviewView(AttemptReviewView):
+    attempt_model = DailyExamAttempt
+
+
 # In questionbank/views.py
 from .models import PreviousYearPaper
 from .serializers import PreviousYearPaperSerializer
@@ -1100,13 +1127,7 @@ class PYQListView(generics.ListAPIView):
         # Returns all PYQ papers for a specific main exam
         exam_id = self.kwargs['exam_id']
         exam = get_object_or_404(Exam, pk=exam_id)
-        words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-        similar_exams = Exam.objects.filter(id=exam.id)
-        if words:
-            q_obj = Q()
-            for word in words:
-                q_obj |= Q(name__icontains=word)
-            similar_exams = Exam.objects.filter(q_obj)
+        similar_exams = related_exams(exam)
         return PreviousYearPaper.objects.filter(exam__in=similar_exams)
 
 
@@ -1133,7 +1154,7 @@ class ExamSyllabusListView(generics.ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return Syllabus.objects.all()
+        return Syllabus.objects.select_related('exam').prefetch_related('exam__syllabus_parts__topic')
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -1144,8 +1165,25 @@ class ExamSyllabusListView(generics.ListAPIView):
         from .models import Exam, ExamSyllabus
         from django.db.models import Q, Count
         
-        exams_with_syllabus = set(Syllabus.objects.values_list('exam_id', flat=True))
+        syllabus_by_exam = {}
+        for syllabus in Syllabus.objects.order_by('-pk'):
+            syllabus_by_exam[syllabus.exam_id] = syllabus
+        exams_with_syllabus = set(syllabus_by_exam)
+        exam_graph = related_exam_map()
         exams = Exam.objects.all()
+
+        # Load syllabus parts and question counts for every exam up front instead of per exam
+        parts_by_exam = {}
+        for part in ExamSyllabus.objects.select_related('topic').order_by('pk'):
+            parts_by_exam.setdefault(part.exam_id, []).append(part)
+        question_counts_by_exam = {}
+        for row in (
+            Question.exams.through.objects
+            .values('exam_id', 'question__topic__name')
+            .annotate(count=Count('id'))
+        ):
+            topic_counts = question_counts_by_exam.setdefault(row['exam_id'], {})
+            topic_counts[row['question__topic__name']] = row['count']
         
         for exam in exams:
             # If a direct Syllabus object exists, it is already serialized in `data`
@@ -1153,14 +1191,11 @@ class ExamSyllabusListView(generics.ListAPIView):
                 continue
                 
             # Check for similar exams to inherit syllabus details if they exist
-            words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
+            similar_exams_ids = sorted(exam_graph.get(exam.id, {exam.id}))
             similar_syllabus = None
-            if words:
-                q_obj = Q()
-                for word in words:
-                    q_obj |= Q(name__icontains=word)
-                similar_exams = Exam.objects.filter(q_obj)
-                similar_syllabus = Syllabus.objects.filter(exam__in=similar_exams).first()
+            candidates = [syllabus_by_exam[eid] for eid in similar_exams_ids if eid in syllabus_by_exam]
+            if candidates:
+                similar_syllabus = min(candidates, key=lambda syllabus: syllabus.pk)
                 
             # If we found a similar syllabus, inherit it
             if similar_syllabus:
@@ -1169,7 +1204,7 @@ class ExamSyllabusListView(generics.ListAPIView):
                     pdf_url = request.build_absolute_uri(similar_syllabus.pdf_file.url)
                     
                 # Calculate weights for this specific exam if it has syllabus parts
-                parts = exam.syllabus_parts.all()
+                parts = parts_by_exam.get(exam.id, [])
                 total_qs = sum(p.num_questions for p in parts)
                 weights = []
                 if total_qs > 0:
@@ -1194,15 +1229,8 @@ class ExamSyllabusListView(generics.ListAPIView):
                 continue
                 
             # Try Option 2: Auto-generate from ExamSyllabus parts of this or similar exams
-            similar_exams_ids = [exam.id]
-            if words:
-                q_obj = Q()
-                for word in words:
-                    q_obj |= Q(name__icontains=word)
-                similar_exams_ids = list(Exam.objects.filter(q_obj).values_list('id', flat=True))
-                
-            parts = ExamSyllabus.objects.filter(exam_id__in=similar_exams_ids)
-            if parts.exists():
+            parts = [part for eid in similar_exams_ids for part in parts_by_exam.get(eid, [])]
+            if parts:
                 topics_desc = []
                 total_qs = 0
                 for part in parts:
@@ -1247,7 +1275,7 @@ class ExamSyllabusListView(generics.ListAPIView):
                     details += "\n".join(sorted(list(set(topics_desc))))
                 
                 # Specific weights for this exam
-                exam_parts = exam.syllabus_parts.all()
+                exam_parts = parts_by_exam.get(exam.id, [])
                 exam_total_qs = sum(p.num_questions for p in exam_parts)
                 weights = []
                 if exam_total_qs > 0:
@@ -1281,16 +1309,16 @@ class ExamSyllabusListView(generics.ListAPIView):
                 continue
 
             # Try Option 3: Auto-generate from the actual questions associated with this/similar exams
-            similar_exams_qs = Exam.objects.filter(id__in=similar_exams_ids)
-            exam_questions = Question.objects.filter(exams__in=similar_exams_qs)
-            if exam_questions.exists():
-                topic_counts = exam_questions.values('topic__name').annotate(count=Count('id')).order_by('-count')
-                total_qs = exam_questions.count()
+            topic_counts = {}
+            for eid in similar_exams_ids:
+                for topic_name, count in question_counts_by_exam.get(eid, {}).items():
+                    topic_counts[topic_name] = topic_counts.get(topic_name, 0) + count
+            if topic_counts:
+                total_qs = sum(topic_counts.values())
                 
                 consolidated = {}
-                for entry in topic_counts:
-                    topic_name = entry['topic__name'] or "General Topics"
-                    count = entry['count']
+                for topic_name, count in sorted(topic_counts.items(), key=lambda item: -item[1]):
+                    topic_name = topic_name or "General Topics"
                     subject = get_consolidated_subject(topic_name)
                     consolidated[subject] = consolidated.get(subject, 0) + count
                     
@@ -1598,7 +1626,7 @@ def seed_feed_cards():
             if q_id:
                 existing_q_ids.append(q_id)
                 
-    questions = Question.objects.exclude(id__in=existing_q_ids).order_by('?')[:15]
+    questions = sample(Question.objects.exclude(id__in=existing_q_ids), 15)
     for q in questions:
         content = {
             'question_id': q.id,
@@ -1622,7 +1650,7 @@ def seed_feed_cards():
             if ca_id:
                 existing_ca_ids.append(ca_id)
                 
-    ca_items = CurrentAffairs.objects.exclude(id__in=existing_ca_ids).order_by('?')[:10]
+    ca_items = sample(CurrentAffairs.objects.exclude(id__in=existing_ca_ids), 10)
     for ca in ca_items:
         content = {
             'ca_id': ca.id,
@@ -1691,18 +1719,18 @@ class StudyFeedView(views.APIView):
                 
         # 4. Get available cards (exclude what they saw today)
         viewed_ids = UserFeedView.objects.filter(user=request.user, viewed_date=today).values_list('card_id', flat=True)
-        available_cards = list(StudyFeedCard.objects.exclude(id__in=viewed_ids).order_by('?')[:10])
+        available_cards = list(sample(StudyFeedCard.objects.exclude(id__in=viewed_ids), 10))
         
         # If no more cards in DB, we can re-use cards
         if not available_cards:
-            available_cards = list(StudyFeedCard.objects.order_by('?')[:10])
+            available_cards = list(sample(StudyFeedCard.objects.all(), 10))
             
         # 5. Inject Quiz Card every 5 cards
         final_cards = []
         for i, card in enumerate(available_cards):
             final_cards.append(StudyFeedCardSerializer(card).data)
             if (i + 1) % 5 == 0:
-                random_q = Question.objects.all().order_by('?').first()
+                random_q = sample(Question.objects.all(), 1).first()
                 if random_q:
                     final_cards.append({
                         'id': f"quiz-injected-{random_q.id}",
@@ -1910,77 +1938,15 @@ class WrongAnswersView(generics.ListAPIView):
 class WeeklyGoalsView(views.APIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_user_payload
     def get(self, request):
         user = request.user
         profile, _ = UserProfile.objects.get_or_create(user=user)
         
-        # Calculate weekly stats: Monday 00:00 to now
-        import datetime
-        from django.utils import timezone
-        
-        now = timezone.now()
-        start_of_week = now - datetime.timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # 1. Answer 50 questions
-        questions_answered = UserAnswer.objects.filter(user=user, answered_at__gte=start_of_week).count()
-        
-        # 2. Complete 2 mock tests
-        mock_tests_completed = ModelExamAttempt.objects.filter(user=user, submitted_at__gte=start_of_week).count()
-        
-        # 3. Read 10 current affairs
-        ca_read = UserFeedView.objects.filter(user=user, card__card_type='current_affairs', viewed_date__gte=start_of_week.date()).count()
-        
-        # 4. Review wrong answers
-        wrong_count = UserAnswer.objects.filter(user=user, is_correct=False).count()
-        # count how many wrong answers corrected/answered correct this week
-        wrong_reviewed = UserAnswer.objects.filter(user=user, answered_at__gte=start_of_week, is_correct=True, question__user_answers__user=user, question__user_answers__is_correct=False).distinct().count()
-        
-        # 5. Maintain streak
-        streak = profile.current_streak
-        
-        missions = [
-            {
-                'id': 'questions_50',
-                'text': 'Answer 50 questions',
-                'progress': min(questions_answered, 50),
-                'target': 50,
-                'xp_reward': 100,
-                'completed': questions_answered >= 50
-            },
-            {
-                'id': 'mock_tests_2',
-                'text': 'Complete 2 mock tests',
-                'progress': min(mock_tests_completed, 2),
-                'target': 2,
-                'xp_reward': 150,
-                'completed': mock_tests_completed >= 2
-            },
-            {
-                'id': 'current_affairs_10',
-                'text': 'Read 10 current affairs',
-                'progress': min(ca_read, 10),
-                'target': 10,
-                'xp_reward': 75,
-                'completed': ca_read >= 10
-            },
-            {
-                'id': 'review_wrong',
-                'text': 'Review wrong answers (Answer 5 previously wrong)',
-                'progress': min(wrong_reviewed, 5) if wrong_count > 0 else 5,
-                'target': 5,
-                'xp_reward': 50,
-                'completed': wrong_reviewed >= 5 if wrong_count > 0 else True
-            },
-            {
-                'id': 'streak_7',
-                'text': 'Maintain 7-day streak',
-                'progress': min(streak, 7),
-                'target': 7,
-                'xp_reward': 200,
-                'completed': streak >= 7
-            }
-        ]
+        # Counters are kept up to date as answers, mock tests and feed reads come in
+        from .weekly_missions import weekly_missions
+        progress = WeeklyMissionProgress.objects.filter(user=user).first()
+        missions = weekly_missions(progress, profile.current_streak)
         
         return Response({
             'missions': missions,
@@ -2021,35 +1987,14 @@ class TopicListView(generics.ListAPIView):
         if user and user.is_authenticated and hasattr(user, 'userprofile'):
             user_prefs = user.userprofile.preferred_exams.all()
             if user_prefs.exists():
-                q_obj = Q()
-                for exam in user_prefs:
-                    q_obj |= Q(id=exam.id)
-                    words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-                    if words:
-                        sub_q = Q()
-                        for word in words:
-                            sub_q |= Q(name__icontains=word)
-                        q_obj |= sub_q
-                preferred_exams = Exam.objects.filter(q_obj).distinct()
+                preferred_exams = related_exams(user_prefs)
 
         if preferred_exams.exists():
-            from .syllabus_db import resolve_exam_slug, SYLLABUS_DATABASE
-            allowed_topics = set()
-            for exam in preferred_exams:
-                slug_key = resolve_exam_slug(exam.slug)
-                if slug_key and slug_key in SYLLABUS_DATABASE:
-                    for item in SYLLABUS_DATABASE[slug_key]['syllabus']:
-                        allowed_topics.add(item['topic'].lower())
-            
-            if allowed_topics:
-                q_topic_filter = Q()
-                for topic_name in allowed_topics:
-                    q_topic_filter |= Q(name__icontains=topic_name)
-                base_query &= q_topic_filter
-            else:
-                syllabus_topics = Topic.objects.filter(examsyllabus__exam__in=preferred_exams).distinct()
-                if syllabus_topics.exists():
-                    base_query &= Q(id__in=syllabus_topics)
+            allowed_topic_ids = syllabus_topic_ids(preferred_exams)
+            if not allowed_topic_ids:
+                allowed_topic_ids = syllabus_topic_ids(preferred_exams, source=SyllabusTopicIndex.SOURCE_EXAM_SYLLABUS)
+            if allowed_topic_ids:
+                base_query &= Q(id__in=allowed_topic_ids)
                 
         return Topic.objects.filter(base_query).distinct().order_by('name')
 
@@ -2077,41 +2022,21 @@ class TopicQuestionsView(generics.ListAPIView):
         if hasattr(user, 'userprofile') and user.userprofile.institute:
             base_query |= Q(topic=topic, institute=user.userprofile.institute)
             
-        qs = Question.objects.filter(base_query).distinct()
+        qs = Question.objects.filter(base_query)
         
         preferred_exams = Exam.objects.none()
         if user and user.is_authenticated and hasattr(user, 'userprofile'):
             user_prefs = user.userprofile.preferred_exams.all()
             if user_prefs.exists():
-                q_obj = Q()
-                for exam in user_prefs:
-                    q_obj |= Q(id=exam.id)
-                    words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-                    if words:
-                        sub_q = Q()
-                        for word in words:
-                            sub_q |= Q(name__icontains=word)
-                        q_obj |= sub_q
-                preferred_exams = Exam.objects.filter(q_obj).distinct()
+                preferred_exams = related_exams(user_prefs)
 
         if preferred_exams.exists():
-            qs = qs.filter(exams__in=preferred_exams)
-            
-            from .syllabus_db import resolve_exam_slug, SYLLABUS_DATABASE
-            allowed_topics = set()
-            for exam in preferred_exams:
-                slug_key = resolve_exam_slug(exam.slug)
-                if slug_key and slug_key in SYLLABUS_DATABASE:
-                    for item in SYLLABUS_DATABASE[slug_key]['syllabus']:
-                        allowed_topics.add(item['topic'].lower())
+            from .exam_membership import in_exams
+            qs = qs.filter(in_exams(preferred_exams.values_list('id', flat=True)))
             
-            if allowed_topics:
-                q_topic_filter = Q()
-                for topic_name in allowed_topics:
-                    q_topic_filter |= Q(topic__name__icontains=topic_name)
-                qs = qs.filter(q_topic_filter)
-                
-            qs = qs.distinct()
+            allowed_topic_ids = syllabus_topic_ids(preferred_exams)
+            if allowed_topic_ids:
+                qs = qs.filter(topic_id__in=allowed_topic_ids)
         
         difficulty = self.request.query_params.get('difficulty')
         if difficulty in ('easy', 'medium', 'hard'):
@@ -2153,6 +2078,10 @@ class PracticeStartView(generics.CreateAPIView):
             # Drill weak areas
             language = request.data.get('language')
             questions_queryset = QuestionEngine.get_weak_area_questions(user, limit=count, language=language)
+        elif session_type == 'review':
+            # Spaced-repetition review of questions that are due
+            language = request.data.get('language')
+            questions_queryset = QuestionEngine.get_due_reviews(user, limit=count, language=language)
         else:
             # Build filters
             filters = {}
@@ -2165,7 +2094,8 @@ class PracticeStartView(generics.CreateAPIView):
             if language:
                 filters['language'] = language
 
-            questions_queryset = QuestionEngine.get_questions_for_user(user, filters, limit=count)
+            from .question_queue import pop_questions
+            questions_queryset = pop_questions(user, filters, count)
 
         questions_list = list(questions_queryset)
         if not questions_list:
@@ -2206,45 +2136,45 @@ class PracticeSubmitView(views.APIView):
         q_ids = [ans.get('question_id') for ans in answers_data if ans.get('question_id')]
         questions_map = {q.id: q for q in Question.objects.filter(id__in=q_ids)}
         
-        correct_count = 0
-        results_list = []
-        
+        from .grading import grade_sheet, record_answers
+        submitted = {}
+        time_spent = {}
         for ans_item in answers_data:
             q_id = ans_item.get('question_id')
-            selected = ans_item.get('selected_option', '')
-            time_spent = int(ans_item.get('time_spent_secs', 0))
-            
-            question = questions_map.get(q_id)
-            if not question:
-                continue
-                
-            is_correct = (selected == question.correct_answer) if selected else False
-            if is_correct:
-                correct_count += 1
-                
-            SessionAnswer.objects.update_or_create(
-                session=session,
-                question=question,
-                defaults={
-                    'selected_option': selected,
-                    'is_correct': is_correct,
-                    'time_spent_secs': time_spent
-                }
-            )
-            
-            if selected:
-                UserAnswer.objects.create(
-                    user=request.user,
-                    question=question,
-                    selected_option=selected,
-                    is_correct=is_correct
-                )
-                
-            results_list.append({
+            if q_id in questions_map:
+                submitted[q_id] = ans_item.get('selected_option', '')
+                time_spent[q_id] = int(ans_item.get('time_spent_secs', 0))
+        graded = grade_sheet([questions_map[q_id] for q_id in submitted], submitted)
+
+        # The session's answer rows were created when it started; fill them in with one UPDATE
+        session_answers = {sa.question_id: sa for sa in SessionAnswer.objects.filter(session=session)}
+        to_update, to_create = [], []
+        for question, selected, is_correct in graded:
+            session_answer = session_answers.get(question.id)
+            if session_answer is None:
+                session_answer = SessionAnswer(session=session, question=question)
+                to_create.append(session_answer)
+            else:
+                to_update.append(session_answer)
+            session_answer.selected_option = selected
+            session_answer.is_correct = is_correct
+            session_answer.time_spent_secs = time_spent[question.id]
+        if to_update:
+            SessionAnswer.objects.bulk_update(to_update, ['selected_option', 'is_correct', 'time_spent_secs'])
+        if to_create:
+            SessionAnswer.objects.bulk_create(to_create, ignore_conflicts=True)
+
+        record_answers(request.user, graded)
+
+        correct_count = sum(1 for _, _, is_correct in graded if is_correct)
+        results_list = [
+            {
                 'question': QuestionResultSerializer(question, context={'request': request}).data,
                 'selected_option': selected,
                 'is_correct': is_correct
-            })
+            }
+            for question, selected, is_correct in graded
+        ]
             
         session.correct_count = correct_count
         session.total_questions = len(answers_data)
@@ -2268,6 +2198,7 @@ class PracticeSubmitView(views.APIView):
 class WeakAreasView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_user_payload
     def get(self, request, *args, **kwargs):
         progress_records = TopicProgress.objects.filter(user=request.user).select_related('topic')
         weak_areas = []
@@ -2291,6 +2222,7 @@ class WeakAreasView(generics.ListAPIView):
 class TopicSummaryView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_user_payload
     def get(self, request, *args, **kwargs):
         user = request.user
         base_query = Q(institute__isnull=True)
@@ -2301,16 +2233,7 @@ class TopicSummaryView(generics.ListAPIView):
         if user and user.is_authenticated and hasattr(user, 'userprofile'):
             user_prefs = user.userprofile.preferred_exams.all()
             if user_prefs.exists():
-                q_obj = Q()
-                for exam in user_prefs:
-                    q_obj |= Q(id=exam.id)
-                    words = [w for w in exam.name.replace('(', '').replace(')', '').replace('/', ' ').split() if len(w) > 2]
-                    if words:
-                        sub_q = Q()
-                        for word in words:
-                            sub_q |= Q(name__icontains=word)
-                        q_obj |= sub_q
-                preferred_exams = Exam.objects.filter(q_obj).distinct()
+                preferred_exams = related_exams(user_prefs)
 
         if preferred_exams.exists():
             syllabus_topics = Topic.objects.filter(examsyllabus__exam__in=preferred_exams).distinct()
@@ -2447,18 +2370,8 @@ class UserActivityView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        ans_dates = UserAnswer.objects.filter(user=request.user).values_list('answered_at__date', flat=True).distinct()
-        feed_dates = UserFeedView.objects.filter(user=request.user).values_list('viewed_date', flat=True).distinct()
-        
-        all_dates = set()
-        for d in ans_dates:
-            if d:
-                all_dates.add(d.strftime('%Y-%m-%d'))
-        for d in feed_dates:
-            if d:
-                all_dates.add(d.strftime('%Y-%m-%d'))
-                
-        return Response({'activity': sorted(list(all_dates))})
+        from .activity import active_dates
+        return Response({'activity': [d.strftime('%Y-%m-%d') for d in active_dates(request.user.id)]})
 
 
 class FriendsView(views.APIView):
@@ -2599,6 +2512,7 @@ class UserExamProgressView(views.APIView):
     """
     permission_classes = [AllowAny]
 
+    @cache_user_payload
     def get(self, request, exam_id=None):
         from .serializers import UserExamProgressSerializer
         try:
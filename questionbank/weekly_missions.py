@@ -0,0 +1,208 @@
+"""
+Weekly missions backed by per-user counters (WeeklyMissionProgress).
+
+Answers, model exam attempts and current-affairs reads bump the user's
+counters for the current ISO week under a row lock, resetting them when the
+week key changes, and grant a mission's XP the moment its counter reaches the
+target. Answer sheets are counted once per sheet by record_answers. The weekly
+goals endpoint reads one row instead of aggregating the user's history;
+`rebuild_weekly_missions` reconciles the counters with that history.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .gamification import award_xp
+from .models import ModelExamAttempt, UserAnswer, UserFeedView, WeeklyMissionProgress
+
+COUNTERS = ('questions_answered', 'mock_tests', 'current_affairs_read', 'wrong_reviewed')
+
+# (mission id, text, counter, target, XP reward)
+MISSIONS = (
+    ('questions_50', 'Answer 50 questions', 'questions_answered', 50, 100),
+    ('mock_tests_2', 'Complete 2 mock tests', 'mock_tests', 2, 150),
+    ('current_affairs_10', 'Read 10 current affairs', 'current_affairs_read', 10, 75),
+    ('review_wrong', 'Review wrong answers (Answer 5 previously wrong)', 'wrong_reviewed', 5, 50),
+)
+STREAK_MISSION = ('streak_7', 'Maintain 7-day streak', 7, 200)
+
+
+def week_key(day=None):
+    year, week, _ = (day or timezone.localdate()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _start_week(progress, week):
+    progress.week = week
+    for counter in COUNTERS:
+        setattr(progress, counter, 0)
+    progress.rewarded = []
+
+
+def bump_missions(user_id, has_wrong_answers=False, week=None, **increments):
+    """
+    Adds `increments` (counter name -> amount) to the user's counters for
+    `week` (default this week) and grants the XP of every mission that reaches
+    its target. Counts for a week the user's row has already moved past are
+    dropped.
+    """
+    increments = {counter: amount for counter, amount in increments.items() if amount}
+    if not increments and not has_wrong_answers:
+        return
+    week = week or week_key()
+    with transaction.atomic(savepoint=False):
+        progress = WeeklyMissionProgress.objects.select_for_update().filter(user_id=user_id).first()
+        if progress is None:
+            progress, _ = WeeklyMissionProgress.objects.select_for_update().get_or_create(
+                user_id=user_id, defaults={'week': week}
+            )
+        if progress.week < week:
+            _start_week(progress, week)
+        elif progress.week > week:
+            increments = {}
+        for counter, amount in increments.items():
+            setattr(progress, counter, getattr(progress, counter) + amount)
+        progress.has_wrong_answers = progress.has_wrong_answers or has_wrong_answers
+        reached = [
+            (mission_id, reward) for mission_id, _, counter, target, reward in MISSIONS
+            if mission_id not in progress.rewarded and getattr(progress, counter) >= target
+        ]
+        progress.rewarded = progress.rewarded + [mission_id for mission_id, _ in reached]
+        progress.save()
+        if reached:
+            award_xp(User.objects.get(pk=user_id), sum(reward for _, reward in reached))
+
+
+def answer_increments(answers):
+    """
+    Counts `answers`, (user_id, question_id, answered_at, is_correct) tuples of
+    saved answers, per user and answer week: {(user_id, week): {counter or
+    'has_wrong_answers': value}}. A correct answer reviews a question the user
+    has a wrong answer for; those are looked up in one query.
+    """
+    correct = {(user_id, question_id) for user_id, question_id, _, is_correct in answers if is_correct}
+    previously_wrong = set()
+    if correct:
+        previously_wrong = correct.intersection(UserAnswer.objects.filter(
+            is_correct=False,
+            user_id__in={user_id for user_id, _ in correct},
+            question_id__in={question_id for _, question_id in correct},
+        ).values_list('user_id', 'question_id').distinct())
+    increments = {}
+    for user_id, question_id, answered_at, is_correct in answers:
+        week = week_key(timezone.localtime(answered_at).date())
+        counts = increments.setdefault(
+            (user_id, week), {'questions_answered': 0, 'wrong_reviewed': 0, 'has_wrong_answers': False}
+        )
+        counts['questions_answered'] += 1
+        if not is_correct:
+            counts['has_wrong_answers'] = True
+        elif (user_id, question_id) in previously_wrong:
+            counts['wrong_reviewed'] += 1
+    return increments
+
+
+def count_answers(answers):
+    """Counts saved answers towards their week's missions, oldest week first."""
+    for (user_id, week), counts in sorted(answer_increments(answers).items(), key=lambda item: item[0][1]):
+        bump_missions(user_id, week=week, **counts)
+
+
+def weekly_missions(progress, streak):
+    """The mission list for `progress` (a WeeklyMissionProgress or None) and the user's current streak."""
+    if progress is not None and progress.week != week_key():
+        _start_week(progress, week_key())
+    has_wrong_answers = progress is not None and progress.has_wrong_answers
+    missions = []
+    for mission_id, text, counter, target, reward in MISSIONS:
+        value = getattr(progress, counter) if progress is not None else 0
+        completed = value >= target
+        if mission_id == 'review_wrong' and not has_wrong_answers:
+            # Nothing to review counts as done
+            value, completed = target, True
+        missions.append({
+            'id': mission_id, 'text': text, 'progress': min(value, target), 'target': target,
+            'xp_reward': reward, 'completed': completed,
+        })
+    mission_id, text, target, reward = STREAK_MISSION
+    missions.append({
+        'id': mission_id, 'text': text, 'progress': min(streak, target), 'target': target,
+        'xp_reward': reward, 'completed': streak >= target,
+    })
+    return missions
+
+
+def build_mission_rows(start, week, rewarded=None):
+    """
+    Builds unsaved WeeklyMissionProgress rows for the week starting at `start`
+    (an aware datetime) from the answer, attempt and feed view history.
+    Missions already complete, and those in `rewarded` ({user_id: mission
+    ids}), are marked rewarded, so rebuilding never grants XP.
+    """
+    rewarded = rewarded or {}
+    answers = UserAnswer.objects.all()
+    rows = {}
+
+    def row(user_id):
+        if user_id not in rows:
+            rows[user_id] = WeeklyMissionProgress(user_id=user_id, week=week, rewarded=[])
+        return rows[user_id]
+
+    for user_id in rewarded:
+        row(user_id)
+
+    for user_id in answers.filter(is_correct=False).values_list('user_id', flat=True).distinct().iterator():
+        row(user_id).has_wrong_answers = True
+    for user_id, n in answers.filter(answered_at__gte=start).values_list('user_id').annotate(n=Count('id')).order_by():
+        row(user_id).questions_answered = n
+    for user_id, n in ModelExamAttempt.objects.filter(submitted_at__gte=start).values_list(
+        'user_id'
+    ).annotate(n=Count('id')).order_by():
+        row(user_id).mock_tests = n
+    for user_id, n in UserFeedView.objects.filter(
+        card__card_type='current_affairs', viewed_date__gte=timezone.localtime(start).date()
+    ).values_list('user_id').annotate(n=Count('id')).order_by():
+        row(user_id).current_affairs_read = n
+    this_week = answers.filter(answered_at__gte=start, is_correct=True)
+    wrong_pairs = set(answers.filter(
+        is_correct=False, user_id__in=this_week.values('user_id')
+    ).values_list('user_id', 'question_id').distinct().iterator())
+    for pair in this_week.values_list('user_id', 'question_id').iterator():
+        if pair in wrong_pairs:
+            row(pair[0]).wrong_reviewed += 1
+
+    for progress in rows.values():
+        progress.rewarded = [
+            mission_id for mission_id, _, counter, target, _ in MISSIONS
+            if getattr(progress, counter) >= target or mission_id in rewarded.get(progress.user_id, ())
+        ]
+    return list(rows.values())
+
+
+def week_start():
+    """Monday 00:00 (local time) of the current week."""
+    today = timezone.localdate()
+    monday = today - timedelta(days=today.weekday())
+    return timezone.make_aware(datetime.combine(monday, time.min))
+
+
+def rebuild_weekly_missions():
+    """
+    Recomputes every user's counters for the current week from history,
+    keeping the missions already rewarded this week. Returns the number of rows
+    written.
+    """
+    week = week_key()
+    with transaction.atomic():
+        rewarded = {
+            user_id: missions
+            for user_id, missions in WeeklyMissionProgress.objects.filter(week=week).values_list('user_id', 'rewarded')
+            if missions
+        }
+        rows = build_mission_rows(week_start(), week, rewarded)
+        WeeklyMissionProgress.objects.all().delete()
+        WeeklyMissionProgress.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)